@@ -1,16 +1,22 @@
 # app/api/auth.py
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr, field_validator
 
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.query_stats import query_budget
 from app.core.limiter import limiter
-from app.auth.service import auth_service
-from app.models.user import User
+from app.auth.service import auth_service, get_current_user, Principal
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
-security = HTTPBearer()
+
+
+def validate_password(v):
+    if len(v) < 8:
+        raise ValueError('Password must be at least 8 characters long')
+    return v
 
 
 # Pydantic schemas
@@ -20,12 +26,7 @@ class UserRegister(BaseModel):
     first_name: str = None
     last_name: str = None
 
-    @field_validator('password')
-    @classmethod
-    def validate_password(cls, v):
-        if len(v) < 8:
-            raise ValueError('Password must be at least 8 characters long')
-        return v
+    _validate_password = field_validator('password')(validate_password)
 
 
 class UserLogin(BaseModel):
@@ -33,43 +34,38 @@ class UserLogin(BaseModel):
     password: str
 
 
-class TokenResponse(BaseModel):
-    access_token: str
-    token_type: str = "bearer"
-    user_id: int
-    email: str
-    first_name: str = None
-    last_name: str = None
-    subscription_tier: str  # Add this
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 
-# Dependency to get current user
-async def get_current_user(
-        credentials: HTTPAuthorizationCredentials = Depends(security),
-        db: Session = Depends(get_db)
-) -> User:
-    token = credentials.credentials
-    payload = auth_service.verify_token(token)
+class PasswordChange(BaseModel):
+    current_password: str
+    new_password: str
 
-    if not payload:
-        raise HTTPException(status_code=401, detail="Invalid token")
+    _validate_password = field_validator('new_password')(validate_password)
 
-    user_id = payload.get("sub")
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
+class PasswordConfirmation(BaseModel):
+    password: str
 
-    return user
+
+class TokenResponse(BaseModel):
+    access_token: str
+    refresh_token: str
+    expires_in: int  # Seconds until access_token expires
+    token_type: str = "bearer"
+    user_id: int
+    email: str
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    subscription_tier: str  # Add this
 
 
 @router.post("/register")
 @limiter.limit("5/minute")
-async def register(request: Request, user_data: UserRegister, db: Session = Depends(get_db)):
+async def register(request: Request, user_data: UserRegister, db: AsyncSession = Depends(get_async_db)):
     """Register a new user."""
-    result = auth_service.create_user(
+    result = await auth_service.create_user(
         db=db,
         email=user_data.email,
         password=user_data.password,
@@ -85,9 +81,9 @@ async def register(request: Request, user_data: UserRegister, db: Session = Depe
 
 @router.post("/login", response_model=TokenResponse)
 @limiter.limit("10/minute")
-async def login(request: Request, user_credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(request: Request, user_credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Login user and return access token."""
-    user = auth_service.authenticate_user(
+    user = await auth_service.authenticate_user(
         db=db,
         email=user_credentials.email,
         password=user_credentials.password
@@ -96,12 +92,64 @@ async def login(request: Request, user_credentials: UserLogin, db: Session = Dep
     if not user:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    access_token = auth_service.create_access_token(
-        data={"sub": str(user.id), "email": user.email}
-    )
+    return token_response(user, await auth_service.issue_tokens(db, user))
+
+
+@router.post("/refresh", response_model=TokenResponse)
+@limiter.limit("30/minute")
+async def refresh(request: Request, body: RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """Exchange a refresh token for a new access token and refresh token."""
+    result = await auth_service.rotate_refresh_token(db, body.refresh_token)
+    if result is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
+
+    user, tokens = result
+    return token_response(user, tokens)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+@limiter.limit("30/minute")
+async def logout(request: Request, body: RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """Revoke the refresh token and the access tokens issued with it."""
+    await auth_service.logout(db, body.refresh_token)
+
+
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+@limiter.limit("10/minute")
+async def logout_all(request: Request, current_user: Principal = Depends(get_current_user),
+                     db: AsyncSession = Depends(get_async_db)):
+    """Sign out everywhere: every access and refresh token issued so far stops working."""
+    await auth_service.revoke_tokens(db, current_user.id)
+
+
+@router.post("/change-password", response_model=TokenResponse)
+@limiter.limit("5/minute")
+async def change_password(request: Request, body: PasswordChange, current_user: Principal = Depends(get_current_user),
+                          db: AsyncSession = Depends(get_async_db)):
+    """Change the password; other sessions are signed out, this one gets new tokens."""
+    user = await auth_service.change_password(db, current_user.id, body.current_password, body.new_password)
+    if user is None:
+        raise HTTPException(status_code=400, detail="Current password is incorrect")
+
+    return token_response(user, await auth_service.issue_tokens(db, user))
+
+
+@router.post("/deactivate", status_code=status.HTTP_204_NO_CONTENT)
+@limiter.limit("5/minute")
+async def deactivate_account(request: Request, body: PasswordConfirmation,
+                             current_user: Principal = Depends(get_current_user),
+                             db: AsyncSession = Depends(get_async_db)):
+    """Deactivate the account (after confirming the password); every token stops working."""
+    user = await auth_service.authenticate_user(db, current_user.email, body.password)
+    if user is None:
+        raise HTTPException(status_code=400, detail="Password is incorrect")
+
+    await auth_service.deactivate_user(db, current_user.id)
+
 
+def token_response(user, tokens: dict) -> dict:
     return {
-        "access_token": access_token,
+        **tokens,
         "token_type": "bearer",
         "user_id": user.id,
         "email": user.email,
@@ -112,7 +160,8 @@ async def login(request: Request, user_credentials: UserLogin, db: Session = Dep
 
 
 @router.get("/me")
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+@query_budget(1)
+async def get_current_user_info(current_user: Principal = Depends(get_current_user)):
     """Get current user information."""
     return {
         "id": current_user.id,
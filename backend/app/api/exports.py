@@ -0,0 +1,75 @@
+# app/api/exports.py
+# Data export endpoints (streamed CSV, NDJSON or Parquet)
+
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
+from app.core.limiter import limiter
+from app.auth.service import get_current_user, Principal
+from app.services.export_service import (
+    MEDIA_TYPES, ExportFormat, get_export_writer, portfolio_export_query, property_export_query, stream_export
+)
+from app.services.portfolio_service import PortfolioService
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+# Tiers with data export (hasDataExport in the frontend's subscriptionLimits.ts)
+EXPORT_TIERS = {"pro"}
+
+
+async def require_data_export(current_user: Principal = Depends(get_current_user)) -> Principal:
+    if (current_user.subscription_tier or "").lower() not in EXPORT_TIERS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Data export is available on the Pro plan"
+        )
+    return current_user
+
+
+def export_response(query, export_format: ExportFormat, name: str, user_id: int) -> StreamingResponse:
+    writer = get_export_writer(export_format, query)
+    filename = f"{name}-{date.today():%Y%m%d}.{export_format.value}"
+    return StreamingResponse(
+        stream_export(query, writer, user_id),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Accel-Buffering": "no"  # Proxies pass each batch on instead of buffering the file
+        }
+    )
+
+
+@router.get("/properties")
+@limiter.limit("30/hour")
+async def export_properties(
+        request: Request,
+        format: ExportFormat = Query(ExportFormat.CSV, description="csv, ndjson or parquet"),
+        portfolio_id: Optional[int] = Query(None, description="Only this folder's properties"),
+        current_user: Principal = Depends(require_data_export),
+        db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Download every property with its financials, streamed as it's read
+    (large exports start at once and don't need to fit in memory)
+    """
+    if portfolio_id is not None:
+        portfolio_service = PortfolioService(db)
+        if not await portfolio_service.get_portfolio_by_id(portfolio_id, current_user.id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Portfolio not found")
+
+    query = property_export_query(current_user.id, portfolio_id)
+    return export_response(query, format, "properties", current_user.id)
+
+
+@router.get("/portfolios")
+@limiter.limit("30/hour")
+async def export_portfolios(
+        request: Request,
+        format: ExportFormat = Query(ExportFormat.CSV, description="csv, ndjson or parquet"),
+        current_user: Principal = Depends(require_data_export)
+):
+    """Download every portfolio folder with its property count, value and cash flow totals"""
+    return export_response(portfolio_export_query(current_user.id), format, "portfolios", current_user.id)
@@ -0,0 +1,110 @@
+# app/api/imports.py
+# Bulk property import endpoints
+
+from typing import List, Optional
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile, status
+from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
+from app.core.limiter import limiter
+from app.core.query_stats import query_budget
+from app.core.serialization import serialize_response
+from app.core.settings import settings
+from app.auth.service import get_current_user, Principal
+from app.models.import_session import ImportMode
+from app.services.import_service import FILE_READERS, IMPORT_COLUMNS, ImportService
+from app.schemas.import_session import (
+    ImportSessionResponse, import_session_response_adapter, import_session_list_adapter
+)
+
+router = APIRouter(prefix="/imports", tags=["imports"])
+
+
+@router.post("/properties", response_model=ImportSessionResponse, status_code=status.HTTP_202_ACCEPTED)
+@limiter.limit("20/hour")
+async def import_properties(
+        request: Request,
+        file: UploadFile = File(..., description="CSV or Excel (.xlsx) with a header row; see /imports/properties/template"),
+        portfolio_id: Optional[int] = Form(None, description="Folder for every imported property"),
+        mode: ImportMode = Form(ImportMode.INSERT, description="Rows matching a property: insert skips, upsert updates"),
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Import properties from a CSV or Excel file, with financial metrics calculated for each
+    Columns are matched by their headers ("Rent", "Sq Ft", "Market Value"...);
+    invalid rows are skipped and listed in the import's errors. Rows are matched
+    to existing properties by address ("123 N Main St" and "123 North Main Street"
+    match): in upsert mode their non-empty cells update the property.
+    The import runs in the background: poll GET /imports/{id} (or GET /jobs/{job_id})
+    for progress, and POST /jobs/{job_id}/cancel to stop it.
+    """
+    filename = file.filename or "upload.csv"
+    file_type = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if file_type not in FILE_READERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported file type; import one of: {', '.join('.' + name for name in FILE_READERS)}"
+        )
+    if file.size is not None and file.size > settings.IMPORT_MAX_FILE_MB * 1024 * 1024:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File is larger than {settings.IMPORT_MAX_FILE_MB} MB"
+        )
+
+    import_service = ImportService(db)
+    if portfolio_id is not None and not await import_service.owns_portfolio(portfolio_id, current_user.id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Portfolio not found")
+
+    import_session = await import_service.queue_import(
+        current_user.id, file.file, filename, file_type, file.size, portfolio_id, mode
+    )
+
+    return serialize_response(
+        request, import_session_response_adapter, import_session,
+        from_attributes=True, status_code=status.HTTP_202_ACCEPTED
+    )
+
+
+@router.get("/properties/template")
+async def get_import_template():
+    """Empty CSV with every column an import understands (only name is required)"""
+    return Response(
+        content=",".join(IMPORT_COLUMNS) + "\r\n",
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="properties_template.csv"'}
+    )
+
+
+@router.get("/", response_model=List[ImportSessionResponse])
+@query_budget(2)
+async def get_imports(
+        request: Request,
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
+):
+    """Get the current user's most recent imports"""
+    import_service = ImportService(db)
+    imports = await import_service.get_user_sessions(current_user.id)
+    return serialize_response(request, import_session_list_adapter, imports, from_attributes=True)
+
+
+@router.get("/{import_id}", response_model=ImportSessionResponse)
+@query_budget(2)
+async def get_import(
+        request: Request,
+        import_id: int,
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
+):
+    """Get an import's status and progress"""
+    import_service = ImportService(db)
+    import_session = await import_service.get_session(import_id, current_user.id)
+
+    if not import_session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import not found"
+        )
+
+    return serialize_response(request, import_session_response_adapter, import_session, from_attributes=True)
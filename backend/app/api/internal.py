@@ -0,0 +1,57 @@
+# app/api/internal.py
+# Internal operational endpoints (not part of the public API)
+
+import os
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from app.core.settings import settings
+from app.core.pool_stats import get_pool_stats
+from app.core.metrics import render_metrics
+
+
+def require_internal_access(x_internal_token: Optional[str] = Header(None)):
+    """
+    Dependency guarding internal endpoints
+    With INTERNAL_API_TOKEN set the header must match; without it they are
+    only served outside production. Hidden as 404 either way.
+    """
+    if settings.INTERNAL_API_TOKEN:
+        if not x_internal_token or not secrets.compare_digest(x_internal_token, settings.INTERNAL_API_TOKEN):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    elif settings.is_production:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["internal"],
+    include_in_schema=False,
+    dependencies=[Depends(require_internal_access)]
+)
+
+
+@router.get("/pool-stats")
+async def pool_stats():
+    """Connection pool telemetry for the worker process that serves this request"""
+    return {
+        "pid": os.getpid(),
+        "pgbouncer_mode": settings.DB_PGBOUNCER,
+        "pools": get_pool_stats()
+    }
+
+
+# Prometheus expects /metrics at the root; same access rules as /internal
+metrics_router = APIRouter(
+    tags=["internal"],
+    include_in_schema=False,
+    dependencies=[Depends(require_internal_access)]
+)
+
+
+@metrics_router.get("/metrics")
+def prometheus_metrics():
+    """Prometheus exposition, merged across gunicorn workers"""
+    # Sync on purpose: merging the per-worker files is file I/O, so it runs in the threadpool
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
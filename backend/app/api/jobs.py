@@ -0,0 +1,142 @@
+# app/api/jobs.py
+# Background job status, live progress, cancellation and retry
+
+from typing import AsyncIterator, List
+import asyncio
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import AsyncSessionLocal, get_async_db
+from app.core.query_stats import query_budget
+from app.core.serialization import serialize_response
+from app.core.settings import settings
+from app.auth.service import get_current_user, Principal
+from app.jobs import handlers  # noqa: F401 (registers cancel hooks and progress snapshots)
+from app.jobs.progress import FINISHED, job_snapshot, progress_broker
+from app.jobs.queue import cancel_job, get_user_job, get_user_jobs, retry_job
+from app.models.job import Job
+from app.schemas.job import JobResponse, job_response_adapter, job_list_adapter
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+async def get_job_or_404(job_id: int, user_id: int, db: AsyncSession):
+    job = await get_user_job(db, job_id, user_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
+
+
+@router.get("/", response_model=List[JobResponse])
+@query_budget(2)
+async def get_jobs(
+        request: Request,
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
+):
+    """Get the current user's most recent jobs"""
+    jobs = await get_user_jobs(db, current_user.id)
+    return serialize_response(request, job_list_adapter, jobs, from_attributes=True)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+@query_budget(2)
+async def get_job(
+        request: Request,
+        job_id: int,
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
+):
+    """Get a job's status (and result once it has succeeded)"""
+    job = await get_job_or_404(job_id, current_user.id, db)
+    return serialize_response(request, job_response_adapter, job, from_attributes=True)
+
+
+def sse_event(payload: str) -> bytes:
+    return f"event: progress\ndata: {payload}\n\n".encode()
+
+
+async def stream_progress(job_id: int) -> AsyncIterator[bytes]:
+    """A job's progress events (StreamingResponse body), until it has finished"""
+    async with progress_broker.subscribe(job_id) as events:
+        # Subscribed first, so nothing published meanwhile is missed
+        async with AsyncSessionLocal() as db:
+            job = await db.get(Job, job_id)
+            snapshot = await job_snapshot(db, job) if job is not None else None
+        if snapshot is None:
+            return
+        yield sse_event(orjson.dumps(snapshot).decode())
+
+        finished = snapshot["status"] in FINISHED
+        while not finished:
+            try:
+                payload = await asyncio.wait_for(events.get(), settings.PROGRESS_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"  # A comment: keeps proxies from closing an idle stream
+                continue
+            yield sse_event(payload)
+            finished = orjson.loads(payload)["status"] in FINISHED
+
+
+@router.get("/{job_id}/events")
+async def job_events(
+        job_id: int,
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Follow a job's progress with Server-Sent Events (text/event-stream)
+    Each `progress` event is a JSON object: job_id, kind, status, and while it
+    runs percent, processed and total (rows of an import, paths of a
+    simulation) and the kind's own fields (a simulation's interim
+    percentiles). The first event is the job as it stands; the stream ends
+    after the job has succeeded, failed or been cancelled. Instead of polling
+    GET /jobs/{id}: events are pushed as the worker commits them.
+    """
+    await get_job_or_404(job_id, current_user.id, db)
+    return StreamingResponse(
+        stream_progress(job_id),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Proxies pass each event on at once
+        }
+    )
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+async def cancel(
+        request: Request,
+        job_id: int,
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Cancel a job: a queued one at once, a running one at its next checkpoint
+    (cancel_requested is set until then). Finished jobs are returned unchanged.
+    """
+    job = await get_job_or_404(job_id, current_user.id, db)
+    job = await cancel_job(db, job)
+    return serialize_response(request, job_response_adapter, job, from_attributes=True)
+
+
+@router.post("/{job_id}/retry", response_model=JobResponse)
+async def retry(
+        request: Request,
+        job_id: int,
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
+):
+    """Queue a failed or cancelled job again (an import resumes where it stopped)"""
+    job = await get_job_or_404(job_id, current_user.id, db)
+    retried = await retry_job(db, job)
+    if retried is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Only failed or cancelled jobs can be retried; this one is {job.status.value}"
+        )
+    return serialize_response(request, job_response_adapter, retried, from_attributes=True)
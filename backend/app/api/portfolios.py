@@ -2,13 +2,18 @@
 # Portfolio (folder) management API endpoints
 
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.auth.service import get_current_user
-from app.models.user import User
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
+from app.core.query_stats import query_budget
+from app.core.serialization import serialize_response
+from app.auth.service import get_current_user, Principal
 from app.services.portfolio_service import PortfolioService
-from app.schemas.portfolio import PortfolioCreate, PortfolioUpdate, PortfolioResponse, PortfolioWithMetrics
+from app.schemas.portfolio import (
+    PortfolioCreate, PortfolioUpdate, PortfolioResponse, PortfolioWithMetrics,
+    portfolio_with_metrics_adapter, portfolio_with_metrics_list_adapter
+)
+from app.schemas.property import property_list_adapter
 
 router = APIRouter(prefix="/portfolios", tags=["portfolios"])
 
@@ -16,14 +21,14 @@ router = APIRouter(prefix="/portfolios", tags=["portfolios"])
 @router.post("/", response_model=PortfolioResponse, status_code=status.HTTP_201_CREATED)
 async def create_portfolio(
         portfolio_data: PortfolioCreate,
-        current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new portfolio folder"""
     portfolio_service = PortfolioService(db)
 
     try:
-        portfolio = portfolio_service.create_portfolio(
+        portfolio = await portfolio_service.create_portfolio(
             portfolio_data.model_dump(),
             current_user.id
         )
@@ -36,25 +41,30 @@ async def create_portfolio(
 
 
 @router.get("/", response_model=List[PortfolioWithMetrics])
+@query_budget(4)
 async def get_user_portfolios(
+        request: Request,
         include_default: bool = True,
-        current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Get all portfolio folders for the current user with metrics"""
     portfolio_service = PortfolioService(db)
-    return portfolio_service.get_user_portfolios_with_metrics(current_user.id, include_default)
+    portfolios = await portfolio_service.get_user_portfolios_with_metrics(current_user.id, include_default)
+    return serialize_response(request, portfolio_with_metrics_list_adapter, portfolios)
 
 
 @router.get("/{portfolio_id}", response_model=PortfolioWithMetrics)
+@query_budget(5)
 async def get_portfolio(
+        request: Request,
         portfolio_id: int,
-        current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific portfolio folder by ID with metrics"""
     portfolio_service = PortfolioService(db)
-    portfolio = portfolio_service.get_portfolio_with_metrics(portfolio_id, current_user.id)
+    portfolio = await portfolio_service.get_portfolio_with_metrics(portfolio_id, current_user.id)
 
     if not portfolio:
         raise HTTPException(
@@ -62,15 +72,15 @@ async def get_portfolio(
             detail="Portfolio not found"
         )
 
-    return portfolio
+    return serialize_response(request, portfolio_with_metrics_adapter, portfolio)
 
 
 @router.put("/{portfolio_id}", response_model=PortfolioResponse)
 async def update_portfolio(
         portfolio_id: int,
         portfolio_data: PortfolioUpdate,
-        current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Update a portfolio folder"""
     portfolio_service = PortfolioService(db)
@@ -78,7 +88,7 @@ async def update_portfolio(
     # Filter out None values from update data
     update_data = {k: v for k, v in portfolio_data.model_dump().items() if v is not None}
 
-    portfolio = portfolio_service.update_portfolio(
+    portfolio = await portfolio_service.update_portfolio(
         portfolio_id,
         current_user.id,
         update_data
@@ -97,8 +107,8 @@ async def update_portfolio(
 async def delete_portfolio(
         portfolio_id: int,
         move_properties_to: Optional[int] = None,
-        current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a portfolio folder
@@ -109,7 +119,7 @@ async def delete_portfolio(
     """
     portfolio_service = PortfolioService(db)
 
-    success = portfolio_service.delete_portfolio(
+    success = await portfolio_service.delete_portfolio(
         portfolio_id,
         current_user.id,
         move_properties_to
@@ -125,16 +135,17 @@ async def delete_portfolio(
 
 
 @router.post("/{portfolio_id}/properties/{property_id}")
+@query_budget(5)
 async def move_property_to_portfolio(
         portfolio_id: int,
         property_id: int,
-        current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Move a property to a different portfolio folder"""
     portfolio_service = PortfolioService(db)
 
-    success = portfolio_service.move_property_to_portfolio(
+    success = await portfolio_service.move_property_to_portfolio(
         property_id,
         portfolio_id,
         current_user.id
@@ -150,14 +161,16 @@ async def move_property_to_portfolio(
 
 
 @router.get("/{portfolio_id}/properties")
+@query_budget(4)
 async def get_portfolio_properties(
+        request: Request,
         portfolio_id: int,
-        current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Get all properties in a specific portfolio folder"""
     portfolio_service = PortfolioService(db)
-    properties = portfolio_service.get_portfolio_properties(portfolio_id, current_user.id)
+    properties = await portfolio_service.get_portfolio_properties(portfolio_id, current_user.id)
 
     if properties is None:
         raise HTTPException(
@@ -165,18 +178,18 @@ async def get_portfolio_properties(
             detail="Portfolio not found"
         )
 
-    return properties
+    return serialize_response(request, property_list_adapter, properties, from_attributes=True)
 
 
 @router.post("/initialize")
 async def initialize_default_portfolio(
-        current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Create default 'All Properties' portfolio and move existing properties to it"""
     portfolio_service = PortfolioService(db)
 
-    default_portfolio = portfolio_service.initialize_default_portfolio(current_user.id)
+    default_portfolio = await portfolio_service.initialize_default_portfolio(current_user.id)
 
     return {
         "message": "Default portfolio initialized",
@@ -185,14 +198,15 @@ async def initialize_default_portfolio(
 
 
 @router.get("/{portfolio_id}/metrics")
+@query_budget(4)
 async def get_portfolio_metrics(
         portfolio_id: int,
-        current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Get detailed financial metrics for a portfolio folder"""
     portfolio_service = PortfolioService(db)
-    metrics = portfolio_service.calculate_portfolio_metrics(portfolio_id, current_user.id)
+    metrics = await portfolio_service.calculate_portfolio_metrics(portfolio_id, current_user.id)
 
     if not metrics:
         raise HTTPException(
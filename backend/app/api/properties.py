@@ -2,34 +2,41 @@
 # Property management API endpoints
 
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.auth.service import get_current_user
-from app.models.user import User
-from app.services.property_service import PropertyService
-from app.schemas.property import PropertyCreate, PropertyUpdate, PropertyResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
+from app.core.query_stats import query_budget
+from app.core.serialization import serialize_response
+from app.auth.service import get_current_user, Principal
+from app.services.property_service import DuplicateAddressError, PropertyService
+from app.schemas.property import (
+    PropertyCreate, PropertyUpdate, PropertyResponse, PropertyMetrics,
+    property_response_adapter, property_list_adapter, property_metrics_adapter
+)
 
 router = APIRouter(prefix="/properties", tags=["properties"])
 
 
 @router.post("/", response_model=PropertyResponse, status_code=status.HTTP_201_CREATED)
+@query_budget(4)
 async def create_property(
+        request: Request,
         property_data: PropertyCreate,
-        current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new property with automatic financial calculations"""
     print(f"DEBUG: Received property data: {property_data.model_dump()}")
     property_service = PropertyService(db)
 
     try:
-        property_obj = property_service.create_property(
+        property_obj = await property_service.create_property(
             property_data.model_dump(),
             current_user.id
         )
         print(f"DEBUG: Property created successfully with ID: {property_obj.id}")
-        return property_obj
+    except DuplicateAddressError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     except Exception as e:
         print(f"DEBUG: Error creating property: {str(e)}")
         print(f"DEBUG: Error type: {type(e)}")
@@ -40,26 +47,36 @@ async def create_property(
             detail=f"Error creating property: {str(e)}"
         )
 
+    return serialize_response(
+        request, property_response_adapter, property_obj,
+        from_attributes=True, status_code=status.HTTP_201_CREATED
+    )
+
 
 @router.get("/", response_model=List[PropertyResponse])
+@query_budget(3)
 async def get_user_properties(
-        current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        request: Request,
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Get all properties for the current user"""
     property_service = PropertyService(db)
-    return property_service.get_user_properties(current_user.id)
+    properties = await property_service.get_user_properties(current_user.id)
+    return serialize_response(request, property_list_adapter, properties, from_attributes=True)
 
 
 @router.get("/{property_id}", response_model=PropertyResponse)
+@query_budget(3)
 async def get_property(
+        request: Request,
         property_id: int,
-        current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific property by ID"""
     property_service = PropertyService(db)
-    property_obj = property_service.get_property_by_id(property_id, current_user.id)
+    property_obj = await property_service.get_property_by_id(property_id, current_user.id)
 
     if not property_obj:
         raise HTTPException(
@@ -67,15 +84,17 @@ async def get_property(
             detail="Property not found"
         )
 
-    return property_obj
+    return serialize_response(request, property_response_adapter, property_obj, from_attributes=True)
 
 
 @router.put("/{property_id}", response_model=PropertyResponse)
+@query_budget(5)
 async def update_property(
+        request: Request,
         property_id: int,
         property_data: PropertyUpdate,
-        current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Update a property and recalculate financial metrics"""
     property_service = PropertyService(db)
@@ -92,11 +111,14 @@ async def update_property(
         elif v is not None:
             update_data[k] = v
 
-    property_obj = property_service.update_property(
-        property_id,
-        current_user.id,
-        update_data
-    )
+    try:
+        property_obj = await property_service.update_property(
+            property_id,
+            current_user.id,
+            update_data
+        )
+    except DuplicateAddressError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
     if not property_obj:
         raise HTTPException(
@@ -104,19 +126,19 @@ async def update_property(
             detail="Property not found"
         )
 
-    return property_obj
+    return serialize_response(request, property_response_adapter, property_obj, from_attributes=True)
 
 
 @router.delete("/{property_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_property(
         property_id: int,
-        current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a property"""
     property_service = PropertyService(db)
 
-    success = property_service.delete_property(property_id, current_user.id)
+    success = await property_service.delete_property(property_id, current_user.id)
 
     if not success:
         raise HTTPException(
@@ -127,31 +149,22 @@ async def delete_property(
     return None
 
 
-@router.get("/{property_id}/metrics")
+@router.get("/{property_id}/metrics", response_model=PropertyMetrics)
+@query_budget(3)
 async def get_property_metrics(
+        request: Request,
         property_id: int,
-        current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
 ):
     """Get detailed financial metrics for a property"""
     property_service = PropertyService(db)
-    property_obj = property_service.get_property_by_id(property_id, current_user.id)
+    metrics = await property_service.get_property_metrics(property_id, current_user.id)
 
-    if not property_obj or not property_obj.financials:
+    if not metrics:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Property or financial data not found"
         )
 
-    # Return detailed metrics calculated by Python
-    return {
-        "property_id": property_id,
-        "monthly_cash_flow": property_obj.financials.cash_flow,
-        "annual_cash_flow": property_obj.financials.cash_flow * 12,
-        "cap_rate": property_obj.financials.cap_rate,
-        "roi": property_obj.financials.roi,
-        "monthly_rent": property_obj.financials.monthly_rent,
-        "monthly_expenses": property_obj.financials.monthly_expenses,
-        "vacancy_rate": property_obj.financials.vacancy_rate,
-        "property_value": property_obj.current_value
-    }
\ No newline at end of file
+    return serialize_response(request, property_metrics_adapter, metrics)
\ No newline at end of file
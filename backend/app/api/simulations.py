@@ -0,0 +1,164 @@
+# app/api/simulations.py
+# Simulations: queued as background jobs; results as summaries by default, arrays a slice at a time
+
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
+from app.core.limiter import limiter
+from app.core.query_stats import query_budget
+from app.core.serialization import serialize_response
+from app.auth.service import get_current_user, Principal
+from app.jobs import handlers  # noqa: F401 (registers the cancel hook)
+from app.jobs.queue import cancel_job
+from app.services.simulation_service import ArraySliceTooLarge, SimulationService, TooManySimulations
+from app.schemas.simulation import (
+    SimulationArraySlice, SimulationCreate, SimulationResponse, SimulationSummary,
+    simulation_array_slice_adapter, simulation_list_adapter, simulation_response_adapter,
+    simulation_summary_adapter
+)
+
+router = APIRouter(prefix="/simulations", tags=["simulations"])
+
+
+@router.get("/", response_model=List[SimulationSummary])
+@query_budget(2)
+async def get_simulations(
+        request: Request,
+        property_id: Optional[int] = Query(None, description="Only this property's simulations"),
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
+):
+    """Get the current user's most recent simulations, with their summary metrics (not their results)"""
+    simulation_service = SimulationService(db)
+    simulations = await simulation_service.get_user_simulations(current_user.id, property_id)
+    return serialize_response(request, simulation_list_adapter, simulations, from_attributes=True)
+
+
+@router.post("/", response_model=SimulationResponse, status_code=status.HTTP_202_ACCEPTED)
+@limiter.limit("60/hour")
+async def create_simulation(
+        request: Request,
+        simulation_data: SimulationCreate,
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Queue a simulation; poll GET /simulations/{id} for its progress and results
+    The same request as a simulation of yours still queued or running returns
+    that simulation rather than running it again.
+    """
+    simulation_service = SimulationService(db)
+    try:
+        queued = await simulation_service.queue_simulation(simulation_data, current_user.id)
+    except TooManySimulations as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+
+    if not queued:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found"
+        )
+
+    simulation = await simulation_service.get_simulation_response(queued[0].id, current_user.id)
+    return serialize_response(
+        request, simulation_response_adapter, simulation, status_code=status.HTTP_202_ACCEPTED
+    )
+
+
+@router.get("/{simulation_id}", response_model=SimulationResponse)
+@query_budget(3)
+async def get_simulation(
+        request: Request,
+        simulation_id: int,
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
+):
+    """Get a simulation's result summary, and the names and shapes of its result arrays"""
+    simulation_service = SimulationService(db)
+    simulation = await simulation_service.get_simulation_response(simulation_id, current_user.id)
+
+    if not simulation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Simulation not found"
+        )
+
+    return serialize_response(request, simulation_response_adapter, simulation)
+
+
+@router.get("/{simulation_id}/arrays/{name}", response_model=SimulationArraySlice)
+@query_budget(2)
+async def get_simulation_array(
+        request: Request,
+        simulation_id: int,
+        name: str,
+        start: int = Query(0, ge=0, description="First row (path, or year)"),
+        stop: Optional[int] = Query(None, ge=0, description="Row to stop before; default as many as one response holds"),
+        step: int = Query(1, ge=1, description="Every step-th row (e.g. 10 for a sample of paths)"),
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get rows start:stop:step of a result array, sliced on the server
+    A response holds at most SIMULATION_ARRAY_MAX_VALUES values: page through
+    larger arrays with start (the response's stop is the next page's start).
+    """
+    simulation_service = SimulationService(db)
+    try:
+        array = await simulation_service.get_array_slice(simulation_id, current_user.id, name, start, stop, step)
+    except ArraySliceTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if not array:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Simulation array not found"
+        )
+
+    return serialize_response(request, simulation_array_slice_adapter, array)
+
+
+@router.post("/{simulation_id}/cancel", response_model=SimulationSummary)
+async def cancel_simulation(
+        request: Request,
+        simulation_id: int,
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Cancel a simulation: at once if it's queued, otherwise between two batches
+    of paths (its status turns CANCELLED then). Finished ones are left as they are.
+    """
+    simulation_service = SimulationService(db)
+    simulation = await simulation_service.get_simulation(simulation_id, current_user.id)
+
+    if not simulation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Simulation not found"
+        )
+
+    job = await simulation_service.get_job(simulation)
+    if job is not None:
+        await cancel_job(db, job)
+        await db.refresh(simulation)
+    return serialize_response(request, simulation_summary_adapter, simulation, from_attributes=True)
+
+
+@router.delete("/{simulation_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_simulation(
+        simulation_id: int,
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
+):
+    """Delete a simulation and its results"""
+    simulation_service = SimulationService(db)
+
+    if not await simulation_service.delete_simulation(simulation_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Simulation not found"
+        )
+
+    return None
@@ -0,0 +1,29 @@
+# app/api/sync.py
+# Delta-sync endpoint for incremental client refresh
+
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
+from app.core.query_stats import query_budget
+from app.core.serialization import serialize_response
+from app.auth.service import get_current_user, Principal
+from app.services.sync_service import SyncService
+from app.schemas.sync import SyncResponse, sync_response_adapter
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.get("/", response_model=SyncResponse)
+@query_budget(5)
+async def sync_changes(
+        request: Request,
+        since: Optional[datetime] = Query(None, description="Cursor from the previous sync; omit for a full snapshot"),
+        current_user: Principal = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
+):
+    """Get properties, financials and portfolios changed since the cursor, plus deletions"""
+    sync_service = SyncService(db)
+    changes = await sync_service.get_changes(current_user.id, since)
+    return serialize_response(request, sync_response_adapter, changes, from_attributes=True)
@@ -0,0 +1,91 @@
+# app/auth/revocation.py
+# Constant-time access-token revocation checks that never touch Postgres
+#
+# Revoked jtis are stored in revoked_access_tokens. Each worker keeps the
+# unexpired ones in a dict and polls for rows added since its last sync every
+# TOKEN_REVOCATION_SYNC_SECONDS, so get_current_user only does a dict lookup.
+# A revocation is immediate in the worker that made it and reaches the other
+# workers within one sync interval. Entries are dropped once the token itself
+# has expired, so the set holds at most ACCESS_TOKEN_EXPIRE_MINUTES of revocations.
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import AsyncSessionLocal
+from app.core.settings import settings
+from app.models.refresh_token import RefreshToken, RevokedAccessToken
+
+logger = logging.getLogger(__name__)
+
+
+class TokenRevocationList:
+    """Per-worker set of revoked access-token jtis, synced from the database"""
+
+    # revoked_at is the transaction start time, so a revocation that began just
+    # before our last sync can commit with an older timestamp (see SyncService)
+    SYNC_OVERLAP = timedelta(seconds=5)
+    # Expired rows are useless; one worker deleting them now and then is plenty
+    PURGE_INTERVAL = 3600
+    # Used refresh tokens are kept a little past expiry for reuse detection
+    REFRESH_TOKEN_RETENTION = timedelta(days=1)
+
+    def __init__(self):
+        self.revoked: Dict[str, float] = {}  # jti -> token expiry (unix time)
+        self.cursor: Optional[datetime] = None
+        self.last_purge = time.monotonic()
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        """O(1) check for the request path; tokens without a jti predate revocation"""
+        return jti is not None and jti in self.revoked
+
+    def add(self, revoked: Iterable[Tuple[str, datetime]]):
+        """Record revocations made by this worker without waiting for the next sync"""
+        for jti, expires_at in revoked:
+            self.revoked[jti] = expires_at.timestamp()
+
+    async def sync(self, db: AsyncSession):
+        """Pick up revocations made by other workers since the last sync"""
+        # Cursor from the database clock, taken before reading
+        cursor = await db.scalar(select(func.now()))
+
+        query = select(RevokedAccessToken.jti, RevokedAccessToken.expires_at).where(
+            RevokedAccessToken.expires_at > cursor
+        )
+        if self.cursor is not None:
+            query = query.where(RevokedAccessToken.revoked_at > self.cursor - self.SYNC_OVERLAP)
+        self.add((await db.execute(query)).all())
+        self.cursor = cursor
+
+        now = time.time()
+        self.revoked = {jti: expires for jti, expires in self.revoked.items() if expires > now}
+
+    async def purge_expired(self, db: AsyncSession):
+        """Delete revocations and refresh tokens nobody can present any more"""
+        now = await db.scalar(select(func.now()))
+        await db.execute(delete(RevokedAccessToken).where(RevokedAccessToken.expires_at < now))
+        await db.execute(delete(RefreshToken).where(RefreshToken.expires_at < now - self.REFRESH_TOKEN_RETENTION))
+        await db.commit()
+
+    async def run(self):
+        """Background sync loop, started from the app lifespan (one per worker)"""
+        while True:
+            await asyncio.sleep(settings.TOKEN_REVOCATION_SYNC_SECONDS)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await self.sync(db)
+                    if time.monotonic() - self.last_purge > self.PURGE_INTERVAL:
+                        self.last_purge = time.monotonic()
+                        await self.purge_expired(db)
+            except Exception as e:
+                # Keep serving with the set we have; the next sync catches up
+                logger.error(f"Token revocation sync failed: {e}")
+
+
+# Global instance
+token_revocations = TokenRevocationList()
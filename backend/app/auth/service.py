@@ -1,37 +1,223 @@
 # app/auth/service.py
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+import asyncio
+import hashlib
+import secrets
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List, Tuple
 from passlib.context import CryptContext
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
-from fastapi import Depends, HTTPException, status
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from app.core.settings import settings
-from app.core.database import get_db
+from app.core.database import get_async_db, route_user_reads
 from app.models.user import User
+from app.models.refresh_token import RefreshToken, RevokedAccessToken
+from app.auth.revocation import token_revocations
+from app.services.cache_service import cache_service, user_tag
+
+
+class Principal(BaseModel):
+    """
+    The authenticated user as routes see it: a cached snapshot of the user row,
+    not an ORM object (don't add it to a session or touch relationships)
+    """
+    id: int
+    email: str
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    subscription_tier: str
+    is_active: bool
+    token_version: int
+    model_config = ConfigDict(from_attributes=True)
+
+    @property
+    def full_name(self) -> str:
+        """Same fallbacks as User.full_name"""
+        if self.first_name and self.last_name:
+            return f"{self.first_name} {self.last_name}"
+        return self.first_name or self.last_name or self.email.split("@")[0]
+
+
+# "Not found / revoked" is cached too, so a revoked token doesn't hit the database on every call
+optional_principal_adapter = TypeAdapter(Optional[Principal])
 
 
 class AuthService:
+    # Two tabs refreshing at once present the same token; the loser gets a 401
+    # instead of the whole family being revoked as stolen
+    REFRESH_REUSE_GRACE = timedelta(seconds=10)
+
     def __init__(self):
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        rounds = settings.BCRYPT_ROUNDS
+        # min = max = default: a hash made at any other cost is rehashed on its next login
+        self.pwd_context = CryptContext(
+            schemes=["bcrypt"], deprecated="auto",
+            bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds, bcrypt__max_rounds=rounds
+        )
+        # bcrypt releases the GIL, so a few threads keep 100-300 ms of hashing
+        # per call off the event loop; password_jobs caps how many may queue
+        self.password_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+        )
+        self.password_jobs = 0
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        """Verify a password against its hash."""
+        """Verify a password against its hash (blocking; scripts only, routes use the async variants)."""
         return self.pwd_context.verify(plain_password, hashed_password)
 
     def hash_password(self, password: str) -> str:
-        """Hash a password for storing."""
+        """Hash a password for storing (blocking; scripts only, routes use the async variants)."""
         return self.pwd_context.hash(password)
 
-    def create_access_token(self, data: Dict[str, Any]) -> str:
+    async def _run_password_job(self, fn, *args):
+        """Run bcrypt work in the password pool; 503 when too many requests are already waiting"""
+        if self.password_jobs >= settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many sign-in attempts in progress, please retry",
+                headers={"Retry-After": "1"},
+            )
+        self.password_jobs += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.password_executor, fn, *args)
+        finally:
+            self.password_jobs -= 1
+
+    async def hash_password_async(self, password: str) -> str:
+        """Hash a password for storing, off the event loop."""
+        return await self._run_password_job(self.pwd_context.hash, password)
+
+    async def verify_and_update_password(self, plain_password: str,
+                                         hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password off the event loop; also returns a new hash if the stored one uses an old cost."""
+        return await self._run_password_job(self.pwd_context.verify_and_update, plain_password, hashed_password)
+
+    @staticmethod
+    def token_claims(user: User) -> Dict[str, Any]:
+        """
+        Claims for a user's access token. tv must match users.token_version;
+        bumping it (revoke_tokens, deactivate_user) invalidates every token issued before.
+        """
+        return {
+            "sub": str(user.id),
+            "email": user.email,
+            "tier": user.subscription_tier,
+            "tv": user.token_version or 0,
+        }
+
+    def create_access_token(self, data: Dict[str, Any], expires_at: Optional[datetime] = None) -> str:
         """Create a new JWT access token."""
         to_encode = data.copy()
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = expires_at or datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         to_encode.update({"exp": expire})
         return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
+    @staticmethod
+    def hash_refresh_token(refresh_token: str) -> str:
+        """Refresh tokens are random, so an unsalted SHA-256 is enough to store them"""
+        return hashlib.sha256(refresh_token.encode()).hexdigest()
+
+    async def issue_tokens(self, db: AsyncSession, user: User, family_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Issue an access token (with a jti, so it can be revoked) and a refresh token.
+        A new login starts a family; refreshing continues the token's family. Commits.
+        """
+        now = datetime.now(timezone.utc)
+        jti = uuid.uuid4().hex
+        access_expires_at = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        refresh_token = secrets.token_urlsafe(32)
+
+        db.add(RefreshToken(
+            user_id=user.id,
+            family_id=family_id or uuid.uuid4().hex,
+            token_hash=self.hash_refresh_token(refresh_token),
+            access_jti=jti,
+            access_expires_at=access_expires_at,
+            expires_at=now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        ))
+        await db.commit()
+
+        return {
+            "access_token": self.create_access_token({**self.token_claims(user), "jti": jti}, access_expires_at),
+            "refresh_token": refresh_token,
+            "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        }
+
+    async def rotate_refresh_token(self, db: AsyncSession, refresh_token: str) -> Optional[Tuple[User, Dict[str, Any]]]:
+        """
+        Exchange a refresh token for new tokens; the old one can't be used again.
+        Presenting an already-rotated token revokes its whole family (it was stolen,
+        or the client that rotated it was) and returns None like any invalid token.
+        """
+        token = await db.scalar(
+            select(RefreshToken)
+            .where(RefreshToken.token_hash == self.hash_refresh_token(refresh_token))
+            .with_for_update()
+        )
+        now = datetime.now(timezone.utc)
+        if token is None or token.revoked_at is not None or token.expires_at <= now:
+            return None
+
+        if token.used_at is not None:
+            if now - token.used_at > self.REFRESH_REUSE_GRACE:
+                await self.revoke_token_family(db, token.family_id)
+            return None
+
+        user = await db.get(User, token.user_id)
+        if user is None or not user.is_active:
+            return None
+
+        token.used_at = now
+        return user, await self.issue_tokens(db, user, token.family_id)
+
+    async def _revoke_refresh_tokens(self, db: AsyncSession, *criteria) -> List[Tuple[str, datetime]]:
+        """
+        Revoke matching refresh tokens and the unexpired access tokens issued with them.
+        Returns the revoked (jti, expiry) pairs; the caller commits, then adds them to token_revocations.
+        """
+        now = datetime.now(timezone.utc)
+        rows = (await db.execute(
+            update(RefreshToken)
+            .where(*criteria, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=now)
+            .returning(RefreshToken.user_id, RefreshToken.access_jti, RefreshToken.access_expires_at)
+        )).all()
+
+        live = [row for row in rows if row.access_expires_at > now]
+        if live:
+            await db.execute(
+                pg_insert(RevokedAccessToken)
+                .values([
+                    {"jti": row.access_jti, "user_id": row.user_id, "expires_at": row.access_expires_at}
+                    for row in live
+                ])
+                .on_conflict_do_nothing(index_elements=[RevokedAccessToken.jti])
+            )
+        return [(row.access_jti, row.access_expires_at) for row in live]
+
+    async def revoke_token_family(self, db: AsyncSession, family_id: str) -> None:
+        """Sign out one login: its refresh tokens and any access token issued from them"""
+        revoked = await self._revoke_refresh_tokens(db, RefreshToken.family_id == family_id)
+        await db.commit()
+        token_revocations.add(revoked)
+
+    async def logout(self, db: AsyncSession, refresh_token: str) -> None:
+        """Revoke the family of the presented refresh token; unknown tokens are ignored"""
+        family_id = await db.scalar(
+            select(RefreshToken.family_id)
+            .where(RefreshToken.token_hash == self.hash_refresh_token(refresh_token))
+        )
+        if family_id is not None:
+            await self.revoke_token_family(db, family_id)
+
     def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
         """Verify and decode a JWT token."""
         try:
@@ -40,17 +226,25 @@ class AuthService:
         except JWTError:
             return None
 
-    def create_user(self, db: Session, email: str, password: str, first_name: str = None, last_name: str = None) -> \
+    def verify_request_token(self, request: Request, token: str) -> Optional[Dict[str, Any]]:
+        """verify_token once per request; the rate limiter needs the claims before get_current_user"""
+        cached = getattr(request.state, "token_claims", None)
+        if cached is None or cached[0] != token:
+            cached = (token, self.verify_token(token))
+            request.state.token_claims = cached
+        return cached[1]
+
+    async def create_user(self, db: AsyncSession, email: str, password: str, first_name: str = None, last_name: str = None) -> \
             Dict[str, Any]:
         """Create a new user account."""
         try:
             # Check if user exists
-            existing_user = db.query(User).filter(User.email == email).first()
+            existing_user = await db.scalar(select(User).where(User.email == email))
             if existing_user:
                 return {"error": "User with this email already exists"}
 
             # Create user
-            hashed_password = self.hash_password(password)
+            hashed_password = await self.hash_password_async(password)
             user = User(
                 email=email,
                 hashed_password=hashed_password,
@@ -62,30 +256,83 @@ class AuthService:
             )
 
             db.add(user)
-            db.commit()
-            db.refresh(user)
+            await db.commit()
 
             return {"message": "User created successfully", "user_id": user.id}
 
+        except HTTPException:
+            raise
         except IntegrityError:
-            db.rollback()
+            await db.rollback()
             return {"error": "User with this email already exists"}
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             return {"error": f"Failed to create user: {str(e)}"}
 
-    def authenticate_user(self, db: Session, email: str, password: str) -> Optional[User]:
+    async def authenticate_user(self, db: AsyncSession, email: str, password: str) -> Optional[User]:
         """Authenticate a user with email and password."""
-        user = db.query(User).filter(User.email == email).first()
+        user = await db.scalar(select(User).where(User.email == email))
+
+        if not user:
+            return None
 
-        if not user or not self.verify_password(password, user.hashed_password):
+        valid, new_hash = await self.verify_and_update_password(password, user.hashed_password)
+        if not valid:
             return None
 
         if not user.is_active:
             return None
 
+        if new_hash:
+            # BCRYPT_ROUNDS changed since this hash was made; store it at the current cost
+            user.hashed_password = new_hash
+            await db.commit()
+
+        return user
+
+    async def change_password(self, db: AsyncSession, user_id: int, current_password: str,
+                              new_password: str) -> Optional[User]:
+        """
+        Replace the password and sign out everywhere (revoke_tokens); returns the user,
+        for new tokens, or None if current_password is wrong
+        """
+        user = await db.get(User, user_id)
+        if user is None or not user.is_active:
+            return None
+        valid, _ = await self.verify_and_update_password(current_password, user.hashed_password)
+        if not valid:
+            return None
+
+        user.hashed_password = await self.hash_password_async(new_password)
+        await self.revoke_tokens(db, user_id)
+        await db.refresh(user)  # token_version was bumped in SQL
         return user
 
+    async def invalidate_principal(self, user_id: int) -> None:
+        """Drop cached principals after a commit that changed the user row"""
+        await cache_service.invalidate(user_tag(user_id))
+
+    async def revoke_tokens(self, db: AsyncSession, user_id: int) -> None:
+        """Invalidate every access token issued to the user so far (sign out everywhere)"""
+        await db.execute(
+            update(User).where(User.id == user_id).values(token_version=User.token_version + 1)
+        )
+        revoked = await self._revoke_refresh_tokens(db, RefreshToken.user_id == user_id)
+        await db.commit()
+        token_revocations.add(revoked)
+        await self.invalidate_principal(user_id)
+
+    async def deactivate_user(self, db: AsyncSession, user_id: int) -> None:
+        """Deactivate an account; its tokens stop working on the next request"""
+        await db.execute(
+            update(User).where(User.id == user_id)
+            .values(is_active=False, token_version=User.token_version + 1)
+        )
+        revoked = await self._revoke_refresh_tokens(db, RefreshToken.user_id == user_id)
+        await db.commit()
+        token_revocations.add(revoked)
+        await self.invalidate_principal(user_id)
+
 
 # Global instance
 auth_service = AuthService()
@@ -96,16 +343,21 @@ security = HTTPBearer()
 
 # Dependency to get current user from JWT token
 async def get_current_user(
+        request: Request,
         credentials: HTTPAuthorizationCredentials = Depends(security),
-        db: Session = Depends(get_db)
-) -> User:
-    """FastAPI dependency to get current authenticated user"""
+        db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """
+    FastAPI dependency to get current authenticated user
+    The principal is cached per (user id, token version) for PRINCIPAL_CACHE_TTL_SECONDS,
+    so most requests don't query users at all
+    """
 
     # Extract token from credentials
     token = credentials.credentials
 
     # Verify token using your existing auth service
-    payload = auth_service.verify_token(token)
+    payload = auth_service.verify_request_token(request, token)
     if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -113,6 +365,14 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # In-memory set lookup, no query (see app/auth/revocation.py)
+    if token_revocations.is_revoked(payload.get("jti")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
     # Get user_id from payload
     user_id = payload.get("sub")
     if user_id is None:
@@ -121,14 +381,30 @@ async def get_current_user(
             detail="Invalid token payload",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    user_id = int(user_id)
+    # Tokens issued before token versions existed carry no tv; they match version 0
+    token_version = payload.get("tv", 0)
+
+    # Lets the session router keep this user's reads on the primary after a write
+    await route_user_reads(db, user_id)
+
+    async def load_principal() -> Optional[Principal]:
+        user = await db.get(User, user_id)
+        if user is None or not user.is_active or user.token_version != token_version:
+            return None
+        # Cached reads for this request are keyed by the version we just loaded
+        db.info["cache_version"] = user.cache_version
+        return Principal.model_validate(user)
 
-    # Get user from database
-    user = db.query(User).filter(User.id == int(user_id)).first()
-    if user is None:
+    principal = await cache_service.get_or_load(
+        "principal", f"{user_id}:{token_version}", [user_tag(user_id)],
+        load_principal, optional_principal_adapter, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+    )
+    if principal is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
+            detail="User not found or token revoked",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    return user
\ No newline at end of file
+    return principal
@@ -0,0 +1,60 @@
+# app/core/address.py
+# Address keys: one spelling per address, for matching imported rows to properties
+#
+# "123 North Main Street, Apt. 4B" and "123 n main st #4b" are the same place.
+# The key lowercases the address, strips accents and punctuation, collapses
+# whitespace and abbreviates street suffixes, directions and unit designators
+# the way USPS does (Publication 28). It's stored in properties.address_key,
+# unique per user, so an import finds every row's existing property with one
+# indexed lookup per batch.
+
+from typing import Optional
+import unicodedata
+
+# USPS standard suffix abbreviations (the common ones)
+STREET_SUFFIXES = {
+    "alley": "aly", "avenue": "ave", "av": "ave", "aven": "ave", "boulevard": "blvd", "boul": "blvd",
+    "circle": "cir", "circ": "cir", "court": "ct", "crt": "ct", "cove": "cv", "crescent": "cres",
+    "crossing": "xing", "drive": "dr", "drv": "dr", "expressway": "expy", "freeway": "fwy",
+    "highway": "hwy", "hiway": "hwy", "lane": "ln", "loop": "loop", "parkway": "pkwy", "pky": "pkwy",
+    "place": "pl", "plaza": "plz", "point": "pt", "road": "rd", "route": "rte", "square": "sq",
+    "street": "st", "str": "st", "strt": "st", "terrace": "ter", "terr": "ter", "trail": "trl",
+    "turnpike": "tpke", "way": "way",
+}
+DIRECTIONS = {
+    "north": "n", "south": "s", "east": "e", "west": "w",
+    "northeast": "ne", "northwest": "nw", "southeast": "se", "southwest": "sw",
+}
+# Every way of saying "unit" becomes "unit": "Apt 4B", "Suite 4B" and "#4B" match
+UNIT_DESIGNATORS = {
+    "apartment", "apt", "suite", "ste", "unit", "no", "number", "room", "rm", "#",
+}
+ABBREVIATIONS = {**STREET_SUFFIXES, **DIRECTIONS}
+
+# Letters (lowercased) and digits are kept, "#" is a word of its own, anything else separates words
+WORD_CHARACTERS = str.maketrans({
+    character: character.lower() if character.isalnum() else " " for character in map(chr, range(128))
+} | {"#": " # "})
+MAX_KEY_LENGTH = 500  # properties.address_key
+
+
+def address_key(address: Optional[str]) -> Optional[str]:
+    """Normalized key for an address; None without one (no address never matches)"""
+    if not address:
+        return None
+    if not address.isascii():  # "Café" -> "Cafe"
+        address = unicodedata.normalize("NFKD", address).encode("ascii", "ignore").decode("ascii")
+    tokens = address.translate(WORD_CHARACTERS).split()
+    if not UNIT_DESIGNATORS.isdisjoint(tokens):
+        words = []
+        for token in tokens:
+            if token in UNIT_DESIGNATORS:
+                if words and words[-1] == "unit":
+                    continue  # "Apt #4B"
+                token = "unit"
+            words.append(token)
+        if words and words[-1] == "unit":
+            words.pop()
+        tokens = words
+    # Imports key every row: the common case (no unit) stays in C
+    return " ".join(map(ABBREVIATIONS.get, tokens, tokens))[:MAX_KEY_LENGTH] or None
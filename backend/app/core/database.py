@@ -1,25 +1,222 @@
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+import itertools
+import time
+from typing import List, Optional
+from uuid import uuid4
+from fastapi import Request
+from redis.exceptions import RedisError
+from sqlalchemy import create_engine, event, text, Select, Table
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import StaticPool, NullPool, QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from .settings import settings
+from .pool_stats import PoolStats, instrumented_pool_class, register_pool_stats
 from ..models.base import Base
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+def _pool_options(pool_class, stats: PoolStats) -> dict:
+    """
+    Pool settings shared by every engine
+    Each gunicorn worker holds its own pool, so the server-side connection
+    count is roughly workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    """
+    if settings.DB_PGBOUNCER:
+        # PgBouncer does the pooling; holding idle connections here would pin server slots
+        return {"poolclass": instrumented_pool_class(NullPool, stats)}
+
+    return {
+        "poolclass": instrumented_pool_class(pool_class, stats),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,  # Refresh connections periodically
+        "pool_pre_ping": True,  # Verify connections before use
+    }
+
+
+def _async_connect_args() -> dict:
+    """asyncpg connection arguments"""
+    if settings.DB_PGBOUNCER:
+        # Transaction pooling hands each transaction a different server
+        # connection, so named prepared statements can't be cached or reused
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return {}
+
+
 # Create database engine
 # Works with any PostgreSQL provider (local, Railway, AWS RDS, etc.)
 engine = create_engine(
     settings.DATABASE_URL,
-    # Connection pool settings
-    pool_pre_ping=True,  # Verify connections before use
-    pool_recycle=300,  # Refresh connections every 5 minutes
     echo=settings.DEBUG,  # Log SQL queries in debug mode
+    **_pool_options(QueuePool, PoolStats("primary")),
 )
+register_pool_stats("primary", engine, engine.pool.stats)
 
 # Create SessionLocal class for database sessions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for the API (asyncpg driver)
+# The sync engine above stays for Alembic, scripts and background workers
+async_engine = create_async_engine(
+    settings.async_database_url,
+    echo=settings.DEBUG,
+    connect_args=_async_connect_args(),
+    **_pool_options(AsyncAdaptedQueuePool, PoolStats("async_primary")),
+)
+register_pool_stats("async_primary", async_engine.sync_engine, async_engine.sync_engine.pool.stats)
+
+# Optional read replicas for safe GETs (DATABASE_REPLICA_URLS)
+# Pointing a replica URL at the primary works as a local stand-in
+async_replica_engines = []
+for _i, _url in enumerate(settings.async_replica_urls):
+    _replica = create_async_engine(
+        _url,
+        echo=settings.DEBUG,
+        connect_args=_async_connect_args(),
+        **_pool_options(AsyncAdaptedQueuePool, PoolStats(f"async_replica_{_i}")),
+    )
+    register_pool_stats(f"async_replica_{_i}", _replica.sync_engine, _replica.sync_engine.pool.stats)
+    async_replica_engines.append(_replica)
+
+_replica_cycle = itertools.cycle(async_replica_engines) if async_replica_engines else None
+
+
+class _RecentWriters:
+    """
+    Users who wrote within the sticky window, so their reads stay on the primary
+    (read-your-writes while replicas catch up). Kept in Redis with an expiry, so
+    a write served by one gunicorn worker keeps the user's next read on the
+    primary in every worker. Without Redis (DATABASE_REPLICA_STICKY_BACKEND=none,
+    or while it's unreachable) every user counts as a recent writer: only
+    anonymous reads go to replicas.
+    """
+
+    KEY_PREFIX = "cribb:wrote:"
+    RETRY_INTERVAL = 30  # Seconds on the primary for everyone before trying Redis again
+
+    def __init__(self, client=None):
+        self._client = client
+        self.down_until = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(async_replica_engines) and settings.DATABASE_REPLICA_STICKY_BACKEND.lower() == "redis"
+
+    def _redis(self):
+        if self._client is None:
+            import redis.asyncio as redis
+            self._client = redis.from_url(
+                settings.REDIS_URL,
+                socket_timeout=settings.DATABASE_REPLICA_STICKY_REDIS_TIMEOUT,
+                socket_connect_timeout=settings.DATABASE_REPLICA_STICKY_REDIS_TIMEOUT
+            )
+        return self._client
+
+    def _available(self) -> bool:
+        return self.enabled and time.monotonic() >= self.down_until
+
+    def _down(self, e: Exception):
+        logger.error(f"Replica stickiness storage unavailable, reading from the primary for {self.RETRY_INTERVAL}s: {e}")
+        self.down_until = time.monotonic() + self.RETRY_INTERVAL
+
+    async def mark(self, user_id: int):
+        if not self._available():
+            return
+        try:
+            await self._redis().set(
+                f"{self.KEY_PREFIX}{user_id}", 1, px=int(settings.DATABASE_REPLICA_STICKY_SECONDS * 1000)
+            )
+        except (RedisError, OSError) as e:
+            self._down(e)
+
+    async def is_sticky(self, user_id: int) -> bool:
+        if not self._available():
+            return True
+        try:
+            return bool(await self._redis().exists(f"{self.KEY_PREFIX}{user_id}"))
+        except (RedisError, OSError) as e:
+            self._down(e)
+            return True
+
+
+recent_writers = _RecentWriters()
+
+
+async def route_user_reads(db: AsyncSession, user_id: int):
+    """
+    Record whose request a session serves: its reads may then go to a replica
+    unless the user wrote within the sticky window (one Redis lookup, only when
+    replicas are configured), and its writes keep the user's next reads on the primary
+    """
+    db.info["user_id"] = user_id
+    if async_replica_engines and db.info.get("read_only"):
+        db.info["sticky"] = await recent_writers.is_sticky(user_id)
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to a replica when it is safe:
+    the request is a GET/HEAD (session.info["read_only"]), the session hasn't
+    written, the statement is a plain SELECT, and the user (if any) is known
+    not to have written within the sticky window (route_user_reads).
+    Everything else goes to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._use_replica(clause):
+            if "replica" not in self.info:
+                # One replica per session keeps a request's reads consistent
+                self.info["replica"] = next(_replica_cycle)
+            return self.info["replica"].sync_engine
+        return async_engine.sync_engine
+
+    def _use_replica(self, clause) -> bool:
+        if _replica_cycle is None or self._flushing:
+            return False
+        if not self.info.get("read_only") or self.info.get("wrote"):
+            return False
+        if not isinstance(clause, Select) or clause._for_update_arg is not None:
+            return False
+        if self.info.get("user_id"):
+            return not self.info.get("sticky", True)
+        return True
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_session_wrote(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _mark_session_committed(session):
+    # Recorded for the user when the request's session closes (get_async_db); this hook can't await
+    if session.info.get("wrote"):
+        session.info["committed_write"] = True
+
+
+async def record_user_write(db: AsyncSession):
+    """A session that committed a write keeps its user's next reads on the primary, in every worker"""
+    user_id: Optional[int] = db.info.get("user_id")
+    if user_id and db.info.get("committed_write"):
+        await recent_writers.mark(user_id)
+
+
+# expire_on_commit=False: async sessions can't lazy-load expired attributes,
+# and routes serialize objects after the service has committed
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 
 def get_database_url() -> str:
     """Get the current database URL (for debugging)"""
@@ -57,8 +254,8 @@ def drop_tables():
 
 def get_db():
     """
-    Dependency to get database session
-    This will be used in FastAPI routes
+    Dependency to get a synchronous database session
+    Used by scripts and background workers; API routes use get_async_db
     """
     db = SessionLocal()
     try:
@@ -67,6 +264,52 @@ def get_db():
         db.close()
 
 
+async def get_async_db(request: Request):
+    """
+    Dependency to get an async database session
+    This will be used in FastAPI routes. Reads from GET/HEAD requests may be
+    served by a replica; get_current_user records the user for stickiness.
+    """
+    async with AsyncSessionLocal() as db:
+        db.info["read_only"] = request.method in ("GET", "HEAD")
+        try:
+            yield db
+        finally:
+            # Before the response goes out, so the client's next request already sees it
+            await record_user_write(db)
+
+
+async def copy_rows(db: AsyncSession, table: Table, rows: List[dict]) -> None:
+    """
+    Bulk-load rows with COPY on the session's connection, inside its transaction
+    Several times faster than a multi-row INSERT for thousands of rows, but it
+    bypasses the ORM: Python-side column defaults are filled in here (server
+    defaults apply as usual) and values go through the column types' bind
+    processing (enums as their names). Every row must have the same keys.
+    """
+    if not rows:
+        return
+    connection = await db.connection()
+    dialect = connection.dialect
+    defaults = {
+        column.name: column.default.arg for column in table.columns
+        if column.name not in rows[0] and column.default is not None and column.default.is_scalar
+    }
+    columns = [*rows[0], *defaults]
+
+    # Column by column: one bind processor call per value, no per-row bookkeeping
+    values = []
+    for name in columns:
+        column_values = [row[name] for row in rows] if name not in defaults else [defaults[name]] * len(rows)
+        process = table.c[name].type.dialect_impl(dialect).bind_processor(dialect)
+        values.append(column_values if process is None else [process(value) for value in column_values])
+
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        table.name, records=list(zip(*values)), columns=columns, schema_name=table.schema
+    )
+
+
 def check_database_connection() -> bool:
     """
     Test database connection
@@ -1,4 +1,280 @@
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+# app/core/limiter.py
+# Sliding-window rate limits shared by every worker, per user
+#
+# Requests are counted per authenticated user (the bearer token's sub, decoded
+# without touching the database) and per client IP when signed out, in Redis
+# so that 4 workers enforce one limit instead of four. Each limit uses a
+# sliding window counter: the current fixed window's count plus the previous
+# window's, weighted by how much of it still overlaps the last `seconds`.
+# That is two small keys per client and limit, one Lua round trip per request.
+#
+# Limits are per scope ("default", or a route's function name when it has
+# @limiter.limit) and optionally per subscription tier; RATE_LIMITS overrides
+# any of them. If Redis is unreachable, limits fall back to per-worker
+# counters for a while instead of failing requests.
 
-limiter = Limiter(key_func=get_remote_address, default_limits=["60/minute"])
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+import logging
+import math
+import time
+
+from fastapi import Request
+from fastapi.responses import ORJSONResponse
+
+from app.auth.service import auth_service
+from app.core.metrics import rate_limit_rejections_total
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "cribb:ratelimit"
+UNITS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class RateLimit(NamedTuple):
+    amount: int
+    seconds: int
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        """"10/minute", "1000/day" (plural units are fine)"""
+        amount, unit = value.strip().split("/")
+        return cls(int(amount), UNITS[unit.strip().rstrip("s")])
+
+    def __str__(self) -> str:
+        unit = next(name for name, seconds in UNITS.items() if seconds == self.seconds)
+        return f"{self.amount} per 1 {unit}"
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, limit: RateLimit, retry_after: float):
+        super().__init__(str(limit))
+        self.limit = limit
+        self.retry_after = retry_after
+
+
+def sliding_window(limit: RateLimit, now: float) -> Tuple[int, float]:
+    """Current fixed window index, and the weight of the previous window still inside the sliding one"""
+    index, elapsed = divmod(now, limit.seconds)
+    return int(index), 1 - elapsed / limit.seconds
+
+
+def retry_after(limit: RateLimit, current: int, previous: int, weight: float) -> float:
+    """Seconds until the weighted count drops enough to allow one more request"""
+    remaining = limit.seconds * weight  # Left in the current fixed window
+    if current + 1 > limit.amount or previous == 0:
+        return remaining
+    # previous * w + current + 1 <= amount once w falls to this
+    allowed_weight = (limit.amount - current - 1) / previous
+    return max(remaining - limit.seconds * allowed_weight, 0)
+
+
+class RateLimitStore(ABC):
+    """Counts requests per key"""
+
+    @abstractmethod
+    async def hit(self, key: str, limit: RateLimit) -> Tuple[bool, float]:
+        """Count one request if it's within the limit; returns (allowed, retry after seconds)"""
+        pass
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """
+    Per-worker counters: for development, tests and while Redis is down
+    With several workers each enforces the limit on its own
+    """
+
+    SWEEP_INTERVAL = 60  # Seconds between dropping counters of clients that went quiet
+
+    def __init__(self):
+        self.counters: Dict[Tuple[str, int], Tuple[int, int, int]] = {}  # -> (window index, current, previous)
+        self.last_sweep = time.monotonic()
+
+    async def hit(self, key: str, limit: RateLimit) -> Tuple[bool, float]:
+        now = time.time()
+        index, weight = sliding_window(limit, now)
+        counter_key = (key, limit.seconds)
+
+        last_index, current, previous = self.counters.get(counter_key, (index, 0, 0))
+        if last_index == index - 1:
+            current, previous = 0, current
+        elif last_index != index:
+            current, previous = 0, 0
+
+        if previous * weight + current + 1 > limit.amount:
+            self.counters[counter_key] = (index, current, previous)
+            return False, retry_after(limit, current, previous, weight)
+        self.counters[counter_key] = (index, current + 1, previous)
+
+        if time.monotonic() - self.last_sweep > self.SWEEP_INTERVAL:
+            self.sweep(now)
+        return True, 0
+
+    def sweep(self, now: float):
+        self.last_sweep = time.monotonic()
+        self.counters = {
+            (key, seconds): counter for (key, seconds), counter in self.counters.items()
+            if counter[0] >= now // seconds - 1
+        }
+
+    def clear(self):
+        self.counters.clear()
+
+
+class RedisRateLimitStore(RateLimitStore):
+    """
+    Counters in Redis, shared by every worker and instance
+    Uses REDIS_URL; while it's unreachable, falls back to per-worker counters
+    """
+
+    # KEYS: current and previous window; ARGV: amount, previous window weight, key TTL in ms
+    HIT_SCRIPT = """
+    local current = tonumber(redis.call("get", KEYS[1]) or "0")
+    local previous = tonumber(redis.call("get", KEYS[2]) or "0")
+    if previous * tonumber(ARGV[2]) + current + 1 > tonumber(ARGV[1]) then
+        return {0, current, previous}
+    end
+    current = redis.call("incr", KEYS[1])
+    if current == 1 then
+        redis.call("pexpire", KEYS[1], ARGV[3])
+    end
+    return {1, current, previous}
+    """
+    RETRY_INTERVAL = 30  # Seconds on per-worker counters before trying Redis again
+
+    def __init__(self, client=None):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise Exception("Redis not installed. Install with: pip install redis")
+
+        self.errors = (redis.RedisError, OSError)
+        self.client = client or redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.RATE_LIMIT_REDIS_TIMEOUT,
+            socket_connect_timeout=settings.RATE_LIMIT_REDIS_TIMEOUT
+        )
+        self.hit_script = self.client.register_script(self.HIT_SCRIPT)
+        self.fallback = MemoryRateLimitStore()
+        self.down_until = 0.0
+
+    async def hit(self, key: str, limit: RateLimit) -> Tuple[bool, float]:
+        if time.monotonic() < self.down_until:
+            return await self.fallback.hit(key, limit)
+
+        index, weight = sliding_window(limit, time.time())
+        # Hash tag keeps both windows of a client on one cluster slot
+        prefix = f"{KEY_PREFIX}:{{{key}}}:{limit.seconds}"
+        try:
+            allowed, current, previous = await self.hit_script(
+                keys=[f"{prefix}:{index}", f"{prefix}:{index - 1}"],
+                args=[limit.amount, weight, limit.seconds * 2000]
+            )
+        except self.errors as e:
+            logger.error(f"Rate limit storage unavailable, using per-worker limits for {self.RETRY_INTERVAL}s: {e}")
+            self.down_until = time.monotonic() + self.RETRY_INTERVAL
+            return await self.fallback.hit(key, limit)
+
+        if allowed:
+            return True, 0
+        return False, retry_after(limit, current, previous, weight)
+
+
+class RateLimiter:
+    """Resolves the limit for a request and enforces it against the store"""
+
+    def __init__(self, store: RateLimitStore, default_limit: str, overrides: str = "", enabled: bool = True):
+        self.store = store
+        self.enabled = enabled
+        self.limits: Dict[Tuple[str, Optional[str]], RateLimit] = {("default", None): RateLimit.parse(default_limit)}
+        self.overrides = self.parse_limits(overrides)
+        self.limits.update(self.overrides)
+        self.route_scopes: Dict[Callable, str] = {}
+
+    @staticmethod
+    def parse_limits(value: str) -> Dict[Tuple[str, Optional[str]], RateLimit]:
+        """"default=60/minute,default@pro=300/minute,login=10/minute" -> {(scope, tier): limit}"""
+        limits = {}
+        for item in value.split(","):
+            if not item.strip():
+                continue
+            name, limit = item.split("=")
+            scope, _, tier = name.strip().partition("@")
+            limits[(scope, tier or None)] = RateLimit.parse(limit)
+        return limits
+
+    def limit(self, value: str, scope: Optional[str] = None, **tiers: str):
+        """
+        Decorator: the route gets its own limit instead of the default
+        Per-tier limits as keyword arguments (pro="30/minute"); RATE_LIMITS overrides any of them
+        """
+        def decorator(func):
+            name = scope or func.__name__
+            self.route_scopes[func] = name
+            for tier, limit in [(None, value), *tiers.items()]:
+                if (name, tier) not in self.overrides:
+                    self.limits[(name, tier)] = RateLimit.parse(limit)
+            return func
+        return decorator
+
+    @staticmethod
+    def identify(request: Request) -> Tuple[str, Optional[str]]:
+        """Who to count the request against: the signed-in user and their tier, else the client IP"""
+        authorization = request.headers.get("authorization", "")
+        if authorization[:7].lower() == "bearer ":
+            payload = auth_service.verify_request_token(request, authorization[7:])
+            if payload and payload.get("sub"):
+                return f"user:{payload['sub']}", payload.get("tier")
+        # The real client behind a trusted proxy (forwarded_allow_ips in gunicorn.conf.py)
+        return f"ip:{request.client.host if request.client else 'unknown'}", None
+
+    def get_limit(self, scope: str, tier: Optional[str]) -> RateLimit:
+        return self.limits.get((scope, tier)) or self.limits.get((scope, None)) or self.limits[("default", None)]
+
+    async def check(self, request: Request):
+        """Count the request; raises RateLimitExceeded over the limit"""
+        if not self.enabled:
+            return
+        route = request.scope.get("route")
+        scope = self.route_scopes.get(getattr(route, "endpoint", None), "default")
+        identity, tier = self.identify(request)
+        limit = self.get_limit(scope, tier)
+
+        allowed, retry = await self.store.hit(f"{scope}:{identity}", limit)
+        if not allowed:
+            rate_limit_rejections_total.labels(getattr(route, "path", "unmatched")).inc()
+            raise RateLimitExceeded(limit, retry)
+
+
+def get_rate_limit_store() -> RateLimitStore:
+    """
+    Factory function to get the appropriate rate limit store
+    Change backend by changing environment variable!
+    """
+    if settings.RATE_LIMIT_BACKEND.lower() == "redis":
+        return RedisRateLimitStore()
+    return MemoryRateLimitStore()
+
+
+# Global limiter instance
+limiter = RateLimiter(
+    get_rate_limit_store(),
+    default_limit="60/minute",
+    overrides=settings.RATE_LIMITS,
+    enabled=settings.RATE_LIMIT_ENABLED
+)
+
+
+async def rate_limit(request: Request):
+    """Router dependency enforcing the limits (see main.py)"""
+    await limiter.check(request)
+
+
+def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded) -> ORJSONResponse:
+    """429 with Retry-After"""
+    return ORJSONResponse(
+        {"error": f"Rate limit exceeded: {exc.limit}"},
+        status_code=429,
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))}
+    )
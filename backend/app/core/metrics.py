@@ -0,0 +1,116 @@
+# app/core/metrics.py
+# Prometheus metrics: route latency, in-flight requests, DB pools, cache, rate limits, calculator
+#
+# Under gunicorn every worker writes its samples to PROMETHEUS_MULTIPROC_DIR
+# (set up in gunicorn.conf.py before the workers fork), and /metrics merges
+# them, so a scrape sees the whole server no matter which worker answers.
+# Without the variable (plain uvicorn) the in-process registry is used.
+
+import os
+import time
+from contextlib import contextmanager
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Pool waits are mostly ~0; the tail is what matters
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CALCULATOR_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# HTTP
+http_requests_total = Counter(
+    "http_requests_total", "HTTP requests by route template and status", ["method", "route", "status"]
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ["method", "route"],
+    buckets=LATENCY_BUCKETS
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress", "Requests currently being handled", ["method"], multiprocess_mode="livesum"
+)
+
+# Database pools (mirrors app.core.pool_stats, which stays per-process)
+db_pool_checked_out = Gauge(
+    "db_pool_checked_out", "Connections currently checked out", ["pool"], multiprocess_mode="livesum"
+)
+db_pool_checkouts_total = Counter("db_pool_checkouts_total", "Connection checkouts", ["pool"])
+db_pool_connects_total = Counter("db_pool_connects_total", "New DBAPI connections opened", ["pool"])
+db_pool_invalidations_total = Counter("db_pool_invalidations_total", "Connections invalidated", ["pool"])
+db_pool_timeouts_total = Counter("db_pool_timeouts_total", "Checkouts that hit DB_POOL_TIMEOUT", ["pool"])
+db_pool_wait_seconds = Histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pooled connection", ["pool"], buckets=POOL_WAIT_BUCKETS
+)
+
+# Caches and rate limiting
+cache_requests_total = Counter("cache_requests_total", "Cache lookups by cache and result (hit/miss)",
+                               ["cache", "result"])
+rate_limit_rejections_total = Counter("rate_limit_rejections_total", "Requests rejected with 429", ["route"])
+
+# Financial calculator
+calculator_duration_seconds = Histogram(
+    "calculator_duration_seconds", "Financial calculation time by operation", ["operation"],
+    buckets=CALCULATOR_BUCKETS
+)
+calculator_batch_size = Histogram(
+    "calculator_batch_size", "Properties per calculator batch", ["operation"],
+    buckets=(1, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000)
+)
+
+
+@contextmanager
+def time_calculator(operation: str, batch_size: int = 1):
+    """Time a calculator call or batch: `with time_calculator("portfolio_metrics", len(properties)):`"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        calculator_duration_seconds.labels(operation).observe(time.perf_counter() - start)
+        calculator_batch_size.labels(operation).observe(batch_size)
+
+
+def render_metrics() -> tuple:
+    """Exposition body and content type, merged across worker processes when multiprocess"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request count, latency and in-flight requests
+    Labelled by route template (/properties/{property_id}), never the raw path
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = http_requests_in_progress.labels(method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            route = scope.get("route")
+            # Unmatched paths (404 scans) share one label to keep cardinality bounded
+            template = getattr(route, "path_format", None) or getattr(route, "path", None) or "unmatched"
+            http_request_duration_seconds.labels(method, template).observe(time.perf_counter() - start)
+            http_requests_total.labels(method, template, str(status_code)).inc()
@@ -0,0 +1,166 @@
+# app/core/pool_stats.py
+# Connection pool telemetry: checkouts, wait times, overflow and timeouts
+
+import threading
+import time
+from typing import Dict, List, Type
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+from app.core import metrics
+
+# Upper bounds (seconds) of the connection wait histogram buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+
+class PoolStats:
+    """
+    Per-process counters for one engine's pool, fed by pool events
+    Each gunicorn worker has its own pool, so these are per worker
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * len(WAIT_BUCKETS)
+        self.engine = None
+
+        # Same events, exported to Prometheus (aggregated across workers)
+        self._checked_out_gauge = metrics.db_pool_checked_out.labels(name)
+        self._checkouts_counter = metrics.db_pool_checkouts_total.labels(name)
+        self._connects_counter = metrics.db_pool_connects_total.labels(name)
+        self._invalidations_counter = metrics.db_pool_invalidations_total.labels(name)
+        self._timeouts_counter = metrics.db_pool_timeouts_total.labels(name)
+        self._wait_histogram = metrics.db_pool_wait_seconds.labels(name)
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+        self._connects_counter.inc()
+
+    def record_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+        self._checkouts_counter.inc()
+        self._checked_out_gauge.inc()
+
+    def record_checkin(self):
+        with self._lock:
+            if self.checked_out == 0:
+                return
+            self.checked_out -= 1
+        self._checked_out_gauge.dec()
+
+    def record_invalidate(self):
+        with self._lock:
+            self.invalidations += 1
+        self._invalidations_counter.inc()
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+        self._timeouts_counter.inc()
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.wait_count += 1
+            self.wait_sum += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            for i, bound in enumerate(WAIT_BUCKETS):
+                if seconds <= bound:
+                    self.wait_buckets[i] += 1
+                    break
+        self._wait_histogram.observe(seconds)
+
+    def snapshot(self) -> dict:
+        """Current values as a JSON-friendly dict"""
+        pool = self.engine.pool if self.engine is not None else None
+
+        with self._lock:
+            cumulative = 0
+            histogram = []
+            for bound, count in zip(WAIT_BUCKETS, self.wait_buckets):
+                cumulative += count
+                histogram.append({"le": "+Inf" if bound == float("inf") else bound, "count": cumulative})
+
+            data = {
+                "pool_class": type(pool).__name__ if pool is not None else None,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait": {
+                    "count": self.wait_count,
+                    "sum_seconds": self.wait_sum,
+                    "max_seconds": self.wait_max,
+                    "histogram": histogram,
+                },
+            }
+
+        # QueuePool variants report their own sizing; NullPool doesn't
+        if pool is not None and hasattr(pool, "overflow"):
+            data.update({
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            })
+        return data
+
+
+# Stats for every engine created in this process, by name ("primary", "async_primary", ...)
+pool_stats: Dict[str, PoolStats] = {}
+
+
+class _TimedPoolMixin:
+    """Times how long callers wait for a connection and counts pool timeouts"""
+    stats: PoolStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record_timeout()
+            raise
+        finally:
+            self.stats.record_wait(time.perf_counter() - start)
+
+
+def instrumented_pool_class(pool_class: Type[Pool], stats: PoolStats) -> Type[Pool]:
+    """
+    Subclass a pool class with wait timing bound to `stats`
+    The stats live on the class so they survive Pool.recreate() after dispose()
+    """
+    return type(f"Instrumented{pool_class.__name__}", (_TimedPoolMixin, pool_class), {"stats": stats})
+
+
+def register_pool_stats(name: str, engine: Engine, stats: PoolStats) -> PoolStats:
+    """Attach pool event hooks for a (sync) engine; pass async_engine.sync_engine for async engines"""
+    stats.engine = engine
+
+    event.listen(engine, "connect", lambda dbapi_conn, record: stats.record_connect())
+    event.listen(engine, "checkout", lambda dbapi_conn, record, proxy: stats.record_checkout())
+    event.listen(engine, "checkin", lambda dbapi_conn, record: stats.record_checkin())
+    event.listen(engine, "invalidate", lambda dbapi_conn, record, exception: stats.record_invalidate())
+
+    pool_stats[name] = stats
+    return stats
+
+
+def get_pool_stats() -> List[dict]:
+    """Snapshot of every registered pool in this process"""
+    return [{"name": name, **stats.snapshot()} for name, stats in pool_stats.items()]
@@ -0,0 +1,164 @@
+# app/core/query_stats.py
+# Per-request SQL counting: statement count, DB time, N+1 detection and query budgets
+
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|%s|:\w+|\?")
+_IN_LIST = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_NUMBER = re.compile(r"\b\d+\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Collapse a SQL statement to its shape: placeholders, literals and IN lists
+    of any length compare equal, so "the same query per row" is one shape
+    """
+    shape = _PLACEHOLDER.sub("?", statement)
+    shape = _NUMBER.sub("?", shape)
+    shape = _IN_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in strict mode when an endpoint issues more statements than its budget"""
+
+
+class RequestQueryStats:
+    """Statements run while handling one request"""
+
+    def __init__(self):
+        self._lock = threading.Lock()  # sync dependencies run in the threadpool
+        self.count = 0
+        self.db_time = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement: str, elapsed: float):
+        shape = statement_shape(statement)
+        with self._lock:
+            self.count += 1
+            self.db_time += elapsed
+            self.shapes[shape] += 1
+
+    def repeated_shapes(self, threshold: int):
+        """Shapes run at least `threshold` times - the usual N+1 signature"""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    """Stats for the request being handled, if any"""
+    return _current.get()
+
+
+# Listening on the Engine class covers every engine: sync, async and replicas.
+# The async engine runs these hooks inside greenlet_spawn, which carries the
+# caller's context, so the ContextVar resolves to the right request.
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    starts = conn.info.get("query_start")
+    if stats is not None and starts:
+        stats.record(statement, time.perf_counter() - starts.pop())
+
+
+def query_budget(max_queries: int):
+    """
+    Declare how many SQL statements an endpoint may issue per request
+    Over budget is logged; with QUERY_BUDGET_STRICT it raises QueryBudgetExceeded
+    """
+    def decorator(endpoint):
+        endpoint.__query_budget__ = max_queries
+        return endpoint
+    return decorator
+
+
+class QueryStatsMiddleware:
+    """
+    Pure ASGI middleware: counts statements and DB time per request, reports
+    them in a Server-Timing header and a log line, and flags N+1 patterns
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                # Routing has run by now, so the endpoint is known
+                self._check_budget(scope, stats)
+                status_code = message["status"]
+                if settings.SERVER_TIMING_ENABLED:
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", (
+                        f'db;dur={stats.db_time * 1000:.2f};desc="{stats.count} queries", '
+                        f'app;dur={elapsed_ms:.2f}'
+                    ).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            self._log(scope, stats, status_code, time.perf_counter() - start)
+
+    @staticmethod
+    def _check_budget(scope, stats: RequestQueryStats):
+        budget = getattr(scope.get("endpoint"), "__query_budget__", None)
+        if budget is None or stats.count <= budget:
+            return
+        repeated = "; ".join(f"{n}x {shape[:120]}" for shape, n in stats.repeated_shapes(2)[:3])
+        message = f"{scope['method']} {scope['path']} ran {stats.count} queries, budget is {budget}. Repeated: {repeated}"
+        if settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+    @staticmethod
+    def _log(scope, stats: RequestQueryStats, status_code: int, elapsed: float):
+        extra = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status_code,
+            "query_count": stats.count,
+            "db_ms": round(stats.db_time * 1000, 2),
+            "duration_ms": round(elapsed * 1000, 2),
+        }
+        logger.info(" ".join(f"{k}={v}" for k, v in extra.items()), extra=extra)
+
+        for shape, n in stats.repeated_shapes(settings.QUERY_REPEAT_THRESHOLD):
+            logger.warning(
+                f"Possible N+1: {scope['method']} {scope['path']} ran the same statement {n} times: {shape[:200]}",
+                extra={**extra, "repeated_count": n, "statement_shape": shape}
+            )
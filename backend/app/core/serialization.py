@@ -0,0 +1,95 @@
+# app/core/serialization.py
+# Fast response serialization: prebuilt TypeAdapters, orjson/pydantic-core JSON, MessagePack on request
+
+from typing import Any, Dict, Optional
+import msgpack
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+class MessagePackResponse(Response):
+    """Response rendered as MessagePack for clients that opt in via Accept"""
+    media_type = MSGPACK_MEDIA_TYPES[0]
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, use_bin_type=True)
+
+
+def parse_accept(accept: str) -> Dict[str, float]:
+    """Media ranges of an Accept header with their quality (q defaults to 1; malformed q counts as 0)"""
+    ranges = {}
+    for part in accept.split(","):
+        media_type, *params = [piece.strip() for piece in part.split(";")]
+        if not media_type:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    quality = 0.0
+        ranges[media_type.lower()] = max(quality, ranges.get(media_type.lower(), 0.0))
+    return ranges
+
+
+def accept_quality(ranges: Dict[str, float], media_type: str) -> Optional[float]:
+    """Quality of a media type under the most specific range matching it (type/subtype, type/*, */*)"""
+    main_type = media_type.split("/")[0]
+    for candidate in (media_type, f"{main_type}/*", "*/*"):
+        if candidate in ranges:
+            return ranges[candidate]
+    return None
+
+
+def wants_msgpack(request: Request) -> bool:
+    """
+    Whether the Accept header asks for MessagePack: named explicitly with q > 0, and
+    at least as acceptable as JSON (so "application/msgpack, */*" gets MessagePack,
+    "application/msgpack;q=0.5, application/json" gets JSON)
+    """
+    ranges = parse_accept(request.headers.get("accept", ""))
+    msgpack_quality = max(
+        (ranges[media_type] for media_type in MSGPACK_MEDIA_TYPES if media_type in ranges), default=0.0
+    )
+    return msgpack_quality > 0 and msgpack_quality >= (accept_quality(ranges, JSON_MEDIA_TYPE) or 0.0)
+
+
+def serialize_response(
+        request: Request,
+        adapter: TypeAdapter,
+        content: Any,
+        from_attributes: bool = False,
+        status_code: int = 200
+) -> Response:
+    """
+    Serialize a response body with a prebuilt TypeAdapter.
+
+    Returning a Response directly skips FastAPI's response_model pass, which
+    would dump already-built Pydantic models back to dicts and validate them
+    again. ORM objects are validated exactly once (from_attributes=True);
+    Pydantic models are dumped as-is.
+    """
+    if from_attributes:
+        content = adapter.validate_python(content, from_attributes=True)
+
+    headers = {"Vary": "Accept"}
+
+    if wants_msgpack(request):
+        return MessagePackResponse(
+            adapter.dump_python(content, mode="json"),
+            status_code=status_code,
+            headers=headers
+        )
+
+    return Response(
+        adapter.dump_json(content),
+        status_code=status_code,
+        media_type=JSON_MEDIA_TYPE,
+        headers=headers
+    )
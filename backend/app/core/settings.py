@@ -1,6 +1,7 @@
 # app/core/settings.py
 import os
 from typing import Optional, List
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from pydantic import field_validator, model_validator
 from pydantic_settings import BaseSettings
 
@@ -17,14 +18,68 @@ class Settings(BaseSettings):
     # Database Configuration
     DATABASE_URL: str = os.getenv("DATABASE_URL", "postgresql://localhost:5432/realestate")
 
+    # Optional read replicas (comma-separated URLs); safe GETs are routed to them
+    DATABASE_REPLICA_URLS: str = os.getenv("DATABASE_REPLICA_URLS", "")
+    # After a user writes, their reads stay on the primary for this long (read-your-writes)
+    DATABASE_REPLICA_STICKY_SECONDS: float = float(os.getenv("DATABASE_REPLICA_STICKY_SECONDS", "5"))
+    # Where recent writers are kept, shared by every worker: redis (REDIS_URL), or none (users' reads stay on the primary)
+    DATABASE_REPLICA_STICKY_BACKEND: str = os.getenv("DATABASE_REPLICA_STICKY_BACKEND", "redis")
+    DATABASE_REPLICA_STICKY_REDIS_TIMEOUT: float = float(os.getenv("DATABASE_REPLICA_STICKY_REDIS_TIMEOUT", "0.25"))
+
+    # Connection pool (per worker process)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # Seconds to wait for a connection
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "300"))  # Seconds
+    # Set when DATABASE_URL points at PgBouncer in transaction pooling mode
+    DB_PGBOUNCER: bool = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+
     # Redis Configuration
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
 
+    # Response cache for portfolio and analytics reads (app/services/cache_service.py)
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")  # redis|memory|none
+    CACHE_TTL_SECONDS: int = int(os.getenv("CACHE_TTL_SECONDS", "300"))
+    CACHE_LOCK_TIMEOUT: float = float(os.getenv("CACHE_LOCK_TIMEOUT", "10"))  # Max seconds one request fills an entry
+    CACHE_REDIS_TIMEOUT: float = float(os.getenv("CACHE_REDIS_TIMEOUT", "0.5"))  # Give up on Redis, read the DB
+    CACHE_MEMORY_MAX_ENTRIES: int = int(os.getenv("CACHE_MEMORY_MAX_ENTRIES", "10000"))
+    CACHE_MEMORY_MAX_MB: int = int(os.getenv("CACHE_MEMORY_MAX_MB", "64"))  # Per worker
+
+    # Rate limiting (app/core/limiter.py): sliding window per user, per IP when signed out
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "redis")  # redis|memory
+    RATE_LIMIT_REDIS_TIMEOUT: float = float(os.getenv("RATE_LIMIT_REDIS_TIMEOUT", "0.25"))  # Then per-worker limits
+    # Overrides, comma-separated scope=limit or scope@tier=limit; scope is "default" or a limited route's function
+    RATE_LIMITS: str = os.getenv("RATE_LIMITS", "")
+
     # File Storage Configuration (flexible for any provider)
     FILE_STORAGE_TYPE: str = os.getenv("FILE_STORAGE_TYPE", "local")  # local|s3|spaces
     FILE_STORAGE_PATH: str = os.getenv("FILE_STORAGE_PATH", "./uploads")
     FILE_STORAGE_BUCKET: Optional[str] = os.getenv("FILE_STORAGE_BUCKET")
 
+    # Property imports (app/services/import_service.py): rows validated and inserted per batch, upload size cap
+    IMPORT_CHUNK_ROWS: int = int(os.getenv("IMPORT_CHUNK_ROWS", "5000"))
+    IMPORT_MAX_FILE_MB: int = int(os.getenv("IMPORT_MAX_FILE_MB", "50"))
+    EXPORT_BATCH_ROWS: int = int(os.getenv("EXPORT_BATCH_ROWS", "5000"))  # Rows per cursor fetch (and Parquet row group)
+    # Simulation result arrays (app/services/simulation_service.py): values per GET .../arrays/{name} response
+    SIMULATION_ARRAY_MAX_VALUES: int = int(os.getenv("SIMULATION_ARRAY_MAX_VALUES", "100000"))
+    # Simulations run as background jobs: queued or running at once per user, seconds one may run
+    # (a request may ask for less), and paths per process pool call (cancellation lands between them)
+    SIMULATION_MAX_IN_FLIGHT_PER_USER: int = int(os.getenv("SIMULATION_MAX_IN_FLIGHT_PER_USER", "2"))
+    SIMULATION_TIME_BUDGET_SECONDS: float = float(os.getenv("SIMULATION_TIME_BUDGET_SECONDS", "120"))
+    SIMULATION_BATCH_PATHS: int = int(os.getenv("SIMULATION_BATCH_PATHS", "2000"))
+
+    # Background jobs (app/jobs): a Postgres queue run by `python -m app.jobs.worker` processes
+    JOB_WORKER_CONCURRENCY: int = int(os.getenv("JOB_WORKER_CONCURRENCY", "2"))  # Jobs at once per worker
+    JOB_PROCESS_POOL_SIZE: int = int(os.getenv("JOB_PROCESS_POOL_SIZE", "2"))  # Processes for CPU-bound steps
+    JOB_POLL_SECONDS: float = float(os.getenv("JOB_POLL_SECONDS", "2"))  # Fallback when NOTIFY is unavailable
+    JOB_HEARTBEAT_SECONDS: float = float(os.getenv("JOB_HEARTBEAT_SECONDS", "5"))  # Also how fast cancellation lands
+    JOB_LEASE_SECONDS: float = float(os.getenv("JOB_LEASE_SECONDS", "60"))  # No heartbeat this long: run it again
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_RETRY_DELAY_SECONDS: float = float(os.getenv("JOB_RETRY_DELAY_SECONDS", "10"))  # Doubles per attempt
+    # Live progress (GET /jobs/{id}/events): seconds between keepalive comments on an idle stream
+    PROGRESS_KEEPALIVE_SECONDS: float = float(os.getenv("PROGRESS_KEEPALIVE_SECONDS", "15"))
+
     # Email Configuration (flexible backend)
     EMAIL_BACKEND: str = os.getenv("EMAIL_BACKEND", "console")  # console|smtp|sendgrid|ses
     EMAIL_FROM: str = os.getenv("EMAIL_FROM", "noreply@realestate-app.com")
@@ -32,8 +87,20 @@ class Settings(BaseSettings):
     # JWT Authentication
     SECRET_KEY: str = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production-make-it-long-and-random")
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))
+    # Access tokens are short-lived; clients renew them with a rotating refresh token
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
     REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+    # How often each worker picks up access tokens revoked by other workers (app/auth/revocation.py)
+    TOKEN_REVOCATION_SYNC_SECONDS: float = float(os.getenv("TOKEN_REVOCATION_SYNC_SECONDS", "5"))
+    # Authenticated users are cached this long per worker (or in Redis) instead of loaded per request;
+    # deactivation and revocation invalidate at once where the cache backend is shared
+    PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+
+    # Password hashing: bcrypt cost (existing hashes are upgraded on login) and
+    # the per-worker thread pool that keeps it off the event loop
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_QUEUE: int = int(os.getenv("PASSWORD_HASH_QUEUE", "32"))  # Waiting beyond this gets a 503
 
     # Frontend URL for CORS and email links
     FRONTEND_URL: str = os.getenv("FRONTEND_URL", "http://localhost:3000")
@@ -48,6 +115,16 @@ class Settings(BaseSettings):
     APP_NAME: str = "Cribb Real Estate Management"
     DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
 
+    # Per-request SQL stats: Server-Timing header, N+1 warnings, query budgets
+    SERVER_TIMING_ENABLED: bool = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"
+    QUERY_REPEAT_THRESHOLD: int = int(os.getenv("QUERY_REPEAT_THRESHOLD", "5"))  # Same statement shape N times
+    # Fail requests that exceed their @query_budget instead of logging (tests/CI)
+    QUERY_BUDGET_STRICT: bool = os.getenv("QUERY_BUDGET_STRICT", "false").lower() == "true"
+
+    # Token for /internal endpoints (sent as X-Internal-Token)
+    # Without it, internal endpoints are only available outside production
+    INTERNAL_API_TOKEN: Optional[str] = os.getenv("INTERNAL_API_TOKEN")
+
     # Provider-specific settings (only used when needed)
     AWS_REGION: Optional[str] = os.getenv("AWS_REGION")
     AWS_S3_BUCKET: Optional[str] = os.getenv("AWS_S3_BUCKET")
@@ -67,6 +144,16 @@ class Settings(BaseSettings):
             v = v.replace("postgres://", "postgresql://", 1)
         return v
 
+    @field_validator("DATABASE_REPLICA_URLS")
+    @classmethod
+    def validate_replica_urls(cls, v: str) -> str:
+        """Apply the same postgres:// fix-up to every replica URL"""
+        urls = [url.strip() for url in v.split(",") if url.strip()]
+        return ",".join(
+            url.replace("postgres://", "postgresql://", 1) if url.startswith("postgres://") else url
+            for url in urls
+        )
+
     @field_validator("ALLOWED_ORIGINS")
     @classmethod
     def parse_cors_origins(cls, v: str) -> List[str]:
@@ -105,6 +192,27 @@ class Settings(BaseSettings):
         """Helper property to check if running in production"""
         return self.ENVIRONMENT == "production"
 
+    @staticmethod
+    def to_async_url(url: str) -> str:
+        """
+        Rewrite a PostgreSQL URL for the asyncpg driver.
+        asyncpg takes `ssl` instead of libpq's `sslmode`.
+        """
+        parts = urlsplit(url)
+        scheme = "postgresql+asyncpg"
+        query = [("ssl", v) if k == "sslmode" else (k, v) for k, v in parse_qsl(parts.query)]
+        return urlunsplit((scheme, parts.netloc, parts.path, urlencode(query), parts.fragment))
+
+    @property
+    def async_database_url(self) -> str:
+        """DATABASE_URL for the async engine"""
+        return self.to_async_url(self.DATABASE_URL)
+
+    @property
+    def async_replica_urls(self) -> List[str]:
+        """DATABASE_REPLICA_URLS for the async replica engines"""
+        return [self.to_async_url(url) for url in self.DATABASE_REPLICA_URLS.split(",") if url]
+
     @property
     def cors_origins(self) -> List[str]:
         """Get CORS origins as a list (for FastAPI CORS middleware)"""
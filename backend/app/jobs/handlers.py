@@ -0,0 +1,161 @@
+# app/jobs/handlers.py
+# Job kinds the worker runs (registered on import)
+
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.jobs.progress import job_progress
+from app.jobs.queue import JobCancelled, JobContext, JobFailed, job_cancel_hook, job_handler, utcnow
+from app.models.import_session import ImportSession, ImportStatus
+from app.models.job import Job
+from app.models.simulation import Simulation, SimulationStatus
+from app.services.file_service import file_service
+from app.services.import_service import FILE_READERS, ImportService
+from app.services.simulation_service import SimulationService
+
+
+@job_handler("import_properties")
+async def import_properties(context: JobContext, db: AsyncSession) -> Optional[dict]:
+    """
+    Import an uploaded file (payload: import_session_id, file_path, portfolio_id)
+    The upload is deleted once the import is done with it; it's kept while the
+    job may still be retried (or retried by hand after a cancel).
+    """
+    import_session = await db.get(ImportSession, context.payload["import_session_id"])
+    if import_session is None:
+        raise JobFailed("The import no longer exists")
+
+    file_path = context.payload["file_path"]
+    try:
+        file = file_service.open_file(file_path)
+    except FileNotFoundError:
+        raise JobFailed("The uploaded file is no longer available")
+
+    async def progress(db: AsyncSession, rows_read: int, **counters):
+        # How far into a CSV the reader is; Excel files are read out of order (zip), so no percent
+        percent = None
+        if import_session.file_type == "csv" and import_session.file_size:
+            percent = min(99.9, file.tell() / import_session.file_size * 100)
+        await context.report_progress(db, rows_read, percent=percent, **counters)
+
+    try:
+        with file:
+            import_session = await ImportService(db, run_cpu=context.run_cpu).import_properties(
+                import_session,
+                FILE_READERS[import_session.file_type](file),
+                context.payload.get("portfolio_id"),
+                cancelled=lambda: context.cancel_requested,
+                progress=progress
+            )
+    except Exception:
+        if context.last_attempt:
+            await file_service.delete_file(file_path)
+        raise
+
+    if import_session.status == ImportStatus.CANCELLED:
+        raise JobCancelled()
+    await file_service.delete_file(file_path)
+    if import_session.status == ImportStatus.FAILED:
+        raise JobFailed(import_session.errors[-1])
+    return {
+        "import_session_id": import_session.id,
+        "successful_imports": import_session.successful_imports,
+        "inserted": import_session.inserted_count,
+        "updated": import_session.updated_count,
+        "unchanged": import_session.unchanged_count,
+        "failed_imports": import_session.failed_imports
+    }
+
+
+@job_progress("import_properties")
+async def import_progress(db: AsyncSession, job: Job) -> dict:
+    """Rows read so far, from the import's committed counters"""
+    import_session = await db.get(ImportSession, job.payload["import_session_id"])
+    if import_session is None:
+        return {}
+    return {
+        "processed": import_session.rows_read,
+        "successful_imports": import_session.successful_imports,
+        "failed_imports": import_session.failed_imports,
+        "percent": 100.0 if import_session.status == ImportStatus.COMPLETED else None
+    }
+
+
+@job_cancel_hook("import_properties")
+async def cancel_import(db: AsyncSession, job: Job):
+    """Cancelled while queued: the import never started"""
+    import_session = await db.get(ImportSession, job.payload["import_session_id"])
+    if import_session is not None:
+        import_session.status = ImportStatus.CANCELLED
+        import_session.completed_at = utcnow()
+
+
+@job_handler("run_simulation")
+async def run_simulation(context: JobContext, db: AsyncSession) -> Optional[dict]:
+    """
+    Run a simulation (payload: simulation_id, time_budget_seconds), its batches in the process pool
+    A failed attempt leaves the simulation PENDING for the next one; the last marks it FAILED.
+    """
+    simulation = await db.get(Simulation, context.payload["simulation_id"])
+    if simulation is None:
+        raise JobFailed("The simulation no longer exists")
+
+    simulation_service = SimulationService(db, run_cpu=context.run_cpu)
+    try:
+        simulation = await simulation_service.run_simulation(
+            simulation,
+            context.payload["time_budget_seconds"],
+            cancelled=lambda: context.cancel_requested,
+            progress=context.report_progress
+        )
+    except Exception as e:
+        await db.rollback()
+        simulation = await db.get(Simulation, context.payload["simulation_id"])
+        if simulation is None:
+            # Deleted while running (delete_simulation cancels the job first): nothing to retry
+            if context.cancel_requested:
+                raise JobCancelled() from e
+            raise JobFailed("The simulation no longer exists") from e
+        if context.last_attempt:
+            await simulation_service.finish(simulation, SimulationStatus.FAILED, f"{type(e).__name__}: {e}")
+        else:
+            simulation.status = SimulationStatus.PENDING
+            await db.commit()
+        raise
+
+    if simulation.status == SimulationStatus.CANCELLED:
+        raise JobCancelled()
+    if simulation.status == SimulationStatus.FAILED:
+        raise JobFailed(simulation.error)
+    return {
+        "simulation_id": simulation.id,
+        "paths": simulation.paths_completed,
+        "final_property_value": simulation.final_property_value,
+        "total_return": simulation.total_return
+    }
+
+
+@job_progress("run_simulation")
+async def simulation_progress(db: AsyncSession, job: Job) -> dict:
+    """Paths simulated so far (committed about once a second); the final percentiles once completed"""
+    simulation = await db.get(Simulation, job.payload["simulation_id"])
+    if simulation is None:
+        return {}
+    fields = {"processed": simulation.paths_completed, "total": (simulation.parameters or {}).get("paths")}
+    if simulation.status == SimulationStatus.COMPLETED:
+        results = await db.scalar(select(Simulation.results).where(Simulation.id == simulation.id)) or {}
+        fields["percentiles"] = {
+            name: results[name] for name in ("final_property_value", "total_cash_flow") if name in results
+        }
+    return fields
+
+
+@job_cancel_hook("run_simulation")
+async def cancel_simulation(db: AsyncSession, job: Job):
+    """Cancelled while queued: the simulation never started"""
+    simulation = await db.get(Simulation, job.payload["simulation_id"])
+    if simulation is not None:
+        simulation.status = SimulationStatus.CANCELLED
+        simulation.completed_at = utcnow()
@@ -0,0 +1,163 @@
+# app/jobs/progress.py
+# Live job progress: published by workers with NOTIFY, fanned out to SSE clients by each API process
+#
+# Workers publish an event with pg_notify in the transaction that records
+# the progress anyway (an import's chunk, a simulation's paths_completed, a
+# job's status change), so it costs no extra transaction and is delivered
+# exactly when the change is visible. Each API process keeps ONE connection
+# LISTENing (ProgressBroker.run, started from the app lifespan) and hands
+# every event to the in-process queues of the clients following that job:
+# a client holds an HTTP connection and a queue, never a database connection,
+# and nobody polls the jobs table per tick.
+#
+# Behind PgBouncer (DB_PGBOUNCER) LISTEN doesn't work; the broker then reads
+# a snapshot of every followed job once per JOB_POLL_SECONDS instead, one
+# round of queries per process however many clients follow them.
+#
+# An event is a JSON object: job_id, kind and status (the job's), then
+# progress fields where they apply: percent, processed and total (rows or
+# paths), and whatever the job kind adds (e.g. interim percentiles).
+
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+import asyncio
+import logging
+
+import orjson
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.core.settings import settings
+from app.models.job import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_CHANNEL = "cribb_job_progress"
+FINISHED = (JobStatus.SUCCEEDED.value, JobStatus.FAILED.value, JobStatus.CANCELLED.value)
+MAX_PAYLOAD_BYTES = 7900  # NOTIFY payloads are limited to 8000 bytes
+
+Snapshot = Callable[[AsyncSession, Job], Awaitable[Dict[str, Any]]]
+
+# Progress fields of a job kind as stored (for a client that just connected), registered by app/jobs/handlers.py
+SNAPSHOTS: Dict[str, Snapshot] = {}
+
+
+def job_progress(kind: str):
+    """Decorator registering `async def snapshot(db, job) -> dict`: a job's progress fields, read from the database"""
+    def decorator(func: Snapshot) -> Snapshot:
+        SNAPSHOTS[kind] = func
+        return func
+    return decorator
+
+
+def progress_event(job_id: int, kind: str, status: str, processed: Optional[int] = None,
+                   total: Optional[int] = None, percent: Optional[float] = None, **details) -> Dict[str, Any]:
+    """An event; percent defaults to processed / total"""
+    event = {"job_id": job_id, "kind": kind, "status": status}
+    if processed is not None:
+        if percent is None and total:
+            percent = min(100.0, processed / total * 100)
+        event.update(processed=processed, total=total, percent=None if percent is None else round(percent, 1))
+    event.update(details)
+    return event
+
+
+async def publish_progress(db: AsyncSession, event: Dict[str, Any]):
+    """NOTIFY is transactional: delivered when the caller commits (or never, if it rolls back)"""
+    payload = orjson.dumps(event)
+    if len(payload) > MAX_PAYLOAD_BYTES:
+        # Keep what identifies it; a client refreshes the rest from GET /jobs/{id}
+        payload = orjson.dumps({name: event.get(name) for name in ("job_id", "kind", "status", "percent")})
+    await db.execute(select(func.pg_notify(PROGRESS_CHANNEL, payload.decode())))
+
+
+async def publish_status(db: AsyncSession, jobs: List[tuple], **details):
+    """Status change events for (job id, kind, status) rows"""
+    for job_id, kind, status in jobs:
+        await publish_progress(db, progress_event(job_id, kind, status.value, **details))
+
+
+async def job_snapshot(db: AsyncSession, job: Job) -> Dict[str, Any]:
+    """A job's latest event, read from the database"""
+    fields = await SNAPSHOTS[job.kind](db, job) if job.kind in SNAPSHOTS else {}
+    return progress_event(job.id, job.kind, job.status.value, **fields)
+
+
+class ProgressBroker:
+    """Per-process fan-out of progress events to the clients following a job"""
+
+    QUEUE_SIZE = 100  # Events a slow client may fall behind by; older ones are dropped
+
+    def __init__(self):
+        self.subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+
+    @asynccontextmanager
+    async def subscribe(self, job_id: int) -> AsyncIterator[asyncio.Queue]:
+        """A queue of a job's events (payloads as published) until the block exits"""
+        queue = asyncio.Queue(self.QUEUE_SIZE)
+        self.subscribers[job_id].add(queue)
+        try:
+            yield queue
+        finally:
+            self.subscribers[job_id].discard(queue)
+            if not self.subscribers[job_id]:
+                del self.subscribers[job_id]
+
+    def dispatch(self, payload: str):
+        """Hand an event to the job's subscribers"""
+        try:
+            job_id = orjson.loads(payload)["job_id"]
+        except (orjson.JSONDecodeError, KeyError, TypeError):
+            logger.warning(f"Ignoring a malformed progress event: {payload[:200]}")
+            return
+        for queue in self.subscribers.get(job_id, ()):
+            if queue.full():
+                # Events are snapshots: the latest matters, the oldest can go
+                queue.get_nowait()
+            queue.put_nowait(payload)
+
+    async def run(self):
+        """LISTEN loop (or the PgBouncer polling fallback), started from the app lifespan; reconnects after errors"""
+        if settings.DB_PGBOUNCER:
+            await self.poll()
+            return
+
+        def notified(connection, pid, channel, payload):
+            self.dispatch(payload)
+
+        while True:
+            try:
+                async with async_engine.connect() as connection:
+                    raw = (await connection.get_raw_connection()).driver_connection
+                    await raw.add_listener(PROGRESS_CHANNEL, notified)
+                    try:
+                        while not raw.is_closed():
+                            await asyncio.sleep(settings.JOB_POLL_SECONDS)
+                    finally:
+                        if not raw.is_closed():
+                            await raw.remove_listener(PROGRESS_CHANNEL, notified)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Listening for job progress failed, reconnecting: {e}")
+            await asyncio.sleep(settings.JOB_POLL_SECONDS)
+
+    async def poll(self):
+        """Without LISTEN: snapshots of the followed jobs, once per JOB_POLL_SECONDS"""
+        while True:
+            await asyncio.sleep(settings.JOB_POLL_SECONDS)
+            if not self.subscribers:
+                continue
+            try:
+                async with AsyncSessionLocal() as db:
+                    jobs = await db.scalars(select(Job).where(Job.id.in_(list(self.subscribers))))
+                    for job in jobs:
+                        self.dispatch(orjson.dumps(await job_snapshot(db, job)).decode())
+            except Exception as e:
+                logger.warning(f"Polling job progress failed: {e}")
+
+
+# Global instance (API processes)
+progress_broker = ProgressBroker()
@@ -0,0 +1,297 @@
+# app/jobs/queue.py
+# Postgres-backed job queue: enqueue, claim, heartbeat, finish, cancel, retry
+#
+# The jobs table is the queue. Workers (app/jobs/worker.py) claim the oldest
+# runnable job with SELECT ... FOR UPDATE SKIP LOCKED, so concurrent workers
+# never block on or double-claim a row, and no broker is needed. Enqueueing
+# sends a NOTIFY on commit so idle workers start at once instead of at their
+# next poll.
+#
+# A running job's worker renews heartbeat_at every JOB_HEARTBEAT_SECONDS; a
+# job without one for JOB_LEASE_SECONDS (the worker was killed) counts as a
+# failed attempt and is retried. Failed attempts retry after
+# JOB_RETRY_DELAY_SECONDS, doubling each time, up to the job's max_attempts.
+# Cancelling a running job only sets cancel_requested: the worker sees it
+# with its next heartbeat and the handler stops at its next checkpoint.
+#
+# Every status change, and the progress handlers report, is published with
+# the transaction that records it (app/jobs/progress.py: live progress).
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+
+from sqlalchemy import and_, case, func, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.settings import settings
+from app.jobs.progress import progress_event, publish_progress, publish_status
+from app.models.job import Job, JobStatus
+
+NOTIFY_CHANNEL = "cribb_jobs"
+
+
+class JobCancelled(Exception):
+    """Raised by a handler (JobContext.check_cancelled) to stop a cancelled job"""
+    pass
+
+
+class JobFailed(Exception):
+    """Raised by a handler for a failure that retrying can't fix"""
+    pass
+
+
+@dataclass
+class JobContext:
+    """What a handler gets besides its database session"""
+    job_id: int
+    kind: str
+    user_id: Optional[int]
+    payload: Dict[str, Any]
+    attempt: int
+    max_attempts: int
+    executor: Any = None  # Process pool for CPU-bound steps (None: threads)
+    cancel_requested: bool = False  # Updated by the worker's heartbeat
+
+    @property
+    def last_attempt(self) -> bool:
+        return self.attempt >= self.max_attempts
+
+    def check_cancelled(self):
+        """Call between steps: raises JobCancelled once cancellation was requested"""
+        if self.cancel_requested:
+            raise JobCancelled()
+
+    async def run_cpu(self, func: Callable, *args):
+        """Run a CPU-bound function (module-level and picklable, as are its arguments) in the process pool"""
+        if self.executor is None:
+            return await asyncio.to_thread(func, *args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def report_progress(self, db: AsyncSession, processed: int, total: Optional[int] = None,
+                              percent: Optional[float] = None, **details):
+        """Publish progress (see progress_event) with db's transaction: call it before committing the work it counts"""
+        await publish_progress(db, progress_event(
+            self.job_id, self.kind, JobStatus.RUNNING.value, processed, total, percent, **details
+        ))
+
+Handler = Callable[[JobContext, AsyncSession], Awaitable[Optional[dict]]]
+CancelHook = Callable[[AsyncSession, Job], Awaitable[None]]
+
+# Job kinds, registered by app/jobs/handlers.py
+HANDLERS: Dict[str, Handler] = {}
+CANCEL_HOOKS: Dict[str, CancelHook] = {}
+
+
+def job_handler(kind: str):
+    """
+    Decorator registering the coroutine that runs jobs of a kind:
+    `async def handler(context, db) -> Optional[dict]`; the dict is stored as the job's result
+    """
+    def decorator(func: Handler) -> Handler:
+        HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+def job_cancel_hook(kind: str):
+    """Decorator registering cleanup for jobs of a kind cancelled before they started"""
+    def decorator(func: CancelHook) -> CancelHook:
+        CANCEL_HOOKS[kind] = func
+        return func
+    return decorator
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def enqueue(db: AsyncSession, kind: str, payload: Optional[dict] = None, user_id: Optional[int] = None,
+                  max_attempts: Optional[int] = None, priority: int = 0) -> Job:
+    """Add a job; it's visible to workers (and they're woken) when the caller commits"""
+    job = Job(
+        kind=kind,
+        payload=payload or {},
+        user_id=user_id,
+        status=JobStatus.QUEUED,
+        priority=priority,
+        attempts=0,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        cancel_requested=False
+    )
+    db.add(job)
+    await db.flush()
+    await notify_workers(db, kind)
+    return job
+
+
+async def notify_workers(db: AsyncSession, kind: str):
+    """NOTIFY is transactional: delivered when the caller commits"""
+    await db.execute(select(func.pg_notify(NOTIFY_CHANNEL, kind)))
+
+
+async def claim_job(db: AsyncSession, worker_id: str, kinds: List[str]) -> Optional[Job]:
+    """Lock the next runnable job and mark it RUNNING (committed); None when there's nothing to do"""
+    job = await db.scalar(
+        select(Job)
+        .where(and_(Job.status == JobStatus.QUEUED, Job.run_after <= func.now(), Job.kind.in_(kinds)))
+        .order_by(Job.priority.desc(), Job.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    if job is None:
+        await db.rollback()
+        return None
+
+    now = utcnow()
+    job.status = JobStatus.RUNNING
+    job.attempts += 1
+    job.locked_by = worker_id
+    job.heartbeat_at = now
+    job.started_at = now
+    await publish_status(db, [(job.id, job.kind, job.status)])
+    await db.commit()
+    return job
+
+
+async def heartbeat(db: AsyncSession, job_ids: List[int]) -> Dict[int, bool]:
+    """Renew the lease of running jobs; returns {job id: cancel requested} for those still ours"""
+    if not job_ids:
+        return {}
+    rows = (await db.execute(
+        update(Job)
+        .where(and_(Job.id.in_(job_ids), Job.status == JobStatus.RUNNING))
+        .values(heartbeat_at=func.now(), updated_at=Job.updated_at)
+        .returning(Job.id, Job.cancel_requested)
+    )).all()
+    await db.commit()
+    return {job_id: cancel_requested for job_id, cancel_requested in rows}
+
+
+def _current_attempt(job_id: int, attempt: int):
+    """The job is still running this attempt: not recovered as stalled (and maybe claimed again) meanwhile"""
+    return and_(Job.id == job_id, Job.status == JobStatus.RUNNING, Job.attempts == attempt)
+
+
+async def finish_job(db: AsyncSession, job_id: int, attempt: int, status: JobStatus,
+                     result: Optional[dict] = None, error: Optional[str] = None):
+    """Record the outcome of a job's attempt"""
+    finished = (await db.execute(
+        update(Job)
+        .where(_current_attempt(job_id, attempt))
+        .values(status=status, result=result, error=error, locked_by=None, completed_at=func.now())
+        .returning(Job.id, Job.kind, Job.status)
+    )).all()
+    await publish_status(db, finished, result=result, error=error)
+    await db.commit()
+
+
+def _status(status: JobStatus):
+    return literal(status, Job.__table__.c.status.type)
+
+
+def _after_failed_attempt(error: str) -> dict:
+    """
+    UPDATE values for a failed attempt: queued again after a backoff while
+    attempts remain (and nobody cancelled it), otherwise finished
+    """
+    retry = and_(Job.attempts < Job.max_attempts, Job.cancel_requested.is_(False))
+    backoff = func.make_interval(0, 0, 0, 0, 0, 0, settings.JOB_RETRY_DELAY_SECONDS * func.power(2, Job.attempts - 1))
+    return {
+        "status": case(
+            (retry, _status(JobStatus.QUEUED)),
+            (Job.cancel_requested, _status(JobStatus.CANCELLED)),
+            else_=_status(JobStatus.FAILED)
+        ),
+        "run_after": case((retry, func.now() + backoff), else_=Job.run_after),
+        "completed_at": case((retry, None), else_=func.now()),
+        "error": error,
+        "locked_by": None,
+    }
+
+
+async def fail_attempt(db: AsyncSession, job_id: int, attempt: int, error: str) -> Optional[JobStatus]:
+    """An attempt failed: retry later or give up (see _after_failed_attempt); returns the new status"""
+    failed = (await db.execute(
+        update(Job)
+        .where(_current_attempt(job_id, attempt))
+        .values(**_after_failed_attempt(error))
+        .returning(Job.id, Job.kind, Job.status)
+    )).all()
+    await publish_status(db, failed, error=error)
+    await db.commit()
+    return failed[0].status if failed else None
+
+
+async def recover_stalled_jobs(db: AsyncSession) -> int:
+    """
+    Jobs whose worker stopped heartbeating count as a failed attempt; returns how many
+    One UPDATE, so workers recovering at the same time can't count a job twice.
+    """
+    recovered = (await db.execute(
+        update(Job)
+        .where(and_(
+            Job.status == JobStatus.RUNNING,
+            Job.heartbeat_at < func.now() - timedelta(seconds=settings.JOB_LEASE_SECONDS)
+        ))
+        .values(**_after_failed_attempt("The worker running this job stopped responding"))
+        .returning(Job.id, Job.kind, Job.status)
+    )).all()
+    await publish_status(db, recovered)
+    await db.commit()
+    return len(recovered)
+
+
+async def get_user_job(db: AsyncSession, job_id: int, user_id: int) -> Optional[Job]:
+    """Get a job (user must own it)"""
+    return await db.scalar(select(Job).where(and_(Job.id == job_id, Job.user_id == user_id)))
+
+
+async def get_user_jobs(db: AsyncSession, user_id: int, limit: int = 50) -> List[Job]:
+    """Most recent jobs first"""
+    return list(await db.scalars(
+        select(Job).where(Job.user_id == user_id).order_by(Job.id.desc()).limit(limit)
+    ))
+
+
+async def cancel_job(db: AsyncSession, job: Job) -> Job:
+    """
+    Cancel a job: at once if it hasn't started, otherwise ask its worker to stop
+    Finished jobs are left as they are.
+    """
+    await db.refresh(job, with_for_update=True)
+    if job.status == JobStatus.QUEUED:
+        job.status = JobStatus.CANCELLED
+        job.cancel_requested = True
+        job.completed_at = utcnow()
+        if job.kind in CANCEL_HOOKS:
+            await CANCEL_HOOKS[job.kind](db, job)
+        await publish_status(db, [(job.id, job.kind, job.status)])
+    elif job.status == JobStatus.RUNNING:
+        job.cancel_requested = True
+        await publish_progress(db, progress_event(job.id, job.kind, job.status.value, cancel_requested=True))
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+async def retry_job(db: AsyncSession, job: Job) -> Optional[Job]:
+    """Run a failed or cancelled job again with a fresh set of attempts; None if it isn't either"""
+    await db.refresh(job, with_for_update=True)
+    if job.status not in (JobStatus.FAILED, JobStatus.CANCELLED):
+        await db.commit()  # Release the lock (a rollback would expire the job)
+        return None
+
+    job.status = JobStatus.QUEUED
+    job.attempts = 0
+    job.cancel_requested = False
+    job.run_after = utcnow()
+    job.error = None
+    job.result = None
+    job.completed_at = None
+    await notify_workers(db, job.kind)
+    await publish_status(db, [(job.id, job.kind, job.status)])
+    await db.commit()
+    await db.refresh(job)
+    return job
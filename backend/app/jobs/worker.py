@@ -0,0 +1,193 @@
+# app/jobs/worker.py
+# Worker process running queued jobs (app/jobs/queue.py)
+#
+# Runs JOB_WORKER_CONCURRENCY jobs at once on one event loop; CPU-bound steps
+# go to a pool of JOB_PROCESS_POOL_SIZE processes (JobContext.run_cpu), so
+# large imports and calculations neither block the loop nor the API, which
+# runs in other processes altogether. Idle slots wait for a NOTIFY on the jobs
+# channel, or poll every JOB_POLL_SECONDS (behind PgBouncer, where LISTEN
+# doesn't work).
+#
+# SIGTERM/SIGINT: stop claiming and let running jobs finish; a second signal
+# interrupts them, and they're queued again as failed attempts. Run with:
+#     python -m app.jobs.worker
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.core.settings import settings
+from app.jobs import handlers  # noqa: F401 (registers the job kinds)
+from app.jobs.queue import (
+    HANDLERS, NOTIFY_CHANNEL, JobCancelled, JobContext, JobFailed,
+    claim_job, fail_attempt, finish_job, heartbeat, recover_stalled_jobs
+)
+from app.models.job import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+
+class JobWorker:
+    def __init__(self, concurrency: Optional[int] = None, kinds: Optional[List[str]] = None):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency = concurrency or settings.JOB_WORKER_CONCURRENCY
+        self.kinds = kinds or list(HANDLERS)
+        self.running: Dict[int, JobContext] = {}
+        self.tasks: Dict[int, asyncio.Task] = {}
+        self.wakeup = asyncio.Event()
+        self.stopping = asyncio.Event()
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    async def run(self):
+        # spawn: forked children would inherit the parent's open database connections
+        self.executor = ProcessPoolExecutor(
+            settings.JOB_PROCESS_POOL_SIZE, mp_context=multiprocessing.get_context("spawn")
+        )
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self.stop)
+
+        logger.info(f"Worker {self.worker_id} running {', '.join(self.kinds)} ({self.concurrency} at once)")
+        background = [asyncio.create_task(self.listen()), asyncio.create_task(self.keep_alive())]
+        try:
+            await asyncio.gather(*(self.slot() for _ in range(self.concurrency)))
+        finally:
+            for task in background:
+                task.cancel()
+            await asyncio.gather(*background, return_exceptions=True)
+            self.executor.shutdown(cancel_futures=True)
+            await async_engine.dispose()
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    def stop(self):
+        if self.stopping.is_set():
+            logger.warning("Interrupting running jobs")
+            for task in self.tasks.values():
+                task.cancel()
+            return
+        logger.info("Stopping: finishing running jobs (signal again to interrupt them)")
+        self.stopping.set()
+        self.wakeup.set()
+
+    async def slot(self):
+        """Claim and run jobs one at a time until stopped"""
+        while not self.stopping.is_set():
+            try:
+                async with AsyncSessionLocal() as db:
+                    job = await claim_job(db, self.worker_id, self.kinds)
+            except Exception:
+                logger.exception("Claiming a job failed")
+                job = None
+
+            if job is None:
+                await self.wait()
+                continue
+            task = asyncio.create_task(self.run_job(job))
+            self.tasks[job.id] = task
+            try:
+                await task
+            finally:
+                self.tasks.pop(job.id, None)
+
+    async def wait(self):
+        try:
+            await asyncio.wait_for(self.wakeup.wait(), settings.JOB_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        if not self.stopping.is_set():
+            self.wakeup.clear()
+
+    async def run_job(self, job: Job):
+        context = JobContext(
+            job_id=job.id, kind=job.kind, user_id=job.user_id, payload=job.payload or {},
+            attempt=job.attempts, max_attempts=job.max_attempts, executor=self.executor
+        )
+        self.running[job.id] = context
+        logger.info(f"Job {job.id} ({job.kind}) started, attempt {job.attempts}/{job.max_attempts}")
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await HANDLERS[job.kind](context, db)
+        except JobCancelled:
+            await self.record(finish_job, context, JobStatus.CANCELLED, error="Cancelled")
+        except JobFailed as e:
+            await self.record(finish_job, context, JobStatus.FAILED, error=str(e))
+        except asyncio.CancelledError:
+            await self.record(fail_attempt, context, "The worker stopped while running this job")
+        except Exception as e:
+            logger.exception(f"Job {job.id} ({job.kind}) failed")
+            await self.record(fail_attempt, context, f"{type(e).__name__}: {e}"[:1000])
+        else:
+            await self.record(finish_job, context, JobStatus.SUCCEEDED, result=result)
+        finally:
+            self.running.pop(job.id, None)
+            logger.info(f"Job {job.id} ({job.kind}) finished")
+
+    async def record(self, outcome, context: JobContext, *args, **kwargs):
+        """Store an attempt's outcome (finish_job or fail_attempt)"""
+        try:
+            async with AsyncSessionLocal() as db:
+                await outcome(db, context.job_id, context.attempt, *args, **kwargs)
+        except Exception:
+            # The lease runs out and the job is retried
+            logger.exception(f"Recording the outcome of job {context.job_id} failed")
+
+    async def keep_alive(self):
+        """Heartbeat running jobs (picking up cancellations) and recover jobs of workers that died"""
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_SECONDS)
+            job_ids = list(self.running)
+            try:
+                async with AsyncSessionLocal() as db:
+                    cancel_requested = await heartbeat(db, job_ids)
+                    recovered = await recover_stalled_jobs(db)
+            except Exception:
+                logger.exception("Job heartbeat failed")
+                continue
+
+            for job_id in job_ids:
+                if job_id in self.running:
+                    # Missing: it was recovered as stalled, so another attempt may already be running
+                    self.running[job_id].cancel_requested = cancel_requested.get(job_id, True)
+            if recovered:
+                logger.warning(f"Requeued {recovered} jobs whose worker stopped responding")
+                self.wakeup.set()
+
+    async def listen(self):
+        """Wake idle slots on NOTIFY (enqueue, retry); reconnects after errors"""
+        if settings.DB_PGBOUNCER:
+            return  # LISTEN needs a session-pooled connection; slots poll instead
+
+        def notified(connection, pid, channel, payload):
+            self.wakeup.set()
+
+        while True:
+            try:
+                async with async_engine.connect() as connection:
+                    raw = (await connection.get_raw_connection()).driver_connection
+                    await raw.add_listener(NOTIFY_CHANNEL, notified)
+                    try:
+                        while not raw.is_closed():
+                            await asyncio.sleep(settings.JOB_POLL_SECONDS)
+                    finally:
+                        if not raw.is_closed():
+                            await raw.remove_listener(NOTIFY_CHANNEL, notified)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Listening for jobs failed, polling until reconnected: {e}")
+            await asyncio.sleep(settings.JOB_POLL_SECONDS)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(JobWorker().run())
+
+
+if __name__ == "__main__":
+    main()
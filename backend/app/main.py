@@ -1,15 +1,25 @@
 # main.py
-from contextlib import asynccontextmanager
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
+from fastapi.responses import ORJSONResponse
 from app.core.settings import settings
-from app.core.limiter import limiter
+from app.core.limiter import RateLimitExceeded, rate_limit, rate_limit_exceeded_handler
+from app.core.metrics import MetricsMiddleware
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.database import AsyncSessionLocal
+from app.auth.revocation import token_revocations
+from app.jobs.progress import progress_broker
 from app.api.auth import router as auth_router
 from app.api.properties import router as properties_router
 from app.api.portfolios import router as portfolios_router
+from app.api.sync import router as sync_router
+from app.api.imports import router as imports_router
+from app.api.jobs import router as jobs_router
+from app.api.exports import router as exports_router
+from app.api.simulations import router as simulations_router
+from app.api.internal import router as internal_router, metrics_router
 
 
 @asynccontextmanager
@@ -24,10 +34,24 @@ async def lifespan(app: FastAPI):
     else:
         print("🔧 Running in DEVELOPMENT mode")
 
+    # Load revoked access tokens before serving, then keep them in sync
+    try:
+        async with AsyncSessionLocal() as db:
+            await token_revocations.sync(db)
+    except Exception as e:
+        print(f"⚠️  Could not load revoked tokens, retrying in the background: {e}")
+    revocation_sync = asyncio.create_task(token_revocations.run())
+    # One LISTEN connection per process feeds every live progress stream (GET /jobs/{id}/events)
+    progress_listener = asyncio.create_task(progress_broker.run())
+
     yield
 
     # Shutdown (if you need cleanup later)
     print("👋 Shutting down...")
+    for task in (revocation_sync, progress_listener):
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
 
 
 app = FastAPI(
@@ -35,12 +59,11 @@ app = FastAPI(
     description="Real Estate Simulation & Portfolio Management App",
     version="1.0.0",
     debug=settings.DEBUG,
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-app.add_middleware(SlowAPIMiddleware)
+app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
 
 # CORS middleware - Now uses settings for flexibility
 app.add_middleware(
@@ -51,10 +74,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Include routers
-app.include_router(auth_router, prefix="/api/v1")
-app.include_router(properties_router, prefix="/api/v1")
-app.include_router(portfolios_router, prefix="/api/v1")
+# Outermost, so their timings cover the whole request
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+# Include routers; API routes are rate limited (health, metrics and internal aren't)
+api_dependencies = [Depends(rate_limit)]
+app.include_router(auth_router, prefix="/api/v1", dependencies=api_dependencies)
+app.include_router(properties_router, prefix="/api/v1", dependencies=api_dependencies)
+app.include_router(portfolios_router, prefix="/api/v1", dependencies=api_dependencies)
+app.include_router(sync_router, prefix="/api/v1", dependencies=api_dependencies)
+app.include_router(imports_router, prefix="/api/v1", dependencies=api_dependencies)
+app.include_router(jobs_router, prefix="/api/v1", dependencies=api_dependencies)
+app.include_router(exports_router, prefix="/api/v1", dependencies=api_dependencies)
+app.include_router(simulations_router, prefix="/api/v1", dependencies=api_dependencies)
+app.include_router(internal_router)
+app.include_router(metrics_router)
 
 
 @app.get("/")
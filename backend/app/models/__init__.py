@@ -2,8 +2,11 @@ from .base import Base
 from .user import User
 from .property import Property, PropertyFinancials, PropertyType, PropertyStatus
 from .portfolio import Portfolio, PortfolioProperty
-from .simulation import Simulation
+from .simulation import Simulation, SimulationArray, SimulationStatus
 from .import_session import ImportSession, ImportStatus
+from .sync_tombstone import SyncTombstone
+from .refresh_token import RefreshToken, RevokedAccessToken
+from .job import Job, JobStatus
 
 __all__ = [
     "Base",
@@ -15,6 +18,13 @@ __all__ = [
     "Portfolio",
     "PortfolioProperty",
     "Simulation",
+    "SimulationArray",
+    "SimulationStatus",
     "ImportSession",
-    "ImportStatus"
+    "ImportStatus",
+    "SyncTombstone",
+    "RefreshToken",
+    "RevokedAccessToken",
+    "Job",
+    "JobStatus"
 ]
\ No newline at end of file
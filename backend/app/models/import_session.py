@@ -11,6 +11,13 @@ class ImportStatus(enum.Enum):
     PROCESSING = "processing"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class ImportMode(enum.Enum):
+    """What an import does with rows whose address matches an existing property (Property.address_key)"""
+    INSERT = "insert"  # Leave the property as it is (re-importing a file adds nothing twice)
+    UPSERT = "upsert"  # Update it with the row's non-empty cells
 
 
 class ImportSession(Base):
@@ -32,11 +39,21 @@ class ImportSession(Base):
 
     # Import status
     status = Column(Enum(ImportStatus), default=ImportStatus.PENDING)
+    mode = Column(Enum(ImportMode), nullable=False, default=ImportMode.INSERT, server_default="INSERT")
+
+    # Background job running the import (app/jobs)
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="SET NULL"))
 
     # Import results
     total_rows = Column(Integer, default=0)
     successful_imports = Column(Integer, default=0)
     failed_imports = Column(Integer, default=0)
+    # successful_imports, split by what happened to the matching property
+    inserted_count = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_count = Column(Integer, nullable=False, default=0, server_default="0")
+    unchanged_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Data rows consumed, blank ones included, committed with each batch: a retried import resumes after them
+    rows_read = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Error tracking
     errors = Column(JSON)  # List of error messages
@@ -0,0 +1,61 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Enum, Boolean, Index
+from sqlalchemy.sql import func
+import enum
+from .base import Base
+
+
+class JobStatus(enum.Enum):
+    """Background job status"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class Job(Base):
+    """
+    A unit of background work (app/jobs). Workers claim queued jobs with
+    SELECT ... FOR UPDATE SKIP LOCKED, so any number of them share the table
+    without a broker, and keep a heartbeat while running: a job whose worker
+    stops heartbeating is queued again.
+    """
+    __tablename__ = "jobs"
+
+    # Primary key
+    id = Column(Integer, primary_key=True)
+
+    # Owner, for the status endpoints (system jobs have none)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True)
+
+    kind = Column(String(50), nullable=False)  # Handler name, e.g. "import_properties"
+    payload = Column(JSON)
+
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.QUEUED)
+    priority = Column(Integer, nullable=False, default=0)  # Higher runs first
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime(timezone=True), nullable=False, server_default=func.now())  # Retry backoff
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+
+    # Claim
+    locked_by = Column(String(100))  # host:pid of the worker running it
+    heartbeat_at = Column(DateTime(timezone=True))
+
+    # Outcome
+    result = Column(JSON)
+    error = Column(Text)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))  # Latest attempt
+    completed_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Claiming (QUEUED, run_after <= now) and finding stalled RUNNING jobs
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+    )
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, kind={self.kind}, status={self.status})>"
@@ -1,6 +1,6 @@
 # backend/app/models/portfolio.py
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .base import Base
@@ -21,7 +21,7 @@ class Portfolio(Base):
     icon = Column(String(50), default="folder")  # Icon name for display
 
     # Folder hierarchy support (for nested folders if needed later)
-    parent_id = Column(Integer, ForeignKey("portfolios.id"), nullable=True)
+    parent_id = Column(Integer, ForeignKey("portfolios.id"), nullable=True, index=True)
     is_default = Column(Boolean, default=False)  # "All Properties" default folder
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -34,6 +34,13 @@ class Portfolio(Base):
     # Self-referential relationship for nested folders (future feature)
     children = relationship("Portfolio", backref="parent", remote_side=[id])
 
+    __table_args__ = (
+        # Delta sync: "what changed for this user since cursor X"
+        Index("ix_portfolios_user_id_updated_at", "user_id", "updated_at"),
+        # Default folder lookup and list views that hide it
+        Index("ix_portfolios_user_id_is_default", "user_id", "is_default"),
+    )
+
     def __repr__(self):
         return f"<Portfolio '{self.name}' (User: {self.user_id})>"
 
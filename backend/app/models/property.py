@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Date, ForeignKey, Text, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Date, ForeignKey, Text, Enum, Index
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 import enum
+from app.core.address import address_key
 from .base import Base
 
 
@@ -36,7 +37,7 @@ class Property(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
 
     # Foreign key to portfolio (folder system)
-    portfolio_id = Column(Integer, ForeignKey("portfolios.id"), nullable=True)
+    portfolio_id = Column(Integer, ForeignKey("portfolios.id"), nullable=True, index=True)
 
     # Basic property information
     name = Column(String(255), nullable=False)  # User-defined property name
@@ -45,6 +46,8 @@ class Property(Base):
     state = Column(String(50))
     zip_code = Column(String(20))
     country = Column(String(50), default="USA")
+    # Normalized address (app/core/address.py), unique per user: imports match rows to properties by it
+    address_key = Column(String(500))
 
     # Property characteristics
     property_type = Column(Enum(PropertyType), nullable=False)
@@ -88,6 +91,26 @@ class Property(Base):
     # New portfolio/folder relationship
     portfolio = relationship("Portfolio", back_populates="properties")
 
+    __table_args__ = (
+        # Delta sync: "what changed for this user since cursor X"
+        Index("ix_properties_user_id_updated_at", "user_id", "updated_at"),
+        # Portfolio reads: "this user's properties in folder X"
+        Index("ix_properties_user_id_portfolio_id", "user_id", "portfolio_id"),
+        # One property per address per user (NULLs, for no address, don't conflict)
+        Index("ix_properties_user_id_address_key", "user_id", "address_key", unique=True),
+    )
+
+    @validates("address")
+    def _set_address_key(self, key, address):
+        # Only a different address gets a new key: the same one resent (or respelled)
+        # keeps the key it has, which is NULL on a duplicate entered before keys were
+        # unique (migration 6f3b8e1d5a27), so such a property stays editable
+        new_key = address_key(address)
+        current = self.__dict__.get("address")  # Not loaded: a new property
+        if current is None or new_key != address_key(current):
+            self.address_key = new_key
+        return address
+
     def __repr__(self):
         return f"<Property(id={self.id}, name={self.name}, type={self.property_type})>"
 
@@ -161,6 +184,10 @@ class PropertyFinancials(Base):
     # Relationships
     property_ref = relationship("Property", back_populates="financials")
 
+    __table_args__ = (
+        Index("ix_property_financials_updated_at", "updated_at"),
+    )
+
     def __repr__(self):
         return f"<PropertyFinancials(property_id={self.property_id}, monthly_rent={self.monthly_rent})>"
 
@@ -0,0 +1,54 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from .base import Base
+
+
+class RefreshToken(Base):
+    """
+    A refresh token, stored as a SHA-256 hash. Each refresh marks the token
+    used and issues a new one in the same family; presenting a used token
+    again means it leaked, and revokes the whole family.
+    """
+    __tablename__ = "refresh_tokens"
+
+    # Primary key
+    id = Column(Integer, primary_key=True)
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # Every token rotated from one login shares a family
+    family_id = Column(String(32), nullable=False, index=True)
+    token_hash = Column(String(64), nullable=False, unique=True)
+
+    # The access token issued with this refresh token, revoked with the family
+    access_jti = Column(String(32), nullable=False)
+    access_expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    used_at = Column(DateTime(timezone=True))  # Rotated
+    revoked_at = Column(DateTime(timezone=True))
+
+    def __repr__(self):
+        return f"<RefreshToken(id={self.id}, user={self.user_id}, family={self.family_id})>"
+
+
+class RevokedAccessToken(Base):
+    """
+    Access tokens revoked before they expire, by jti. Workers keep the
+    unexpired ones in memory (app/auth/revocation.py) and poll for new rows,
+    so request authentication never queries this table.
+    """
+    __tablename__ = "revoked_access_tokens"
+
+    jti = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)  # Of the token; the row can go after this
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_revoked_access_tokens_revoked_at", "revoked_at"),
+    )
+
+    def __repr__(self):
+        return f"<RevokedAccessToken(jti={self.jti}, user={self.user_id})>"
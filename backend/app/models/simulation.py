@@ -1,9 +1,19 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import ARRAY, Column, Integer, String, Float, DateTime, ForeignKey, Text, JSON, LargeBinary, Enum, Index
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
+import enum
 from .base import Base
 
 
+class SimulationStatus(enum.Enum):
+    """Simulation status"""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
 class Simulation(Base):
     """
     Simulation model for storing scenario analysis and Monte Carlo simulations
@@ -24,9 +34,22 @@ class Simulation(Base):
 
     # Simulation parameters (stored as JSON for flexibility)
     parameters = Column(JSON)  # Rent growth, appreciation, etc.
+    # sha256 of what determines the results (simulation_service.parameters_hash): an identical
+    # request while this one is queued or running gets this simulation instead of a new one
+    params_hash = Column(String(64))
 
-    # Simulation results (stored as JSON)
-    results = Column(JSON)  # All calculation results
+    # Run by a background job (app/jobs, "run_simulation")
+    status = Column(Enum(SimulationStatus), nullable=False, default=SimulationStatus.PENDING,
+                    server_default="COMPLETED")
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="SET NULL"))
+    paths_completed = Column(Integer, nullable=False, default=0, server_default="0")
+    error = Column(Text)
+    started_at = Column(DateTime(timezone=True))
+    completed_at = Column(DateTime(timezone=True))
+
+    # Result summary (stored as JSON): the arrays behind it are SimulationArrays.
+    # Only loaded when asked for (undefer), so listing simulations doesn't read it.
+    results = deferred(Column(JSON), raiseload=True)
 
     # Summary metrics
     years_projected = Column(Integer, default=10)
@@ -43,5 +66,32 @@ class Simulation(Base):
     user = relationship("User", back_populates="simulations")
     property = relationship("Property")
 
+    __table_args__ = (
+        # Finding an identical simulation in flight
+        Index("ix_simulations_user_id_params_hash", "user_id", "params_hash"),
+    )
+
+    def __repr__(self):
+        return f"<Simulation(id={self.id}, name={self.name}, type={self.simulation_type})>"
+
+
+class SimulationArray(Base):
+    """
+    A large result array of a simulation (yearly values per path, percentile
+    grids), stored compressed (app/core/array_codec.py) in its own table: the
+    simulations table stays small, and an array is only read when asked for
+    """
+    __tablename__ = "simulation_arrays"
+
+    simulation_id = Column(Integer, ForeignKey("simulations.id", ondelete="CASCADE"), primary_key=True)
+    name = Column(String(100), primary_key=True)  # e.g. "property_value" (paths x years)
+
+    dtype = Column(String(20), nullable=False)  # NumPy dtype string, e.g. "<f4"
+    shape = Column(ARRAY(Integer), nullable=False)
+    codec = Column(String(20), nullable=False)  # array_codec.CODEC
+    data = deferred(Column(LargeBinary, nullable=False), raiseload=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
     def __repr__(self):
-        return f"<Simulation(id={self.id}, name={self.name}, type={self.simulation_type})>"
\ No newline at end of file
+        return f"<SimulationArray(simulation_id={self.simulation_id}, name={self.name}, shape={self.shape})>"
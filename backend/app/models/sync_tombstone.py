@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from .base import Base
+
+
+class SyncTombstone(Base):
+    """
+    Record of a deleted property or portfolio, so delta-sync clients
+    can drop it from their local cache
+    """
+    __tablename__ = "sync_tombstones"
+
+    # Primary key
+    id = Column(Integer, primary_key=True)
+
+    # Owner of the deleted record
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+    # What was deleted
+    entity_type = Column(String(50), nullable=False)  # "property", "portfolio"
+    entity_id = Column(Integer, nullable=False)
+
+    # When it was deleted (compared against the client's sync cursor)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_sync_tombstones_user_id_deleted_at", "user_id", "deleted_at"),
+    )
+
+    def __repr__(self):
+        return f"<SyncTombstone({self.entity_type}={self.entity_id}, user={self.user_id})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy import BigInteger, Column, Integer, String, Boolean, DateTime, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .base import Base
@@ -29,6 +29,11 @@ class User(Base):
 
     subscription_tier = Column(String(20), default="pro", nullable=False)
 
+    # Must match the "tv" claim of access tokens; bumping it revokes every token issued so far
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
+    # Bumped with every write to the user's folders or properties; cached reads are keyed by it
+    cache_version = Column(BigInteger, default=0, server_default="0", nullable=False)
+
     # Verification tokens
     verification_token = Column(String(255))
     reset_password_token = Column(String(255))
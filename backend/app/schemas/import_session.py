@@ -0,0 +1,36 @@
+# app/schemas/import_session.py
+# Pydantic schemas for property imports
+
+from typing import Optional, List
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from app.models.import_session import ImportMode, ImportStatus
+
+
+class ImportSessionResponse(BaseModel):
+    """An import and its progress; counters update as each batch of rows is committed"""
+    id: int
+    filename: str
+    file_type: str
+    file_size: Optional[int] = None
+    status: ImportStatus
+    mode: ImportMode = Field(default=ImportMode.INSERT, description="What rows matching a property's address do: insert skips them, upsert updates it")
+    job_id: Optional[int] = Field(default=None, description="Background job running the import (GET /jobs/{id})")
+    total_rows: int = Field(default=0, description="Rows read so far (blank rows aren't counted)")
+    successful_imports: int = 0
+    inserted_count: int = Field(default=0, description="New properties")
+    updated_count: int = Field(default=0, description="Existing properties updated (upsert)")
+    unchanged_count: int = Field(default=0, description="Rows matching a property they didn't change")
+    failed_imports: int = 0
+    success_rate: float = Field(default=0, description="Imported rows (%)")
+    errors: Optional[List[str]] = Field(default=None, description="Per-row problems, with spreadsheet row numbers")
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Prebuilt adapters for the fast response path (app/core/serialization.py)
+import_session_response_adapter = TypeAdapter(ImportSessionResponse)
+import_session_list_adapter = TypeAdapter(List[ImportSessionResponse])
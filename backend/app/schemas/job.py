@@ -0,0 +1,30 @@
+# app/schemas/job.py
+# Pydantic schemas for background jobs
+
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from app.models.job import JobStatus
+
+
+class JobResponse(BaseModel):
+    """A background job; poll it until its status is SUCCEEDED, FAILED or CANCELLED"""
+    id: int
+    kind: str
+    status: JobStatus
+    attempts: int = Field(default=0, description="Attempts started so far")
+    max_attempts: int
+    cancel_requested: bool = Field(default=False, description="Cancelled while running; stops at its next checkpoint")
+    run_after: Optional[datetime] = Field(default=None, description="Queued: not started before this (retry backoff)")
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = Field(default=None, description="Why the last attempt failed")
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Prebuilt adapters for the fast response path (app/core/serialization.py)
+job_response_adapter = TypeAdapter(JobResponse)
+job_list_adapter = TypeAdapter(List[JobResponse])
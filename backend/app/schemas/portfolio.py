@@ -3,7 +3,7 @@
 
 from typing import Optional, List
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 
 class PortfolioBase(BaseModel):
@@ -87,6 +87,14 @@ class PropertySummary(BaseModel):
         from_attributes = True
 
 
+# Prebuilt adapters for the fast response path (app/core/serialization.py)
+portfolio_response_adapter = TypeAdapter(PortfolioResponse)
+portfolio_with_metrics_adapter = TypeAdapter(PortfolioWithMetrics)
+portfolio_with_metrics_list_adapter = TypeAdapter(List[PortfolioWithMetrics])
+# Cached lookups (app/services/cache_service.py) also cache "not found"
+optional_portfolio_with_metrics_adapter = TypeAdapter(Optional[PortfolioWithMetrics])
+
+
 class PortfolioWithProperties(PortfolioWithMetrics):
     """Portfolio with full property list"""
     properties: List[PropertySummary]
@@ -1,9 +1,9 @@
 # app/schemas/property.py
 # Pydantic schemas for property validation and serialization
 
-from typing import Optional
+from typing import Optional, List
 from datetime import date
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 
 
 class PropertyFinancialsBase(BaseModel):
@@ -107,6 +107,27 @@ class PropertyResponse(PropertyBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class PropertyMetrics(BaseModel):
+    """Schema for the per-property metrics endpoint"""
+    property_id: int
+    monthly_cash_flow: Optional[float] = None
+    annual_cash_flow: Optional[float] = None
+    cap_rate: Optional[float] = None
+    roi: Optional[float] = None
+    monthly_rent: Optional[float] = None
+    monthly_expenses: Optional[float] = None
+    vacancy_rate: Optional[float] = None
+    property_value: Optional[float] = None
+
+
+# Prebuilt adapters for the fast response path (app/core/serialization.py)
+property_response_adapter = TypeAdapter(PropertyResponse)
+property_list_adapter = TypeAdapter(List[PropertyResponse])
+property_metrics_adapter = TypeAdapter(PropertyMetrics)
+# Cached lookups (app/services/cache_service.py) also cache "not found"
+optional_property_metrics_adapter = TypeAdapter(Optional[PropertyMetrics])
+
+
 # Property type enum for validation
 PROPERTY_TYPES = [
     "residential",
@@ -0,0 +1,98 @@
+# app/schemas/simulation.py
+# Pydantic schemas for simulations and their result arrays
+
+from typing import Any, Dict, List, Literal, Optional
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, model_validator
+from app.models.simulation import SimulationStatus
+
+
+class SimulationParameters(BaseModel):
+    """Assumptions of a simulation; those left out are the property's own (its financials)"""
+    years: int = Field(default=10, ge=1, le=50, description="Years projected")
+    paths: int = Field(default=5000, ge=1, le=50000, description="Monte Carlo paths (a scenario has one)")
+    appreciation: Optional[float] = Field(default=None, ge=-0.5, le=0.5, description="Mean yearly appreciation (0.04 = 4%)")
+    appreciation_volatility: float = Field(default=0.08, ge=0, le=1, description="Its standard deviation")
+    rent_growth: Optional[float] = Field(default=None, ge=-0.5, le=0.5, description="Mean yearly rent growth")
+    rent_growth_volatility: float = Field(default=0.03, ge=0, le=1, description="Its standard deviation")
+    expense_growth: Optional[float] = Field(default=None, ge=-0.5, le=0.5, description="Yearly expense growth")
+    vacancy_rate: Optional[float] = Field(default=None, ge=0, le=1, description="Vacancy rate (0-1)")
+    seed: Optional[int] = Field(default=None, ge=0, description="Random seed; the same seed gives the same paths")
+
+
+class SimulationCreate(BaseModel):
+    """Schema for requesting a simulation"""
+    property_id: int
+    name: str = Field(default="Simulation", min_length=1, max_length=255)
+    simulation_type: Literal["monte_carlo", "scenario"] = "monte_carlo"
+    description: Optional[str] = None
+    parameters: SimulationParameters = Field(default_factory=SimulationParameters)
+    time_budget_seconds: Optional[float] = Field(
+        default=None, gt=0, description="Stop (failed) after this long; at most SIMULATION_TIME_BUDGET_SECONDS"
+    )
+
+    @model_validator(mode="after")
+    def scenario_is_one_path(self):
+        """A scenario projects the assumptions as they are: one path, no volatility"""
+        if self.simulation_type == "scenario":
+            self.parameters = self.parameters.model_copy(
+                update={"paths": 1, "appreciation_volatility": 0, "rent_growth_volatility": 0}
+            )
+        return self
+
+
+class SimulationSummary(BaseModel):
+    """A simulation without its results, as listed"""
+    id: int
+    property_id: int
+    name: str
+    simulation_type: str = Field(description="scenario or monte_carlo")
+    description: Optional[str] = None
+    status: SimulationStatus
+    job_id: Optional[int] = Field(default=None, description="Background job running it (GET /jobs/{id})")
+    paths_completed: int = Field(default=0, description="Paths simulated so far")
+    error: Optional[str] = Field(default=None, description="Why it failed")
+    years_projected: Optional[int] = None
+    total_return: Optional[float] = None
+    annual_return: Optional[float] = None
+    final_property_value: Optional[float] = None
+    total_cash_flow: Optional[float] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SimulationArrayInfo(BaseModel):
+    """A stored result array, without its values (GET /simulations/{id}/arrays/{name} has them)"""
+    name: str
+    dtype: str = Field(description="NumPy dtype, e.g. <f4 (float32)")
+    shape: List[int]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SimulationResponse(SimulationSummary):
+    """A simulation with its parameters, its result summary and the arrays it stored (once completed)"""
+    parameters: Optional[Dict[str, Any]] = None
+    results: Optional[Dict[str, Any]] = Field(default=None, description="Summary: scalars and small tables")
+    arrays: List[SimulationArrayInfo] = Field(default_factory=list)
+
+
+class SimulationArraySlice(BaseModel):
+    """Rows start:stop:step of a result array (its first axis: paths, or years)"""
+    name: str
+    dtype: str
+    shape: List[int] = Field(description="The whole array's shape")
+    start: int
+    stop: int
+    step: int
+    values: List[Any] = Field(description="The rows, as nested lists")
+
+
+# Prebuilt adapters for the fast response path (app/core/serialization.py)
+simulation_response_adapter = TypeAdapter(SimulationResponse)
+simulation_list_adapter = TypeAdapter(List[SimulationSummary])
+simulation_summary_adapter = TypeAdapter(SimulationSummary)
+simulation_array_slice_adapter = TypeAdapter(SimulationArraySlice)
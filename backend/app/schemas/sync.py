@@ -0,0 +1,27 @@
+# app/schemas/sync.py
+# Pydantic schemas for the delta-sync endpoint
+
+from typing import List
+from datetime import datetime
+from pydantic import BaseModel, Field, TypeAdapter
+from app.schemas.property import PropertyResponse
+from app.schemas.portfolio import PortfolioResponse
+
+
+class SyncTombstones(BaseModel):
+    """IDs of records deleted since the cursor"""
+    properties: List[int] = Field(default_factory=list)
+    portfolios: List[int] = Field(default_factory=list)
+
+
+class SyncResponse(BaseModel):
+    """Changes since the client's cursor"""
+    cursor: datetime = Field(description="Pass back as ?since= on the next sync")
+    full: bool = Field(description="True when this is a full snapshot rather than a delta")
+    properties: List[PropertyResponse] = Field(default_factory=list)
+    portfolios: List[PortfolioResponse] = Field(default_factory=list)
+    deleted: SyncTombstones = Field(default_factory=SyncTombstones)
+
+
+# Prebuilt adapter for the fast response path (app/core/serialization.py)
+sync_response_adapter = TypeAdapter(SyncResponse)
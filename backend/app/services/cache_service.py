@@ -0,0 +1,388 @@
+# app/services/cache_service.py
+# Read-through cache for computed portfolio and analytics responses
+#
+# Entries are keyed by user, by the user's cache_version and by the current
+# version of every tag they depend on. Writes bump users.cache_version in
+# their own transaction and bump tag versions after commit, instead of
+# deleting keys: invalidation is O(1), stale entries stop being addressed and
+# age out with their TTL. Because the version lives in the database (and
+# get_current_user loads it with the user row anyway), a write handled by one
+# worker invalidates the per-worker memory caches of all the others on their
+# next request. A miss takes a short per-key lock so that only one request
+# recomputes an expensive result; the others wait for it.
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+import uuid
+
+from pydantic import TypeAdapter
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import cache_requests_total
+from app.core.settings import settings
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "cribb:cache"
+TAG_PREFIX = "cribb:tag"
+LOCK_PREFIX = "cribb:lock"
+LOCK_POLL_INTERVAL = 0.05  # Seconds between checks while another request fills the entry
+
+
+def user_tag(user_id: int) -> str:
+    """The user row itself (cached principals)"""
+    return f"user:{user_id}"
+
+
+def portfolios_tag(user_id: int) -> str:
+    """Everything derived from a user's folders and the properties in them"""
+    return f"portfolios:{user_id}"
+
+
+def property_tag(property_id: int) -> str:
+    """Everything derived from a single property"""
+    return f"property:{property_id}"
+
+
+async def user_cache_version(db: AsyncSession, user_id: int) -> int:
+    """
+    The user's current cache_version; free when get_current_user loaded the user
+    row, otherwise a primary-key lookup. Never taken from the principal cache:
+    it has to be exact for other workers' writes to invalidate this one's entries.
+    """
+    if db.info.get("user_id") == user_id and db.info.get("cache_version") is not None:
+        return db.info["cache_version"]
+    return await db.scalar(select(User.cache_version).where(User.id == user_id)) or 0
+
+
+async def bump_user_cache_version(db: AsyncSession, user_id: int) -> None:
+    """Bump the user's cache_version; call before committing a write so both land together"""
+    db.info["cache_version"] = await db.scalar(
+        update(User).where(User.id == user_id)
+        # Keep updated_at: this is bookkeeping, not a profile change
+        .values(cache_version=User.cache_version + 1, updated_at=User.updated_at)
+        .returning(User.cache_version)
+    )
+
+
+class CacheUnavailable(Exception):
+    """The cache backend could not be reached; callers fall back to the database"""
+    pass
+
+
+class CacheService(ABC):
+    """
+    Abstract cache service - Redis in production, in-memory or no-op otherwise
+    Backends provide storage, tag versions and locks; get_or_load does the rest
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Get a cached value, or None"""
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        """Store a value for ttl seconds"""
+        pass
+
+    @abstractmethod
+    async def get_tag_versions(self, tags: List[str]) -> List[int]:
+        """Current version of each tag"""
+        pass
+
+    @abstractmethod
+    async def invalidate_tags(self, tags: List[str]) -> None:
+        """Bump tag versions so every entry depending on them is missed"""
+        pass
+
+    @abstractmethod
+    async def acquire_lock(self, key: str, ttl: float) -> Optional[str]:
+        """Try to take the fill lock for key; returns a token, or None if someone else holds it"""
+        pass
+
+    @abstractmethod
+    async def release_lock(self, key: str, token: str) -> None:
+        """Release a fill lock if we still hold it"""
+        pass
+
+    async def get_or_load(self, name: str, key: str, tags: List[str],
+                          loader: Callable[[], Awaitable[Any]], adapter: TypeAdapter,
+                          ttl: Optional[int] = None) -> Any:
+        """
+        Return the cached value for name/key, or run loader and cache its result
+        adapter (de)serializes the value, so hits come back as the same models
+        """
+        try:
+            # Read versions before loading: a write that commits while we load
+            # bumps them, and our (possibly stale) result lands under the old key
+            versions = await self.get_tag_versions(tags)
+            full_key = f"{KEY_PREFIX}:{name}:{key}:{'.'.join(map(str, versions))}"
+
+            cached = await self.get(full_key)
+            if cached is not None:
+                cache_requests_total.labels(name, "hit").inc()
+                return adapter.validate_json(cached)
+            cache_requests_total.labels(name, "miss").inc()
+
+            token = await self.acquire_lock(full_key, settings.CACHE_LOCK_TIMEOUT)
+            if token is None:
+                # Single flight: someone else is computing this entry
+                cached = await self._wait_for(full_key)
+                if cached is not None:
+                    return adapter.validate_json(cached)
+        except CacheUnavailable as e:
+            cache_requests_total.labels(name, "error").inc()
+            logger.warning(f"Cache unavailable, loading {name} from the database: {e}")
+            return await loader()
+
+        try:
+            value = await loader()
+            try:
+                await self.set(full_key, adapter.dump_json(value), ttl or settings.CACHE_TTL_SECONDS)
+            except CacheUnavailable as e:
+                logger.warning(f"Cache unavailable, not storing {name}: {e}")
+            return value
+        finally:
+            if token is not None:
+                try:
+                    await self.release_lock(full_key, token)
+                except CacheUnavailable:
+                    pass  # The lock expires on its own
+
+    async def _wait_for(self, key: str) -> Optional[bytes]:
+        """Poll for an entry another request is filling; None if it doesn't arrive in time"""
+        deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            cached = await self.get(key)
+            if cached is not None:
+                return cached
+        return None
+
+    async def invalidate(self, *tags: str) -> None:
+        """Invalidate after a commit; failures are logged, entries then expire with their TTL"""
+        try:
+            await self.invalidate_tags(list(tags))
+        except CacheUnavailable as e:
+            logger.error(f"Cache invalidation failed for {', '.join(tags)}: {e}")
+
+
+class RedisCacheService(CacheService):
+    """
+    Redis cache shared by every worker and instance
+    Uses REDIS_URL; errors degrade to uncached reads instead of failing requests
+    """
+
+    # Delete the lock only if it still holds our token (it may have expired and been re-taken)
+    RELEASE_LOCK_SCRIPT = """
+    if redis.call("get", KEYS[1]) == ARGV[1] then
+        return redis.call("del", KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(self, client=None):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise Exception("Redis not installed. Install with: pip install redis")
+
+        self.errors = (redis.RedisError, OSError)
+        self.client = client or redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.CACHE_REDIS_TIMEOUT,
+            socket_connect_timeout=settings.CACHE_REDIS_TIMEOUT
+        )
+        self.release_script = self.client.register_script(self.RELEASE_LOCK_SCRIPT)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            return await self.client.get(key)
+        except self.errors as e:
+            raise CacheUnavailable(str(e)) from e
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        try:
+            await self.client.set(key, value, ex=ttl)
+        except self.errors as e:
+            raise CacheUnavailable(str(e)) from e
+
+    async def get_tag_versions(self, tags: List[str]) -> List[int]:
+        tag_keys = [f"{TAG_PREFIX}:{tag}" for tag in tags]
+        try:
+            versions = await self.client.mget(tag_keys)
+            if None in versions:
+                # Start new (or evicted) tags from the clock rather than 0, so a
+                # tag that was evicted never comes back at a version still cached
+                now_ms = int(time.time() * 1000)
+                for tag_key, version in zip(tag_keys, versions):
+                    if version is None:
+                        await self.client.set(tag_key, now_ms, nx=True)
+                versions = await self.client.mget(tag_keys)
+        except self.errors as e:
+            raise CacheUnavailable(str(e)) from e
+        return [int(version) for version in versions]
+
+    async def invalidate_tags(self, tags: List[str]) -> None:
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for tag in tags:
+                    pipe.incr(f"{TAG_PREFIX}:{tag}")
+                await pipe.execute()
+        except self.errors as e:
+            raise CacheUnavailable(str(e)) from e
+
+    async def acquire_lock(self, key: str, ttl: float) -> Optional[str]:
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.client.set(f"{LOCK_PREFIX}:{key}", token, nx=True, px=int(ttl * 1000))
+        except self.errors as e:
+            raise CacheUnavailable(str(e)) from e
+        return token if acquired else None
+
+    async def release_lock(self, key: str, token: str) -> None:
+        try:
+            await self.release_script(keys=[f"{LOCK_PREFIX}:{key}"], args=[token])
+        except self.errors as e:
+            raise CacheUnavailable(str(e)) from e
+
+
+class MemoryCacheService(CacheService):
+    """
+    In-process LRU/TTL cache, one per worker, capped by entries and bytes
+    Tag versions are per worker, but keys include users.cache_version, so
+    writes handled by other workers still invalidate entries here. Tag
+    versions and locks are capped by max_entries too
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries or settings.CACHE_MEMORY_MAX_ENTRIES
+        self.max_bytes = max_bytes or settings.CACHE_MEMORY_MAX_MB * 1024 * 1024
+        self.entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self.size = 0  # Bytes held in entries (values are serialized, so this is exact enough)
+        self.tag_versions: "OrderedDict[str, int]" = OrderedDict()  # Least recently invalidated first
+        self.tag_clock = 0  # Last version handed out; each invalidation takes the next one
+        self.tag_floor = 0  # Version of a tag not in tag_versions: never invalidated, or evicted
+        self.locks: Dict[str, Tuple[float, str]] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        if len(value) > self.max_bytes:
+            return
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = (time.monotonic() + ttl, value)
+        self.size += len(value)
+        # Evict least recently used first; stale versions are never read, so they go early
+        while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+            self._remove(next(iter(self.entries)))
+
+    def _remove(self, key: str):
+        _, value = self.entries.pop(key)
+        self.size -= len(value)
+
+    async def get_tag_versions(self, tags: List[str]) -> List[int]:
+        return [self.tag_versions.get(tag, self.tag_floor) for tag in tags]
+
+    async def invalidate_tags(self, tags: List[str]) -> None:
+        for tag in tags:
+            self.tag_clock += 1
+            self.tag_versions[tag] = self.tag_clock
+            self.tag_versions.move_to_end(tag)
+        # An evicted tag reads as the floor, at least the version it had, so entries
+        # cached before its last invalidation stay unreachable (others just miss once)
+        while len(self.tag_versions) > self.max_entries:
+            _, version = self.tag_versions.popitem(last=False)
+            self.tag_floor = max(self.tag_floor, version)
+
+    async def acquire_lock(self, key: str, ttl: float) -> Optional[str]:
+        held = self.locks.get(key)
+        if held is not None and held[0] > time.monotonic():
+            return None
+        if len(self.locks) >= self.max_entries:
+            # Released in get_or_load's finally, so only expired ones pile up
+            now = time.monotonic()
+            self.locks = {k: lock for k, lock in self.locks.items() if lock[0] > now}
+        token = uuid.uuid4().hex
+        self.locks[key] = (time.monotonic() + ttl, token)
+        return token
+
+    async def release_lock(self, key: str, token: str) -> None:
+        held = self.locks.get(key)
+        if held is not None and held[1] == token:
+            del self.locks[key]
+
+    def clear(self):
+        """Drop every entry, version and lock"""
+        self.entries.clear()
+        self.size = 0
+        self.tag_versions.clear()
+        self.tag_clock = self.tag_floor = 0
+        self.locks.clear()
+
+
+class NullCacheService(CacheService):
+    """
+    No-op cache - every read goes to the database
+    """
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        pass
+
+    async def get_tag_versions(self, tags: List[str]) -> List[int]:
+        return [0 for _ in tags]
+
+    async def invalidate_tags(self, tags: List[str]) -> None:
+        pass
+
+    async def acquire_lock(self, key: str, ttl: float) -> Optional[str]:
+        return "null"
+
+    async def release_lock(self, key: str, token: str) -> None:
+        pass
+
+    async def get_or_load(self, name: str, key: str, tags: List[str],
+                          loader: Callable[[], Awaitable[Any]], adapter: TypeAdapter,
+                          ttl: Optional[int] = None) -> Any:
+        """Skip the serialization round trip entirely"""
+        return await loader()
+
+
+def get_cache_service() -> CacheService:
+    """
+    Factory function to get the appropriate cache service
+    Change cache backend by changing environment variable!
+    """
+    backend_type = settings.CACHE_BACKEND.lower()
+
+    if backend_type == "redis":
+        return RedisCacheService()
+    elif backend_type == "memory":
+        return MemoryCacheService()
+    else:
+        # Default to no caching
+        return NullCacheService()
+
+
+# Global cache service instance
+cache_service = get_cache_service()
@@ -0,0 +1,251 @@
+# app/services/export_service.py
+# Streaming exports of a user's properties and portfolios (CSV, NDJSON, Parquet)
+#
+# Rows are fetched from a server-side cursor EXPORT_BATCH_ROWS at a time, and
+# each batch is encoded and sent before the next one is fetched: a 100k
+# property export runs in constant memory, and the first bytes go out as soon
+# as the first batch is read instead of after the whole result. Parquet is
+# written one row group per batch. Encoding runs in a thread so the worker
+# keeps serving other requests.
+#
+# The stream opens its own database session: the body is sent after the route
+# has returned, when the request's session may already be closed.
+
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from typing import AsyncIterator, List, Optional, Sequence
+import asyncio
+import csv
+import enum
+import io
+
+import orjson
+from sqlalchemy import Boolean, Date, DateTime, Enum, Float, Integer, Select, and_, func, select
+
+from app.core.database import AsyncSessionLocal, route_user_reads
+from app.core.settings import settings
+from app.models.portfolio import Portfolio
+from app.models.property import Property, PropertyFinancials
+
+
+class ExportFormat(str, enum.Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+    PARQUET = "parquet"
+
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+}
+
+
+def property_export_query(user_id: int, portfolio_id: Optional[int] = None) -> Select:
+    """
+    One row per property with its folder's name and its financials (empty without any)
+    Column names match the import's, so an export can be imported again. Not
+    sorted: ORDER BY id would make Postgres sort every row before sending the first.
+    """
+    query = (
+        select(
+            *(column for column in Property.__table__.c if column.name not in ("user_id", "address_key")),
+            Portfolio.name.label("portfolio_name"),
+            *(column for column in PropertyFinancials.__table__.c
+              if column.name not in ("property_id", "created_at", "updated_at"))
+        )
+        .outerjoin(Portfolio, Portfolio.id == Property.portfolio_id)
+        .outerjoin(PropertyFinancials, PropertyFinancials.property_id == Property.id)
+        .where(Property.user_id == user_id)
+    )
+    if portfolio_id is not None:
+        query = query.where(Property.portfolio_id == portfolio_id)
+    return query
+
+
+def portfolio_export_query(user_id: int) -> Select:
+    """One row per portfolio folder with its properties' totals, summed in the database"""
+    totals = (
+        select(
+            Property.portfolio_id,
+            func.count(Property.id).label("property_count"),
+            func.sum(Property.current_value).label("total_value"),
+            func.sum(PropertyFinancials.cash_flow).label("total_monthly_cash_flow"),
+            func.sum(PropertyFinancials.monthly_rent).label("total_monthly_rent")
+        )
+        .outerjoin(PropertyFinancials, PropertyFinancials.property_id == Property.id)
+        .where(and_(Property.user_id == user_id, Property.portfolio_id.is_not(None)))
+        .group_by(Property.portfolio_id)
+        .subquery()
+    )
+    return (
+        select(
+            *(column for column in Portfolio.__table__.c if column.name != "user_id"),
+            func.coalesce(totals.c.property_count, 0).label("property_count"),
+            func.coalesce(totals.c.total_value, 0.0).label("total_value"),
+            func.coalesce(totals.c.total_monthly_cash_flow, 0.0).label("total_monthly_cash_flow"),
+            func.coalesce(totals.c.total_monthly_rent, 0.0).label("total_monthly_rent")
+        )
+        .outerjoin(totals, totals.c.portfolio_id == Portfolio.id)
+        .where(Portfolio.user_id == user_id)
+        .order_by(Portfolio.id)
+    )
+
+
+class ExportWriter(ABC):
+    """Encodes batches of rows; the pieces concatenated are the file"""
+
+    def __init__(self, query: Select):
+        self.names = [column.name for column in query.selected_columns]
+        # Enums are exported as their values ("residential"), as the API shows them
+        self.enum_indexes = [
+            index for index, column in enumerate(query.selected_columns) if isinstance(column.type, Enum)
+        ]
+
+    def plain(self, rows: Sequence[Sequence]) -> List[list]:
+        rows = [list(row) for row in rows]
+        for row in rows:
+            for index in self.enum_indexes:
+                if row[index] is not None:
+                    row[index] = row[index].value
+        return rows
+
+    def header(self) -> bytes:
+        return b""
+
+    @abstractmethod
+    def write(self, rows: Sequence[Sequence]) -> bytes:
+        pass
+
+    def close(self) -> bytes:
+        return b""
+
+
+class CsvExportWriter(ExportWriter):
+    """CSV with a header row; dates in ISO format, empty cells for missing values"""
+
+    def header(self) -> bytes:
+        return self._encode([self.names])
+
+    def write(self, rows: Sequence[Sequence]) -> bytes:
+        rows = self.plain(rows)
+        for row in rows:
+            for index, value in enumerate(row):
+                if isinstance(value, (date, datetime)):
+                    row[index] = value.isoformat()
+        return self._encode(rows)
+
+    @staticmethod
+    def _encode(rows: List[list]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+
+
+class NdjsonExportWriter(ExportWriter):
+    """One JSON object per line"""
+
+    def write(self, rows: Sequence[Sequence]) -> bytes:
+        return b"".join(orjson.dumps(dict(zip(self.names, row))) + b"\n" for row in self.plain(rows))
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file handing back what was written since the last take(), with a running position"""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        # Parquet's footer records absolute offsets, so this counts everything ever written
+        return self.position
+
+    def take(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+class ParquetExportWriter(ExportWriter):
+    """Parquet with a typed schema (from the columns' types), one row group per batch"""
+
+    def __init__(self, query: Select):
+        super().__init__(query)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise Exception("pyarrow not installed. Install with: pip install pyarrow")
+
+        self.pa = pa
+        self.schema = pa.schema([
+            (column.name, self._arrow_type(pa, column.type)) for column in query.selected_columns
+        ])
+        self.sink = _ChunkSink()
+        self.writer = pq.ParquetWriter(pa.PythonFile(self.sink, mode="w"), self.schema, compression="snappy")
+
+    @staticmethod
+    def _arrow_type(pa, column_type):
+        if isinstance(column_type, Boolean):
+            return pa.bool_()
+        if isinstance(column_type, Integer):
+            return pa.int64()
+        if isinstance(column_type, Float):
+            return pa.float64()
+        if isinstance(column_type, DateTime):
+            return pa.timestamp("us", tz="UTC") if column_type.timezone else pa.timestamp("us")
+        if isinstance(column_type, Date):
+            return pa.date32()
+        return pa.string()
+
+    def write(self, rows: Sequence[Sequence]) -> bytes:
+        columns = list(zip(*self.plain(rows))) or [[] for _ in self.names]
+        self.writer.write_table(self.pa.Table.from_arrays(
+            [self.pa.array(values, type=field.type) for values, field in zip(columns, self.schema)],
+            schema=self.schema
+        ))
+        return self.sink.take()
+
+    def close(self) -> bytes:
+        self.writer.close()  # Writes the footer
+        return self.sink.take()
+
+
+EXPORT_WRITERS = {
+    ExportFormat.CSV: CsvExportWriter,
+    ExportFormat.NDJSON: NdjsonExportWriter,
+    ExportFormat.PARQUET: ParquetExportWriter,
+}
+
+
+def get_export_writer(export_format: ExportFormat, query: Select) -> ExportWriter:
+    return EXPORT_WRITERS[export_format](query)
+
+
+async def stream_export(query: Select, writer: ExportWriter, user_id: int) -> AsyncIterator[bytes]:
+    """The export file, a batch of rows at a time (StreamingResponse body)"""
+    header = writer.header()
+    if header:
+        yield header
+
+    async with AsyncSessionLocal() as db:
+        # A read-only request's session: may be served by a replica (see RoutingSession)
+        db.info["read_only"] = True
+        await route_user_reads(db, user_id)
+        result = await db.stream(query.execution_options(yield_per=settings.EXPORT_BATCH_ROWS))
+        async for rows in result.partitions():
+            chunk = await asyncio.to_thread(writer.write, rows)
+            if chunk:
+                yield chunk
+
+    footer = await asyncio.to_thread(writer.close)
+    if footer:
+        yield footer
@@ -19,6 +19,11 @@ class FileService(ABC):
         """Upload a file and return the file URL/path"""
         pass
 
+    @abstractmethod
+    def open_file(self, file_path: str) -> BinaryIO:
+        """Open a stored file for reading (close it when done)"""
+        pass
+
     @abstractmethod
     async def delete_file(self, file_path: str) -> bool:
         """Delete a file, return True if successful"""
@@ -70,6 +75,10 @@ class LocalFileService(FileService):
         except Exception as e:
             raise Exception(f"Failed to upload file: {str(e)}")
 
+    def open_file(self, file_path: str) -> BinaryIO:
+        """Open a file from local storage"""
+        return open(self.base_path / file_path, "rb")
+
     async def delete_file(self, file_path: str) -> bool:
         """Delete file from local storage"""
         try:
@@ -111,6 +120,11 @@ class S3FileService(FileService):
         # TODO: Implement when migrating to AWS
         raise NotImplementedError("S3 upload will be implemented during AWS migration")
 
+    def open_file(self, file_path: str) -> BinaryIO:
+        """Open a file from S3"""
+        # TODO: Implement when migrating to AWS
+        raise NotImplementedError("S3 open will be implemented during AWS migration")
+
     async def delete_file(self, file_path: str) -> bool:
         """Delete file from S3"""
         # TODO: Implement when migrating to AWS
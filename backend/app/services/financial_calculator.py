@@ -1,6 +1,12 @@
 # app/services/financial_calculator.py
 # Core Python financial calculation engine for real estate metrics
 
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+
 class FinancialCalculator:
     """
     Python-powered financial calculations for real estate properties.
@@ -165,4 +171,46 @@ class FinancialCalculator:
             'noi': noi,
             'cap_rate': cap_rate,
             'cash_on_cash_return': cash_on_cash_return,
-        }
\ No newline at end of file
+        }
+
+    @staticmethod
+    def calculate_metrics_batch(frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        calculate_all_metrics for many properties at once, column-wise.
+        Takes the same keys as columns (missing columns count as 0) and
+        returns the same metrics as arrays, one value per row.
+        """
+        def column(name: str) -> np.ndarray:
+            if name not in frame:
+                return np.zeros(len(frame))
+            return frame[name].astype(float).fillna(0).to_numpy()
+
+        monthly_rent = column('monthly_rent')
+        current_value = column('current_value')
+        down_payment = column('down_payment')
+        # Same as `vacancy_rate or 0.05`: 0 and missing mean the default
+        vacancy_rate = column('vacancy_rate')
+        vacancy_rate = np.where(vacancy_rate == 0, 0.05, vacancy_rate)
+
+        monthly_operating_expenses = (
+                column('property_taxes') + column('insurance') + column('hoa_fees') +
+                column('maintenance_costs') + column('other_expenses')
+        )
+        total_monthly_expenses = monthly_operating_expenses + column('mortgage_payment')
+        noi = monthly_rent * 12 * (1 - vacancy_rate) - monthly_operating_expenses * 12
+        monthly_cash_flow = monthly_rent - total_monthly_expenses
+        annual_cash_flow = monthly_cash_flow * 12
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cap_rate = np.where(current_value == 0, 0.0, noi / current_value * 100)
+            cash_on_cash_return = np.where(down_payment == 0, 0.0, annual_cash_flow / down_payment * 100)
+
+        return {
+            'monthly_operating_expenses': monthly_operating_expenses,
+            'total_monthly_expenses': total_monthly_expenses,
+            'monthly_cash_flow': monthly_cash_flow,
+            'annual_cash_flow': annual_cash_flow,
+            'noi': noi,
+            'cap_rate': cap_rate,
+            'cash_on_cash_return': cash_on_cash_return,
+        }
@@ -0,0 +1,922 @@
+# app/services/import_service.py
+# Bulk property imports from uploaded files, tracked by an ImportSession
+#
+# The upload is read IMPORT_CHUNK_ROWS rows at a time, so memory stays flat
+# however long the file is. Each chunk is validated a column at a time
+# against PropertyCreate's constraints (rows with invalid or unusual cells go
+# through PropertyCreate itself, for its error messages), its metrics are
+# computed column-wise (FinancialCalculator.calculate_metrics_batch), its
+# properties and financials are loaded with COPY (ids reserved from the
+# sequence first, so financials can point at them without RETURNING), and the
+# session's progress counters are committed with it: GET /imports/{id} shows
+# progress while a large file is still going. Parsing and validation run in a
+# thread so the worker keeps serving other requests.
+#
+# CSV and Excel files go through the same path; the header row (which needn't
+# be the first: broker sheets often have a title above it) and the meaning of
+# its columns are detected from the common names spreadsheets use ("Rent",
+# "Sq Ft", "Market Value"...). Rows that fail validation are skipped and
+# reported in ImportSession.errors with their spreadsheet row number. Chunks
+# commit as they go, so a file that fails part way keeps its earlier rows.
+#
+# Imports run as background jobs (app/jobs/handlers.py): the CPU-bound part of
+# each chunk then goes to the worker's process pool, the import stops between
+# chunks when it's cancelled, and a retried import skips the rows_read it had
+# already committed. Each chunk's commit also publishes the job's progress
+# (app/jobs/progress.py), for clients following it live.
+#
+# Rows are matched to the user's existing properties by address
+# (Property.address_key, unique per user), so importing a file twice doesn't
+# duplicate it. A chunk is loaded with COPY into a temporary staging table
+# and written with one INSERT ... ON CONFLICT (user_id, address_key)
+# statement that inserts its financials too: matches are left alone in INSERT
+# mode, and updated in UPSERT mode with the row's non-empty cells (their
+# current values, fetched with one query per chunk, fill in the rest, and
+# rows that change nothing aren't written). The session counts inserted,
+# updated and unchanged rows.
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from itertools import chain, islice
+from typing import Awaitable, BinaryIO, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import asyncio
+import codecs
+import csv
+import logging
+import math
+import re
+import zipfile
+
+import numpy as np
+import pandas as pd
+from pydantic import ValidationError
+from pydantic.fields import FieldInfo
+from pydantic_core import PydanticUndefined
+from sqlalchemy import ARRAY, Boolean, Column, MetaData, String, Table, and_, any_, bindparam, func, literal_column, not_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.schema import CreateTable
+
+from app.core.address import address_key
+from app.core.database import copy_rows
+from app.core.metrics import time_calculator
+from app.core.settings import settings
+from app.jobs.queue import enqueue
+from app.models.import_session import ImportMode, ImportSession, ImportStatus
+from app.models.portfolio import Portfolio
+from app.models.property import Property, PropertyFinancials, PropertyType
+from app.schemas.property import PropertyBase, PropertyCreate, PropertyFinancialsBase
+from app.services.cache_service import bump_user_cache_version, cache_service, portfolios_tag
+from app.services.file_service import file_service
+from app.services.financial_calculator import FinancialCalculator
+
+logger = logging.getLogger(__name__)
+
+# Columns an import file may have: every PropertyCreate field except the folder,
+# which is chosen for the whole import
+IMPORT_COLUMNS = [*PropertyBase.model_fields, "down_payment", *PropertyFinancialsBase.model_fields]
+PROPERTY_TYPES = {property_type.value for property_type in PropertyType}
+MAX_STORED_ERRORS = 1000  # Per import; failed_imports keeps counting past it
+PROPERTY_COLUMNS = [
+    "name", "address", "purchase_date", "purchase_price", "current_value", "square_footage",
+    "bedrooms", "bathrooms", "is_primary_residence", "down_payment"
+]
+FINANCIAL_COLUMNS = [
+    "monthly_rent", "property_taxes", "insurance", "hoa_fees", "maintenance_costs",
+    "mortgage_payment", "vacancy_rate"
+]
+# Columns of the staging table a chunk is loaded into (one row per property, its financials included)
+STAGED_PROPERTY_COLUMNS = ["id", "user_id", "portfolio_id", *PROPERTY_COLUMNS, "property_type", "address_key"]
+STAGED_FINANCIAL_COLUMNS = [*FINANCIAL_COLUMNS, "other_expenses", "cap_rate", "cash_flow", "cash_on_cash_return"]
+IMPORT_STAGING = Table(
+    "import_staging", MetaData(),
+    *(Column(name, Property.__table__.c[name].type) for name in STAGED_PROPERTY_COLUMNS),
+    *(Column(name, PropertyFinancials.__table__.c[name].type) for name in STAGED_FINANCIAL_COLUMNS),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP"
+)
+NUMERIC_COLUMNS = {
+    name for name, field in PropertyCreate.model_fields.items()
+    if name in IMPORT_COLUMNS and field.annotation in (Optional[float], Optional[int])
+}
+
+# Other headers for each column, as normalized by normalize_header
+COLUMN_ALIASES = {
+    "name": ["property", "property_name", "title", "nickname", "listing"],
+    "address": ["street_address", "property_address", "full_address", "street", "location", "address_1"],
+    "property_type": ["type", "asset_type", "asset_class", "property_use", "use", "category"],
+    "purchase_date": ["acquisition_date", "date_acquired", "acquired", "closing_date", "date_purchased", "purchased"],
+    "purchase_price": ["price", "acquisition_price", "cost_basis", "purchase_cost", "bought_for"],
+    "current_value": ["value", "market_value", "estimated_value", "appraised_value", "current_market_value", "arv"],
+    "square_footage": ["sqft", "sq_ft", "square_feet", "sf", "size", "living_area", "building_size", "gla"],
+    "bedrooms": ["beds", "bed", "bedroom", "br", "bd"],
+    "bathrooms": ["baths", "bath", "bathroom", "ba"],
+    "is_primary_residence": ["primary_residence", "owner_occupied", "primary_home", "primary"],
+    "down_payment": ["down", "downpayment", "cash_invested", "equity_invested", "initial_investment"],
+    "monthly_rent": ["rent", "gross_rent", "current_rent", "market_rent", "rental_income", "income"],
+    "property_taxes": ["taxes", "tax", "property_tax", "real_estate_taxes"],
+    "insurance": ["insurance_premium", "ins", "hazard_insurance"],
+    "hoa_fees": ["hoa", "hoa_dues", "hoa_fee", "association_fees", "condo_fees"],
+    "maintenance_costs": ["maintenance", "repairs", "repairs_and_maintenance", "repairs_maintenance"],
+    "monthly_expenses": ["expenses", "other_expenses", "other", "operating_expenses", "opex"],
+    "mortgage_payment": ["mortgage", "p_i", "pi", "principal_and_interest", "loan_payment", "debt_service"],
+    "vacancy_rate": ["vacancy", "vacancy_allowance"],
+}
+HEADER_NAMES = {
+    **{column: column for column in IMPORT_COLUMNS},
+    **{alias: column for column, aliases in COLUMN_ALIASES.items() for alias in aliases},
+}
+# Words dropped from headers when they don't match as-is: "Rent ($/mo)", "Monthly Taxes"
+UNIT_WORDS = {"monthly", "month", "mo", "per", "usd", "amount", "amt", "pct", "percent", "current", "est"}
+
+HEADER_SCAN_ROWS = 20  # Rows searched for the header
+MAX_BLANK_ROWS = 1000  # Consecutive empty rows that end a sheet (formatting often reaches far past the data)
+
+
+class ImportFileError(Exception):
+    """The file can't be imported at all (unreadable, no usable header)"""
+    pass
+
+
+def normalize_header(value) -> str:
+    """"Rent ($/mo) " -> "rent_mo\""""
+    return "_".join(re.findall(r"[a-z0-9]+", str(value or "").lower()))
+
+
+def match_column(value) -> Optional[str]:
+    """The import column a header cell stands for, if any"""
+    name = normalize_header(value)
+    if name in HEADER_NAMES:
+        return HEADER_NAMES[name]
+    words = [word for word in name.split("_") if word not in UNIT_WORDS]
+    return HEADER_NAMES.get("_".join(words))
+
+
+def read_csv_rows(file: BinaryIO) -> Iterator[List[str]]:
+    """
+    Rows of a CSV upload as lists of strings, read lazily
+    Decodes as UTF-8 (a BOM from Excel is dropped); undecodable bytes become U+FFFD
+    """
+    text = codecs.getreader("utf-8-sig")(file, errors="replace")
+    return csv.reader(text)
+
+
+def read_xlsx_rows(file: BinaryIO) -> Iterator[tuple]:
+    """
+    Rows of an Excel upload as tuples of cell values, streamed from the sheet's
+    XML (openpyxl read-only mode) rather than loading the workbook
+    Reads the first sheet that has a recognizable header row. Formulas come
+    through as their last saved values and date cells as dates.
+    """
+    try:
+        import openpyxl
+        from openpyxl.utils.exceptions import InvalidFileException
+    except ImportError:
+        raise Exception("openpyxl not installed. Install with: pip install openpyxl")
+
+    try:
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile, KeyError) as e:
+        raise ImportFileError(f"Not a readable .xlsx file ({e})")
+
+    try:
+        for sheet in workbook.worksheets:
+            # min_row=1 keeps row numbers matching the sheet even when it starts further down
+            rows = sheet.iter_rows(min_row=1, values_only=True)
+            scanned = list(islice(rows, HEADER_SCAN_ROWS))
+            try:
+                find_header(scanned)
+            except ImportFileError:
+                continue
+            blank_rows = 0
+            for row in chain(scanned, rows):
+                if any(value is not None and value != "" for value in row):
+                    blank_rows = 0
+                else:
+                    blank_rows += 1
+                    if blank_rows > MAX_BLANK_ROWS:
+                        break
+                yield tuple(value.date() if isinstance(value, datetime) else value for value in row)
+            return
+    finally:
+        workbook.close()
+
+
+# Readers by file extension
+FILE_READERS = {"csv": read_csv_rows, "xlsx": read_xlsx_rows, "xlsm": read_xlsx_rows}
+
+
+def find_header(rows: Sequence[Sequence]) -> Tuple[int, Dict[int, str], List[str]]:
+    """
+    The header among the first rows of a file: the one naming the most import columns
+    Returns (its index, {cell index: column}, ignored header cells). A header
+    needs a name or an address column; without a name, the address is the name.
+    """
+    best = None
+    for row_index, row in enumerate(rows):
+        columns, ignored = {}, []
+        for index, cell in enumerate(row):
+            column = match_column(cell)
+            if column and column not in columns.values():
+                columns[index] = column
+            elif cell is not None and str(cell).strip():
+                ignored.append(str(cell).strip())
+        mapped = set(columns.values())
+        if ("name" in mapped or "address" in mapped) and (best is None or len(columns) > len(best[1])):
+            best = (row_index, columns, ignored)
+
+    if best is None:
+        if not any(any(cell not in (None, "") for cell in row) for row in rows):
+            raise ImportFileError("The file is empty")
+        raise ImportFileError("No header row found: it needs a name or address column")
+    return best
+
+
+def clean_value(column: str, value):
+    """Spreadsheet formatting to plain values: "$2,500" -> "2500", "5%" -> 0.05"""
+    if column not in NUMERIC_COLUMNS or not isinstance(value, str):
+        return value
+    value = value.replace("$", "").replace(",", "").strip()
+    if value.endswith("%"):
+        try:
+            return float(value[:-1]) / 100
+        except ValueError:
+            pass
+    return value
+
+
+@dataclass
+class ValidatedRows:
+    """A chunk's valid rows (in parallel lists) and its problems"""
+    records: List[dict] = field(default_factory=list)  # PropertyCreate dumps, without portfolio_id
+    row_numbers: List[int] = field(default_factory=list)  # Spreadsheet row of each record
+    provided: List[frozenset] = field(default_factory=list)  # Fields each row had a value for
+    address_keys: List[Optional[str]] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    failed: int = 0  # Invalid rows
+
+
+@dataclass(frozen=True)
+class FieldRule:
+    """What PropertyCreate accepts for a field, as checked a whole column at a time (validate_rows)"""
+    kind: type  # str, int, float, bool or date
+    default: object  # PydanticUndefined when required
+    ge: Optional[float] = None
+    gt: Optional[float] = None
+    le: Optional[float] = None
+    max_length: Optional[int] = None
+
+    @property
+    def required(self) -> bool:
+        return self.default is PydanticUndefined
+
+
+def field_rule(field_info: FieldInfo) -> FieldRule:
+    kind = next(kind for kind in (str, int, float, bool, date) if field_info.annotation in (kind, Optional[kind]))
+    bounds = {
+        name: getattr(constraint, name)
+        for constraint in field_info.metadata for name in ("ge", "gt", "le", "max_length")
+        if hasattr(constraint, name)
+    }
+    return FieldRule(kind, field_info.default, **bounds)
+
+
+FIELD_RULES = {name: field_rule(PropertyCreate.model_fields[name]) for name in IMPORT_COLUMNS}
+# Cells the column checks read themselves; anything else Pydantic does accept ("1e3", "3.0", "2024-01-05T00:00")
+# sends its row through PropertyCreate
+PLAIN_NUMBER = re.compile(r"[0-9]{1,15}(?:\.[0-9]{0,15})?|\.[0-9]{1,15}")
+PLAIN_INTEGER = re.compile(r"[0-9]{1,15}")
+ISO_DATE = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}")
+ISO_DATES = re.compile(r"(?:[0-9]{4}-[0-9]{2}-[0-9]{2})*")
+DIGITS = re.compile(r"[0-9]*")
+DECIMALS = re.compile(r"[0-9.]*")
+BOOL_STRINGS = {
+    "true": True, "t": True, "yes": True, "y": True, "on": True, "1": True,
+    "false": False, "f": False, "no": False, "n": False, "off": False, "0": False,
+}
+
+
+def _column_cells(values: Sequence) -> list:
+    """A column's cells as validate_record sees them: text stripped, None where empty"""
+    if {type(value) for value in values} == {str}:  # CSV files, and most spreadsheet columns
+        return [value.strip() or None for value in values]
+    return [(value.strip() or None) if isinstance(value, str) else value for value in values]
+
+
+def _read_cell(column: str, rule: FieldRule, value):
+    """One non-empty cell as PropertyCreate would read it, or None to leave its row to PropertyCreate"""
+    if rule.kind is str:
+        if (isinstance(value, str) and (rule.max_length is None or len(value) <= rule.max_length)
+                and (column != "property_type" or value in PROPERTY_TYPES)):
+            return value
+        return None
+    if rule.kind is bool:
+        if type(value) is bool:
+            return value
+        return BOOL_STRINGS.get(value.lower()) if isinstance(value, str) else None
+    if rule.kind is date:
+        if type(value) is date:
+            return value
+        if isinstance(value, str) and ISO_DATE.fullmatch(value):
+            try:
+                return date.fromisoformat(value)
+            except ValueError:
+                return None
+        return None
+
+    # Numbers, from text ("$2,500", "5%") or the spreadsheet's own
+    value = clean_value(column, value)
+    if isinstance(value, str):
+        return rule.kind(value) if (PLAIN_INTEGER if rule.kind is int else PLAIN_NUMBER).fullmatch(value) else None
+    if type(value) is int and abs(value) <= 2 ** 53:
+        return value if rule.kind is int else float(value)
+    if type(value) is float and rule.kind is float and math.isfinite(value):
+        return value
+    return None
+
+
+def _read_plain(column: str, rule: FieldRule, texts: list) -> Optional[list]:
+    """
+    A column of plain text cells read in one go ("12", "1450.50", "residential"),
+    or None when any cell needs _read_cell
+    """
+    if not texts or {type(text) for text in texts} != {str}:
+        return None
+    lengths = [len(text) for text in texts]
+    longest = max(lengths)
+    if rule.kind is str:
+        if rule.max_length is not None and longest > rule.max_length:
+            return None
+        if column == "property_type" and not PROPERTY_TYPES.issuperset(texts):
+            return None
+        return texts
+    if rule.kind is date:
+        if set(lengths) != {10} or not ISO_DATES.fullmatch("".join(texts)):
+            return None
+        try:
+            dates = {text: date.fromisoformat(text) for text in set(texts)}  # A column repeats its dates
+        except ValueError:  # "2023-02-29"
+            return None
+        return [dates[text] for text in texts]
+    if rule.kind in (int, float):
+        # Digits only (and points, for floats): what int() and float() read exactly as Pydantic does
+        plain = DIGITS if rule.kind is int else DECIMALS
+        if longest > 15 or not plain.fullmatch("".join(texts)):
+            return None
+        try:
+            return [rule.kind(text) for text in texts]
+        except ValueError:  # "1.2.3"
+            return None
+    return None
+
+
+def check_column(column: str, cells: list) -> Tuple[list, np.ndarray]:
+    """
+    One field's cells (stripped, None when empty), as PropertyCreate would read them: (values, ok)
+    `values` holds Python values (the field's default where the cell is empty). Where
+    `ok` is false the cell is invalid, or just unusual: its row is validated by
+    PropertyCreate instead, which has the final say and the error messages.
+    """
+    rule = FIELD_RULES[column]
+    default = None if rule.required else rule.default
+    if None in cells:
+        indexes = [index for index, cell in enumerate(cells) if cell is not None]
+        texts = [cells[index] for index in indexes]
+    else:
+        indexes, texts = None, cells
+    if not texts:
+        return [default] * len(cells), np.full(len(cells), not rule.required)
+    read = _read_plain(column, rule, texts)
+    if read is None:
+        read = [_read_cell(column, rule, cell) for cell in texts]
+
+    if rule.kind in (int, float):
+        numbers = np.array([np.nan if value is None else value for value in read], dtype=np.float64)
+        good = ~np.isnan(numbers)
+        if rule.ge is not None:
+            good &= numbers >= rule.ge
+        if rule.gt is not None:
+            good &= numbers > rule.gt
+        if rule.le is not None:
+            good &= numbers <= rule.le
+    else:
+        good = np.array([value is not None for value in read], dtype=bool)
+    if indexes is None and good.all():
+        return read, good
+
+    values, ok = [default] * len(cells), np.full(len(cells), not rule.required)
+    indexes = range(len(cells)) if indexes is None else indexes
+    for index, value, is_good in zip(indexes, read, good.tolist()):
+        ok[index] = is_good
+        if is_good:
+            values[index] = value
+    return values, ok
+
+
+def validate_rows(rows: Sequence[Sequence], columns: Dict[int, str], first_row: int) -> ValidatedRows:
+    """
+    Validate a chunk against PropertyCreate, a column at a time; blank rows are skipped
+    Empty cells are treated as missing, so the schema defaults apply. Rows any
+    column check doesn't pass go through PropertyCreate itself, for its
+    verdict and error messages: the same rows fail, with the same messages,
+    as when every row was validated by the model (several times slower).
+    """
+    validated = ValidatedRows()
+    if not rows:
+        return validated
+    width = max(columns) + 1
+    if any(len(row) < width for row in rows):
+        rows = [row if len(row) >= width else (*row, *[None] * (width - len(row))) for row in rows]
+    table = list(zip(*rows))
+
+    fields = list(columns.values())
+    cells = {column: _column_cells(table[index]) for index, column in columns.items()}
+    # present[row, field]: whether the row has a value for the field (columns in `fields` order)
+    present = np.array([[cell is not None for cell in cells[column]] for column in fields], dtype=bool).T
+    nonblank = present.any(axis=1)
+
+    # Without a name, the address is the name
+    if "address" in cells:
+        cells["name"] = [
+            str(address)[:200] if name is None and address is not None else name
+            for name, address in zip(cells.get("name", [None] * len(rows)), cells["address"])
+        ]
+
+    values, ok = {}, nonblank.copy()
+    for column in IMPORT_COLUMNS:
+        if column in cells:
+            values[column], column_ok = check_column(column, cells[column])
+            ok &= column_ok
+        else:
+            if FIELD_RULES[column].required:
+                ok[:] = False
+            values[column] = [FIELD_RULES[column].default] * len(rows)
+
+    row_values = zip(*(values[column] for column in IMPORT_COLUMNS))
+    row_checks = zip(nonblank.tolist(), ok.tolist(), row_values, present.tolist())
+    provided_sets = {}  # Rows share a few combinations of fields; one frozenset each
+    for index, (is_nonblank, is_ok, row_value, flags) in enumerate(row_checks):
+        if not is_nonblank:
+            continue
+        # Rows that passed become records as they are; the others are validated by PropertyCreate
+        if is_ok:
+            record = dict(zip(IMPORT_COLUMNS, row_value))
+        else:
+            record = validate_record(rows[index], columns, first_row + index, validated)
+            if record is None:
+                continue
+
+        combination = tuple(flags)
+        fields_provided = provided_sets.get(combination)
+        if fields_provided is None:
+            fields_provided = frozenset(field for field, has_value in zip(fields, flags) if has_value)
+            provided_sets[combination] = fields_provided
+        validated.records.append(record)
+        validated.row_numbers.append(first_row + index)
+        validated.provided.append(fields_provided)
+    validated.address_keys = [address_key(record["address"]) for record in validated.records]
+    return validated
+
+
+def validate_record(row: Sequence, columns: Dict[int, str], row_number: int,
+                    validated: ValidatedRows) -> Optional[dict]:
+    """Validate one row with PropertyCreate; None if it's invalid (its errors are added to `validated`)"""
+    record = {}
+    for index, column in columns.items():
+        value = row[index] if index < len(row) else None
+        if isinstance(value, str):
+            value = value.strip()
+        if value is not None and value != "":
+            record[column] = clean_value(column, value)
+    if "name" not in record and "address" in record:
+        record["name"] = str(record["address"])[:200]
+
+    try:
+        property_data = PropertyCreate.model_validate(record)
+    except ValidationError as e:
+        validated.failed += 1
+        validated.errors.extend(
+            f"Row {row_number}: {'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+            for error in e.errors(include_url=False)
+        )
+        return None
+    if property_data.property_type not in PROPERTY_TYPES:
+        validated.failed += 1
+        validated.errors.append(
+            f"Row {row_number}: property_type: must be one of {', '.join(sorted(PROPERTY_TYPES))}"
+        )
+        return None
+    return property_data.model_dump(exclude={"portfolio_id"})
+
+
+def drop_duplicate_addresses(validated: ValidatedRows, keep_last: bool) -> ValidatedRows:
+    """
+    Keep one row per address in a chunk (the first, or the last), counting the others as failed
+    One statement can't insert or update a property twice.
+    """
+    kept = {}
+    for index, key in enumerate(validated.address_keys):
+        if key is not None and (keep_last or key not in kept):
+            kept[key] = index
+    keep = [key is None or kept[key] == index for index, key in enumerate(validated.address_keys)]
+    if all(keep):
+        return validated
+
+    deduped = ValidatedRows(errors=validated.errors, failed=validated.failed)
+    for index, key in enumerate(validated.address_keys):
+        if keep[index]:
+            deduped.records.append(validated.records[index])
+            deduped.row_numbers.append(validated.row_numbers[index])
+            deduped.provided.append(validated.provided[index])
+            deduped.address_keys.append(key)
+        else:
+            imported = validated.row_numbers[kept[key]]
+            deduped.failed += 1
+            deduped.errors.append(
+                f"Row {validated.row_numbers[index]}: address: same address as row {imported}, "
+                f"which was imported instead"
+            )
+    return deduped
+
+
+def merge_existing(validated: ValidatedRows, existing: Dict[str, dict],
+                   portfolio_id: Optional[int]) -> Tuple[List[dict], List[Optional[str]], List[Optional[int]], int]:
+    """
+    For an upsert: rows matching a property keep its values for the cells they left empty
+    (and for fields it has no value for, the defaults stay). Returns (records to write,
+    their address keys, their property ids (None for new ones), number of rows that
+    would change nothing and are skipped).
+    """
+    records, keys, ids, unchanged = [], [], [], 0
+    for record, provided, key in zip(validated.records, validated.provided, validated.address_keys):
+        current = existing.get(key) if key is not None else None
+        if current is None:
+            records.append(record)
+            keys.append(key)
+            ids.append(None)
+            continue
+        merged = {
+            name: value if name in provided or current[name] is None else current[name]
+            for name, value in record.items()
+        }
+        if merged == {name: current[name] for name in merged} and portfolio_id in (None, current["portfolio_id"]):
+            unchanged += 1
+            continue
+        records.append(merged)
+        keys.append(key)
+        ids.append(current["id"])
+    return records, keys, ids, unchanged
+
+
+def build_rows(records: List[dict], address_keys: List[Optional[str]]) -> Tuple[List[dict], List[dict]]:
+    """Property and financials insert rows for validated records (financials without property_id yet)"""
+    frame = pd.DataFrame.from_records(records, columns=IMPORT_COLUMNS)
+    frame = frame.rename(columns={"monthly_expenses": "other_expenses"})
+    with time_calculator("import_metrics", len(frame)):
+        metrics = FinancialCalculator.calculate_metrics_batch(frame)
+
+    property_rows = [
+        {**{column: record[column] for column in PROPERTY_COLUMNS},
+         "property_type": PropertyType(record["property_type"]), "address_key": key}
+        for record, key in zip(records, address_keys)
+    ]
+    financial_rows = [
+        {**{column: record[column] for column in FINANCIAL_COLUMNS},
+         "other_expenses": record["monthly_expenses"],
+         "cap_rate": float(cap_rate), "cash_flow": float(cash_flow),
+         "cash_on_cash_return": float(cash_on_cash_return)}
+        for record, cap_rate, cash_flow, cash_on_cash_return in zip(
+            records, metrics["cap_rate"], metrics["monthly_cash_flow"], metrics["cash_on_cash_return"]
+        )
+    ]
+    return property_rows, financial_rows
+
+
+@dataclass
+class PreparedChunk:
+    """A chunk ready to write: property rows ("id" None for new ones) with their financials"""
+    property_rows: List[dict]
+    financial_rows: List[dict]
+    errors: List[str]
+    failed: int
+    unchanged: int  # Matching rows that change nothing, left out
+
+
+def prepare_chunk(chunk: List[Sequence], columns: Dict[int, str], first_row: int, mode: ImportMode,
+                  existing: Dict[str, dict], portfolio_id: Optional[int]) -> PreparedChunk:
+    """
+    validate_rows, merge_existing (upserts) and build_rows: one round trip when run in a process pool
+    `existing` holds the current values of the properties the chunk's addresses match (upserts only).
+    """
+    validated = drop_duplicate_addresses(validate_rows(chunk, columns, first_row), mode == ImportMode.UPSERT)
+    if mode == ImportMode.UPSERT:
+        records, keys, ids, unchanged = merge_existing(validated, existing, portfolio_id)
+    else:
+        records, keys, ids, unchanged = validated.records, validated.address_keys, [None] * len(validated.records), 0
+    property_rows, financial_rows = build_rows(records, keys) if records else ([], [])
+    for row, property_id in zip(property_rows, ids):
+        row["id"] = property_id
+    return PreparedChunk(property_rows, financial_rows, validated.errors, validated.failed, unchanged)
+
+
+def chunk_address_keys(chunk: List[Sequence], columns: Dict[int, str]) -> List[str]:
+    """The distinct address keys of a chunk's raw rows, to look their properties up before validation"""
+    index = next((index for index, column in columns.items() if column == "address"), None)
+    if index is None:
+        return []
+    keys = {address_key(str(row[index]).strip()) for row in chunk if index < len(row) and row[index] is not None}
+    keys.discard(None)
+    return list(keys)
+
+
+def _match_key(table):
+    """
+    Joins the written properties back to their staged rows: by address (an
+    upsert's row may land on a property other than the one it was staged for,
+    when a matching one appeared meanwhile), or by id without one. Keys never contain "#".
+    """
+    return func.coalesce(table.c.address_key, func.concat("#", table.c.id))
+
+
+def write_chunk_statement(mode: ImportMode):
+    """
+    One statement writing the staged chunk (IMPORT_STAGING): its properties,
+    then their financials; selects (inserted, updated) counts. Staged rows
+    matching an existing property are skipped in INSERT mode.
+    """
+    properties, financials, staging = Property.__table__, PropertyFinancials.__table__, IMPORT_STAGING
+    insert_properties = pg_insert(properties).from_select(
+        STAGED_PROPERTY_COLUMNS, select(*(staging.c[name] for name in STAGED_PROPERTY_COLUMNS))
+    )
+    conflict = [properties.c.user_id, properties.c.address_key]
+    if mode == ImportMode.UPSERT:
+        excluded = insert_properties.excluded
+        insert_properties = insert_properties.on_conflict_do_update(index_elements=conflict, set_={
+            **{name: excluded[name] for name in STAGED_PROPERTY_COLUMNS if name not in ("id", "user_id", "portfolio_id")},
+            "portfolio_id": func.coalesce(excluded.portfolio_id, properties.c.portfolio_id),
+            "updated_at": func.now()  # ON CONFLICT updates don't run onupdate defaults
+        })
+    else:
+        insert_properties = insert_properties.on_conflict_do_nothing(index_elements=conflict)
+    written = insert_properties.returning(
+        properties.c.id, properties.c.address_key, literal_column("xmax = 0", Boolean).label("inserted")
+    ).cte("written")
+
+    insert_financials = pg_insert(financials).from_select(
+        ["property_id", *STAGED_FINANCIAL_COLUMNS],
+        select(written.c.id, *(staging.c[name] for name in STAGED_FINANCIAL_COLUMNS))
+        .select_from(written.join(staging, _match_key(written) == _match_key(staging)))
+    )
+    if mode == ImportMode.UPSERT:
+        excluded = insert_financials.excluded
+        insert_financials = insert_financials.on_conflict_do_update(index_elements=[financials.c.property_id], set_={
+            **{name: excluded[name] for name in STAGED_FINANCIAL_COLUMNS},
+            "updated_at": func.now()
+        })
+
+    return (
+        select(func.count().filter(written.c.inserted), func.count().filter(not_(written.c.inserted)))
+        .select_from(written)
+        .add_cte(insert_financials.cte("written_financials"))
+    )
+
+
+def skip_rows(rows: Iterator, count: int):
+    """Advance past the rows an earlier attempt already imported"""
+    for _ in islice(rows, count):
+        pass
+
+
+class ImportService:
+    def __init__(self, db: AsyncSession, run_cpu: Optional[Callable[..., Awaitable]] = None):
+        self.db = db
+        # Validation and metrics: the job's process pool (JobContext.run_cpu), else a thread
+        self.run_cpu = run_cpu or asyncio.to_thread
+
+    async def create_session(self, user_id: int, filename: str, file_type: str,
+                             file_size: Optional[int]) -> ImportSession:
+        """Record a new import before reading the file"""
+        import_session = self._new_session(user_id, filename, file_type, file_size)
+        self.db.add(import_session)
+        await self.db.commit()
+        await self.db.refresh(import_session)  # Server-side timestamps
+        return import_session
+
+    async def queue_import(self, user_id: int, file: BinaryIO, filename: str, file_type: str,
+                           file_size: Optional[int], portfolio_id: Optional[int] = None,
+                           mode: ImportMode = ImportMode.INSERT) -> ImportSession:
+        """Store the upload and queue a job importing it (app/jobs/handlers.py); the session stays PENDING until it starts"""
+        file_path = await file_service.upload_file(file, filename, folder="imports")
+        try:
+            import_session = self._new_session(user_id, filename, file_type, file_size, mode)
+            self.db.add(import_session)
+            await self.db.flush()
+            job = await enqueue(self.db, "import_properties", {
+                "import_session_id": import_session.id,
+                "file_path": file_path,
+                "portfolio_id": portfolio_id
+            }, user_id=user_id)
+            import_session.job_id = job.id
+            await self.db.commit()
+        except Exception:
+            await file_service.delete_file(file_path)
+            raise
+        await self.db.refresh(import_session)
+        return import_session
+
+    @staticmethod
+    def _new_session(user_id: int, filename: str, file_type: str, file_size: Optional[int],
+                     mode: ImportMode = ImportMode.INSERT) -> ImportSession:
+        return ImportSession(
+            user_id=user_id,
+            filename=filename[:255],
+            file_type=file_type,
+            file_size=file_size,
+            status=ImportStatus.PENDING,
+            mode=mode,
+            total_rows=0,
+            successful_imports=0,
+            failed_imports=0,
+            inserted_count=0,
+            updated_count=0,
+            unchanged_count=0,
+            rows_read=0,
+            errors=[]
+        )
+
+    async def get_session(self, import_id: int, user_id: int) -> Optional[ImportSession]:
+        """Get an import (user must own it)"""
+        result = await self.db.execute(
+            select(ImportSession).where(and_(ImportSession.id == import_id, ImportSession.user_id == user_id))
+        )
+        return result.scalars().first()
+
+    async def get_user_sessions(self, user_id: int, limit: int = 50) -> List[ImportSession]:
+        """Most recent imports first"""
+        result = await self.db.execute(
+            select(ImportSession)
+            .where(ImportSession.user_id == user_id)
+            .order_by(ImportSession.created_at.desc(), ImportSession.id.desc())
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def owns_portfolio(self, portfolio_id: int, user_id: int) -> bool:
+        return await self.db.scalar(
+            select(Portfolio.id).where(and_(Portfolio.id == portfolio_id, Portfolio.user_id == user_id))
+        ) is not None
+
+    async def import_properties(self, import_session: ImportSession, rows: Iterator[Sequence],
+                                portfolio_id: Optional[int] = None,
+                                cancelled: Optional[Callable[[], bool]] = None,
+                                progress: Optional[Callable[..., Awaitable[None]]] = None) -> ImportSession:
+        """
+        Import every row of a file (read_csv_rows, read_xlsx_rows) into the session's user's properties
+        Marks the session COMPLETED, FAILED if the file can't be read, or CANCELLED once `cancelled()`
+        is true between chunks. Bad data never raises; anything unexpected marks the session FAILED
+        and is re-raised so the job is retried (from the first row not yet committed).
+        `progress(db, rows_read, **counters)` is awaited before each chunk commits (JobContext.report_progress).
+        """
+        resume_from = import_session.rows_read
+        import_session.status = ImportStatus.PROCESSING
+        import_session.started_at = import_session.started_at or datetime.now(timezone.utc)
+        import_session.completed_at = None
+        await self.db.commit()
+
+        try:
+            scanned = await asyncio.to_thread(lambda: list(islice(rows, HEADER_SCAN_ROWS)))
+            header_index, columns, ignored = find_header(scanned)
+            if ignored and not resume_from:
+                self._add_errors(import_session, [f"Ignored unknown columns: {', '.join(ignored)}"])
+            rows = chain(scanned[header_index + 1:], rows)
+            if resume_from:
+                await asyncio.to_thread(skip_rows, rows, resume_from)
+
+            first_row = header_index + 2 + resume_from  # Spreadsheet numbering: the header's row is header_index + 1
+            while True:
+                if cancelled is not None and cancelled():
+                    import_session.status = ImportStatus.CANCELLED
+                    self._add_errors(import_session, [f"Cancelled after {import_session.rows_read} rows"])
+                    break
+                chunk = await asyncio.to_thread(lambda: list(islice(rows, settings.IMPORT_CHUNK_ROWS)))
+                if not chunk:
+                    import_session.status = ImportStatus.COMPLETED
+                    break
+                await self._import_chunk(import_session, chunk, columns, first_row, portfolio_id, progress)
+                first_row += len(chunk)
+        except (ImportFileError, csv.Error, UnicodeError) as e:
+            await self._fail(import_session, f"Import stopped: {e}")
+        except Exception as e:
+            logger.exception(f"Import {import_session.id} failed")
+            await self._fail(import_session, f"Import stopped: {type(e).__name__}")
+            await self._finish(import_session)
+            raise
+
+        await self._finish(import_session)
+        return import_session
+
+    async def _finish(self, import_session: ImportSession):
+        import_session.completed_at = datetime.now(timezone.utc)
+        await self.db.commit()
+        await self.db.refresh(import_session)
+
+    async def _import_chunk(self, import_session: ImportSession, chunk: List[Sequence],
+                            columns: Dict[int, str], first_row: int, portfolio_id: Optional[int],
+                            progress: Optional[Callable[..., Awaitable[None]]] = None):
+        """Validate and write one chunk, committing it with the session's counters"""
+        user_id, mode = import_session.user_id, import_session.mode
+        existing = {}
+        if mode == ImportMode.UPSERT:
+            keys = await asyncio.to_thread(chunk_address_keys, chunk, columns)
+            existing = await self._existing_properties(user_id, keys)
+        prepared = await self.run_cpu(prepare_chunk, chunk, columns, first_row, mode, existing, portfolio_id)
+
+        inserted = updated = 0
+        if prepared.property_rows:
+            inserted, updated = await self._write_chunk(prepared, user_id, portfolio_id, mode)
+            if inserted or updated:
+                await bump_user_cache_version(self.db, user_id)
+        # Rows the statement skipped matched a property in INSERT mode (or one added meanwhile)
+        unchanged = prepared.unchanged + len(prepared.property_rows) - inserted - updated
+
+        import_session.rows_read += len(chunk)
+        import_session.total_rows += inserted + updated + unchanged + prepared.failed
+        import_session.successful_imports += inserted + updated + unchanged
+        import_session.inserted_count += inserted
+        import_session.updated_count += updated
+        import_session.unchanged_count += unchanged
+        import_session.failed_imports += prepared.failed
+        self._add_errors(import_session, prepared.errors)
+        if progress is not None:
+            await progress(
+                self.db, import_session.rows_read,
+                successful_imports=import_session.successful_imports,
+                failed_imports=import_session.failed_imports
+            )
+        await self.db.commit()
+
+        if inserted or updated:
+            await cache_service.invalidate(portfolios_tag(user_id))
+
+    async def _existing_properties(self, user_id: int, keys: List[str]) -> Dict[str, dict]:
+        """
+        Current values (as import fields) of the user's properties with these address keys, by key
+        Locked until the chunk commits, so nothing changes them between the merge and the write.
+        """
+        if not keys:
+            return {}
+        names = [*PROPERTY_COLUMNS, "property_type", *FINANCIAL_COLUMNS, "monthly_expenses"]
+        rows = await self.db.execute(
+            select(Property.address_key, Property.id, Property.portfolio_id,
+                   *(Property.__table__.c[name] for name in [*PROPERTY_COLUMNS, "property_type"]),
+                   *(PropertyFinancials.__table__.c[name] for name in [*FINANCIAL_COLUMNS, "other_expenses"]))
+            .outerjoin(PropertyFinancials, PropertyFinancials.property_id == Property.id)
+            .where(and_(
+                Property.user_id == user_id,
+                Property.address_key == any_(bindparam("keys", keys, type_=ARRAY(String)))
+            ))
+            .with_for_update(of=Property)
+        )
+        existing = {}
+        for key, property_id, portfolio_id, *values in rows:
+            current = existing[key] = dict(zip(names, values))
+            current.update(id=property_id, portfolio_id=portfolio_id, property_type=current["property_type"].value)
+        return existing
+
+    async def _write_chunk(self, prepared: PreparedChunk, user_id: int, portfolio_id: Optional[int],
+                           mode: ImportMode) -> Tuple[int, int]:
+        """Stage the chunk's rows with COPY and write them (write_chunk_statement); returns (inserted, updated)"""
+        new_ids = iter(await self._reserve_property_ids(
+            sum(1 for row in prepared.property_rows if row["id"] is None)
+        ))
+        await self.db.execute(CreateTable(IMPORT_STAGING))  # Dropped on commit
+        await copy_rows(self.db, IMPORT_STAGING, [
+            {**property_row, **financial_row, "id": property_row["id"] or next(new_ids),
+             "user_id": user_id, "portfolio_id": portfolio_id}
+            for property_row, financial_row in zip(prepared.property_rows, prepared.financial_rows)
+        ])
+        inserted, updated = (await self.db.execute(write_chunk_statement(mode))).one()
+        return inserted, updated
+
+    async def _reserve_property_ids(self, count: int) -> List[int]:
+        """Take `count` ids from the properties sequence, as INSERT would"""
+        if not count:
+            return []
+        sequence = func.pg_get_serial_sequence(Property.__tablename__, "id")
+        return list(await self.db.scalars(
+            select(func.nextval(sequence)).select_from(func.generate_series(1, count))
+        ))
+
+    async def _fail(self, import_session: ImportSession, message: str):
+        """Drop the unfinished chunk and mark the session FAILED (committed by the caller)"""
+        await self.db.rollback()
+        await self.db.refresh(import_session)  # Counters as of the last committed chunk
+        import_session.status = ImportStatus.FAILED
+        self._add_errors(import_session, [message])
+
+    @staticmethod
+    def _add_errors(import_session: ImportSession, errors: List[str]):
+        """Append up to MAX_STORED_ERRORS messages (reassigned: the JSON column doesn't track mutation)"""
+        stored = import_session.errors or []
+        if errors and len(stored) < MAX_STORED_ERRORS:
+            import_session.errors = stored + errors[:MAX_STORED_ERRORS - len(stored)]
@@ -2,21 +2,30 @@
 # Portfolio business logic and database operations
 
 from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, select, update
+from sqlalchemy.orm import selectinload
 from app.models.portfolio import Portfolio
 from app.models.property import Property
-from app.schemas.portfolio import PortfolioMetrics, PortfolioWithMetrics
+from app.models.sync_tombstone import SyncTombstone
+from app.schemas.portfolio import (
+    PortfolioMetrics, PortfolioWithMetrics,
+    optional_portfolio_with_metrics_adapter, portfolio_with_metrics_list_adapter
+)
+from app.core.metrics import time_calculator
+from app.services.cache_service import (
+    cache_service, portfolios_tag, bump_user_cache_version, user_cache_version
+)
 from collections import defaultdict
 
 
 class PortfolioService:
     """Service class for portfolio folder management operations"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def create_portfolio(self, portfolio_data: Dict[str, Any], user_id: int) -> Portfolio:
+    async def create_portfolio(self, portfolio_data: Dict[str, Any], user_id: int) -> Portfolio:
         """Create a new portfolio folder"""
         portfolio = Portfolio(
             user_id=user_id,
@@ -24,29 +33,34 @@ class PortfolioService:
         )
 
         self.db.add(portfolio)
-        self.db.commit()
-        self.db.refresh(portfolio)
+        await bump_user_cache_version(self.db, user_id)
+        await self.db.commit()
+        await cache_service.invalidate(portfolios_tag(user_id))
+        await self.db.refresh(portfolio)
 
         return portfolio
 
-    def get_user_portfolios(self, user_id: int, include_default: bool = True) -> List[Portfolio]:
+    async def get_user_portfolios(self, user_id: int, include_default: bool = True) -> List[Portfolio]:
         """Get all portfolio folders for a user"""
-        query = self.db.query(Portfolio).filter(Portfolio.user_id == user_id)
+        query = select(Portfolio).where(Portfolio.user_id == user_id)
 
         if not include_default:
-            query = query.filter(Portfolio.is_default == False)
+            query = query.where(Portfolio.is_default == False)
 
-        return query.order_by(Portfolio.name).all()
+        result = await self.db.execute(query.order_by(Portfolio.name))
+        return list(result.scalars().all())
 
-    def get_portfolio_by_id(self, portfolio_id: int, user_id: int) -> Optional[Portfolio]:
+    async def get_portfolio_by_id(self, portfolio_id: int, user_id: int) -> Optional[Portfolio]:
         """Get a portfolio folder by ID for a specific user"""
-        return self.db.query(Portfolio).filter(
-            and_(Portfolio.id == portfolio_id, Portfolio.user_id == user_id)
-        ).first()
+        result = await self.db.execute(
+            select(Portfolio).where(and_(Portfolio.id == portfolio_id, Portfolio.user_id == user_id))
+        )
+        return result.scalars().first()
 
-    def update_portfolio(self, portfolio_id: int, user_id: int, update_data: Dict[str, Any]) -> Optional[Portfolio]:
+    async def update_portfolio(self, portfolio_id: int, user_id: int,
+                               update_data: Dict[str, Any]) -> Optional[Portfolio]:
         """Update a portfolio folder"""
-        portfolio = self.get_portfolio_by_id(portfolio_id, user_id)
+        portfolio = await self.get_portfolio_by_id(portfolio_id, user_id)
 
         if not portfolio:
             return None
@@ -55,14 +69,16 @@ class PortfolioService:
             if hasattr(portfolio, key):
                 setattr(portfolio, key, value)
 
-        self.db.commit()
-        self.db.refresh(portfolio)
+        await bump_user_cache_version(self.db, user_id)
+        await self.db.commit()
+        await cache_service.invalidate(portfolios_tag(user_id))
+        await self.db.refresh(portfolio)
 
         return portfolio
 
-    def delete_portfolio(self, portfolio_id: int, user_id: int, move_properties_to: Optional[int] = None) -> bool:
+    async def delete_portfolio(self, portfolio_id: int, user_id: int, move_properties_to: Optional[int] = None) -> bool:
         """Delete a portfolio folder, optionally moving properties to another folder"""
-        portfolio = self.get_portfolio_by_id(portfolio_id, user_id)
+        portfolio = await self.get_portfolio_by_id(portfolio_id, user_id)
 
         if not portfolio:
             return False
@@ -74,66 +90,83 @@ class PortfolioService:
         # Handle properties in this portfolio
         if move_properties_to:
             # Move properties to specified portfolio
-            target_portfolio = self.get_portfolio_by_id(move_properties_to, user_id)
+            target_portfolio = await self.get_portfolio_by_id(move_properties_to, user_id)
             if target_portfolio:
-                self.db.query(Property).filter(
-                    Property.portfolio_id == portfolio_id
-                ).update({"portfolio_id": move_properties_to})
+                await self.db.execute(
+                    update(Property).where(Property.portfolio_id == portfolio_id)
+                    .values(portfolio_id=move_properties_to)
+                )
         else:
             # Move properties to default portfolio or set to None
-            default_portfolio = self.get_default_portfolio(user_id)
+            default_portfolio = await self.get_default_portfolio(user_id)
             new_portfolio_id = default_portfolio.id if default_portfolio else None
 
-            self.db.query(Property).filter(
-                Property.portfolio_id == portfolio_id
-            ).update({"portfolio_id": new_portfolio_id})
+            await self.db.execute(
+                update(Property).where(Property.portfolio_id == portfolio_id)
+                .values(portfolio_id=new_portfolio_id)
+            )
 
         # Delete the portfolio
-        self.db.delete(portfolio)
-        self.db.commit()
+        await self.db.delete(portfolio)
+        self.db.add(SyncTombstone(user_id=user_id, entity_type="portfolio", entity_id=portfolio_id))
+        await bump_user_cache_version(self.db, user_id)
+        await self.db.commit()
+        await cache_service.invalidate(portfolios_tag(user_id))
 
         return True
 
-    def move_property_to_portfolio(self, property_id: int, portfolio_id: int, user_id: int) -> bool:
+    async def move_property_to_portfolio(self, property_id: int, portfolio_id: int, user_id: int) -> bool:
         """Move a property to a different portfolio folder"""
         # Verify property belongs to user
-        property_obj = self.db.query(Property).filter(
-            and_(Property.id == property_id, Property.user_id == user_id)
-        ).first()
+        result = await self.db.execute(
+            select(Property).where(and_(Property.id == property_id, Property.user_id == user_id))
+        )
+        property_obj = result.scalars().first()
 
         if not property_obj:
             return False
 
         # Verify target portfolio belongs to user
-        portfolio = self.get_portfolio_by_id(portfolio_id, user_id)
+        portfolio = await self.get_portfolio_by_id(portfolio_id, user_id)
 
         if not portfolio:
             return False
 
         # Move the property
         property_obj.portfolio_id = portfolio_id
-        self.db.commit()
+        await bump_user_cache_version(self.db, user_id)
+        await self.db.commit()
+        await cache_service.invalidate(portfolios_tag(user_id))
 
         return True
 
-    def get_portfolio_properties(self, portfolio_id: int, user_id: int) -> Optional[List[Property]]:
+    async def get_portfolio_properties(self, portfolio_id: int, user_id: int) -> Optional[List[Property]]:
         """Get all properties in a specific portfolio folder"""
-        portfolio = self.get_portfolio_by_id(portfolio_id, user_id)
+        portfolio = await self.get_portfolio_by_id(portfolio_id, user_id)
 
         if not portfolio:
             return None
 
-        return self.db.query(Property).filter(
-            and_(Property.portfolio_id == portfolio_id, Property.user_id == user_id)
-        ).all()
+        result = await self.db.execute(
+            select(Property)
+            .where(and_(Property.portfolio_id == portfolio_id, Property.user_id == user_id))
+            .options(selectinload(Property.financials))
+        )
+        return list(result.scalars().all())
 
-    def calculate_portfolio_metrics(self, portfolio_id: int, user_id: int) -> Optional[PortfolioMetrics]:
+    async def calculate_portfolio_metrics(self, portfolio_id: int, user_id: int) -> Optional[PortfolioMetrics]:
         """Calculate financial metrics for a portfolio folder"""
-        properties = self.get_portfolio_properties(portfolio_id, user_id)
+        properties = await self.get_portfolio_properties(portfolio_id, user_id)
 
         if properties is None:
             return None
 
+        with time_calculator("portfolio_metrics", len(properties)):
+            return self._build_metrics(properties)
+
+    @staticmethod
+    def _build_metrics(properties: List[Property]) -> PortfolioMetrics:
+        """Aggregate metrics over properties (financials must already be loaded)"""
         # Initialize metrics
         metrics = {
             "property_count": len(properties),
@@ -243,15 +276,27 @@ class PortfolioService:
 
         return PortfolioMetrics(**metrics)
 
-    def get_portfolio_with_metrics(self, portfolio_id: int, user_id: int) -> Optional[PortfolioWithMetrics]:
-        """Get portfolio with calculated metrics"""
-        portfolio = self.get_portfolio_by_id(portfolio_id, user_id)
-
-        if not portfolio:
-            return None
-
-        metrics = self.calculate_portfolio_metrics(portfolio_id, user_id)
+    @staticmethod
+    def _folder_paths(portfolios: List[Portfolio]) -> Dict[int, str]:
+        """Build 'Rentals/Atlanta/Single Family' paths from parent_id without lazy-loading parents"""
+        by_id = {portfolio.id: portfolio for portfolio in portfolios}
+        paths: Dict[int, str] = {}
 
+        for portfolio in portfolios:
+            names = []
+            current = portfolio
+            seen = set()
+            while current is not None and current.id not in seen:
+                seen.add(current.id)
+                names.append(current.name)
+                current = by_id.get(current.parent_id)
+            paths[portfolio.id] = "/".join(reversed(names))
+
+        return paths
+
+    @staticmethod
+    def _with_metrics(portfolio: Portfolio, metrics: PortfolioMetrics, folder_path: str) -> PortfolioWithMetrics:
+        """Combine a portfolio row with its computed metrics"""
         return PortfolioWithMetrics(
             id=portfolio.id,
             user_id=portfolio.user_id,
@@ -264,34 +309,81 @@ class PortfolioService:
             created_at=portfolio.created_at,
             updated_at=portfolio.updated_at,
             metrics=metrics,
-            folder_path=portfolio.folder_path
+            folder_path=folder_path
         )
 
-    def get_user_portfolios_with_metrics(self, user_id: int, include_default: bool = True) -> List[
-        PortfolioWithMetrics]:
-        """Get all user portfolios with metrics"""
-        portfolios = self.get_user_portfolios(user_id, include_default)
+    async def get_portfolio_with_metrics(self, portfolio_id: int, user_id: int) -> Optional[PortfolioWithMetrics]:
+        """Get portfolio with calculated metrics (cached until the user's folders or properties change)"""
+        return await cache_service.get_or_load(
+            "portfolio", f"{user_id}:{await user_cache_version(self.db, user_id)}:{portfolio_id}",
+            [portfolios_tag(user_id)],
+            lambda: self._load_portfolio_with_metrics(portfolio_id, user_id),
+            optional_portfolio_with_metrics_adapter
+        )
 
-        result = []
-        for portfolio in portfolios:
-            portfolio_with_metrics = self.get_portfolio_with_metrics(portfolio.id, user_id)
-            if portfolio_with_metrics:
-                result.append(portfolio_with_metrics)
+    async def _load_portfolio_with_metrics(self, portfolio_id: int,
+                                           user_id: int) -> Optional[PortfolioWithMetrics]:
+        """Compute get_portfolio_with_metrics from the database"""
+        portfolios = await self.get_user_portfolios(user_id)
+        portfolio = next((p for p in portfolios if p.id == portfolio_id), None)
+
+        if not portfolio:
+            return None
 
-        return result
+        metrics = await self.calculate_portfolio_metrics(portfolio_id, user_id)
 
-    def get_default_portfolio(self, user_id: int) -> Optional[Portfolio]:
-        """Get or create the default 'All Properties' portfolio for a user"""
-        default_portfolio = self.db.query(Portfolio).filter(
-            and_(Portfolio.user_id == user_id, Portfolio.is_default == True)
-        ).first()
+        return self._with_metrics(portfolio, metrics, self._folder_paths(portfolios)[portfolio.id])
 
-        return default_portfolio
+    async def get_user_portfolios_with_metrics(self, user_id: int, include_default: bool = True) -> List[
+        PortfolioWithMetrics]:
+        """Get all user portfolios with metrics (cached until the user's folders or properties change)"""
+        return await cache_service.get_or_load(
+            "portfolio_list", f"{user_id}:{await user_cache_version(self.db, user_id)}:{int(include_default)}",
+            [portfolios_tag(user_id)],
+            lambda: self._load_user_portfolios_with_metrics(user_id, include_default),
+            portfolio_with_metrics_list_adapter
+        )
 
-    def initialize_default_portfolio(self, user_id: int) -> Portfolio:
+    async def _load_user_portfolios_with_metrics(self, user_id: int,
+                                                 include_default: bool) -> List[PortfolioWithMetrics]:
+        """Compute get_user_portfolios_with_metrics from the database"""
+        # Folder paths need every ancestor, so load all folders and filter afterwards
+        portfolios = await self.get_user_portfolios(user_id)
+        folder_paths = self._folder_paths(portfolios)
+
+        # One query for every property in every folder, grouped in Python
+        result = await self.db.execute(
+            select(Property)
+            .where(and_(Property.user_id == user_id, Property.portfolio_id.isnot(None)))
+            .options(selectinload(Property.financials))
+        )
+        properties = result.scalars().all()
+        properties_by_portfolio = defaultdict(list)
+        for prop in properties:
+            properties_by_portfolio[prop.portfolio_id].append(prop)
+
+        with time_calculator("portfolio_list_metrics", len(properties)):
+            return [
+                self._with_metrics(
+                    portfolio,
+                    self._build_metrics(properties_by_portfolio[portfolio.id]),
+                    folder_paths[portfolio.id]
+                )
+                for portfolio in portfolios
+                if include_default or not portfolio.is_default
+            ]
+
+    async def get_default_portfolio(self, user_id: int) -> Optional[Portfolio]:
+        """Get or create the default 'All Properties' portfolio for a user"""
+        result = await self.db.execute(
+            select(Portfolio).where(and_(Portfolio.user_id == user_id, Portfolio.is_default == True))
+        )
+        return result.scalars().first()
+
+    async def initialize_default_portfolio(self, user_id: int) -> Portfolio:
         """Create default portfolio and move all unassigned properties to it"""
         # Check if default portfolio already exists
-        existing_default = self.get_default_portfolio(user_id)
+        existing_default = await self.get_default_portfolio(user_id)
         if existing_default:
             return existing_default
 
@@ -306,14 +398,17 @@ class PortfolioService:
         )
 
         self.db.add(default_portfolio)
-        self.db.commit()
-        self.db.refresh(default_portfolio)
+        await self.db.flush()
 
         # Move all unassigned properties to default portfolio
-        self.db.query(Property).filter(
-            and_(Property.user_id == user_id, Property.portfolio_id.is_(None))
-        ).update({"portfolio_id": default_portfolio.id})
+        await self.db.execute(
+            update(Property).where(and_(Property.user_id == user_id, Property.portfolio_id.is_(None)))
+            .values(portfolio_id=default_portfolio.id)
+        )
 
-        self.db.commit()
+        await bump_user_cache_version(self.db, user_id)
+        await self.db.commit()
+        await cache_service.invalidate(portfolios_tag(user_id))
+        await self.db.refresh(default_portfolio)
 
-        return default_portfolio
\ No newline at end of file
+        return default_portfolio
@@ -2,18 +2,31 @@
 # Property CRUD operations with financial calculations
 
 from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
 from app.models.property import Property, PropertyFinancials, PropertyType, PropertyStatus
+from app.models.sync_tombstone import SyncTombstone
 from app.services.financial_calculator import FinancialCalculator
+from app.services.cache_service import (
+    cache_service, portfolios_tag, property_tag, bump_user_cache_version, user_cache_version
+)
+from app.schemas.property import PropertyMetrics, optional_property_metrics_adapter
+from app.core.metrics import time_calculator
+
+
+class DuplicateAddressError(Exception):
+    """Another of the user's properties has the same address (Property.address_key)"""
+    pass
 
 
 class PropertyService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.financial_calculator = FinancialCalculator()
 
-    def create_property(self, property_data: dict, user_id: int) -> Property:
+    async def create_property(self, property_data: dict, user_id: int) -> Property:
         """Create new property with automatic financial calculations"""
         # Create property
         property_obj = Property(
@@ -32,9 +45,6 @@ class PropertyService:
             portfolio_id=property_data.get('portfolio_id')
         )
 
-        self.db.add(property_obj)
-        self.db.flush()  # Get the ID without committing
-
         # Prepare financial data for calculator
         financial_input = {
             'monthly_rent': property_data.get('monthly_rent', 0),
@@ -50,11 +60,11 @@ class PropertyService:
         }
 
         # Use Python to calculate metrics
-        metrics = self.financial_calculator.calculate_all_metrics(financial_input)
+        with time_calculator("property_metrics"):
+            metrics = self.financial_calculator.calculate_all_metrics(financial_input)
 
         # Create financials record
         financials = PropertyFinancials(
-            property_id=property_obj.id,
             monthly_rent=financial_input['monthly_rent'],
             property_taxes=financial_input['property_taxes'],
             insurance=financial_input['insurance'],
@@ -69,27 +79,38 @@ class PropertyService:
             cash_on_cash_return=metrics['cash_on_cash_return']
         )
 
-        self.db.add(financials)
-        self.db.commit()
-        self.db.refresh(property_obj)
+        # Attach through the relationship: the flush fills in property_id,
+        # and the response has financials loaded without another query
+        property_obj.financials = financials
+
+        self.db.add(property_obj)
+        await bump_user_cache_version(self.db, user_id)
+        await self._commit_property()
+        await cache_service.invalidate(portfolios_tag(user_id), property_tag(property_obj.id))
 
         return property_obj
 
-    def get_user_properties(self, user_id: int) -> List[Property]:
+    async def get_user_properties(self, user_id: int) -> List[Property]:
         """Get all properties for a user"""
-        return self.db.query(Property).filter(
-            Property.user_id == user_id
-        ).all()
+        result = await self.db.execute(
+            select(Property)
+            .where(Property.user_id == user_id)
+            .options(selectinload(Property.financials))
+        )
+        return list(result.scalars().all())
 
-    def get_property_by_id(self, property_id: int, user_id: int) -> Optional[Property]:
+    async def get_property_by_id(self, property_id: int, user_id: int) -> Optional[Property]:
         """Get a specific property (user must own it)"""
-        return self.db.query(Property).filter(
-            and_(Property.id == property_id, Property.user_id == user_id)
-        ).first()
+        result = await self.db.execute(
+            select(Property)
+            .where(and_(Property.id == property_id, Property.user_id == user_id))
+            .options(selectinload(Property.financials))
+        )
+        return result.scalars().first()
 
-    def update_property(self, property_id: int, user_id: int, update_data: dict) -> Optional[Property]:
+    async def update_property(self, property_id: int, user_id: int, update_data: dict) -> Optional[Property]:
         """Update property and recalculate financials"""
-        property_obj = self.get_property_by_id(property_id, user_id)
+        property_obj = await self.get_property_by_id(property_id, user_id)
         if not property_obj:
             return None
 
@@ -121,20 +142,62 @@ class PropertyService:
         if any(field in update_data for field in financial_fields):
             self._recalculate_financials(property_obj, update_data)
 
-        self.db.commit()
-        self.db.refresh(property_obj)
+        await bump_user_cache_version(self.db, user_id)
+        await self._commit_property()
+        await cache_service.invalidate(portfolios_tag(user_id), property_tag(property_id))
         return property_obj
 
-    def delete_property(self, property_id: int, user_id: int) -> bool:
+    async def _commit_property(self):
+        """Commit a new or edited property; DuplicateAddressError if the user has one at its address"""
+        try:
+            await self.db.commit()
+        except IntegrityError as e:
+            await self.db.rollback()
+            if "ix_properties_user_id_address_key" in str(e.orig):
+                raise DuplicateAddressError("You already have a property at this address")
+            raise
+
+    async def delete_property(self, property_id: int, user_id: int) -> bool:
         """Delete property (user must own it)"""
-        property_obj = self.get_property_by_id(property_id, user_id)
+        property_obj = await self.get_property_by_id(property_id, user_id)
         if not property_obj:
             return False
 
-        self.db.delete(property_obj)
-        self.db.commit()
+        await self.db.delete(property_obj)
+        self.db.add(SyncTombstone(user_id=user_id, entity_type="property", entity_id=property_id))
+        await bump_user_cache_version(self.db, user_id)
+        await self.db.commit()
+        await cache_service.invalidate(portfolios_tag(user_id), property_tag(property_id))
         return True
 
+    async def get_property_metrics(self, property_id: int, user_id: int) -> Optional[PropertyMetrics]:
+        """Get detailed financial metrics for a property (cached until it changes)"""
+        return await cache_service.get_or_load(
+            "property_metrics", f"{user_id}:{await user_cache_version(self.db, user_id)}:{property_id}",
+            [property_tag(property_id)],
+            lambda: self._load_property_metrics(property_id, user_id),
+            optional_property_metrics_adapter
+        )
+
+    async def _load_property_metrics(self, property_id: int, user_id: int) -> Optional[PropertyMetrics]:
+        """Compute get_property_metrics from the database; None without the property or its financials"""
+        property_obj = await self.get_property_by_id(property_id, user_id)
+        if not property_obj or not property_obj.financials:
+            return None
+
+        financials = property_obj.financials
+        return PropertyMetrics(
+            property_id=property_id,
+            monthly_cash_flow=financials.cash_flow,
+            annual_cash_flow=financials.cash_flow * 12,
+            cap_rate=financials.cap_rate,
+            roi=financials.cash_on_cash_return,
+            monthly_rent=financials.monthly_rent,
+            monthly_expenses=financials.get_total_monthly_expenses(),
+            vacancy_rate=financials.vacancy_rate,
+            property_value=property_obj.current_value
+        )
+
     def _recalculate_financials(self, property_obj: Property, update_data: dict):
         """Recalculate financial metrics when data changes"""
         if not property_obj.financials:
@@ -172,7 +235,8 @@ class PropertyService:
         }
 
         # Recalculate metrics using Python
-        metrics = self.financial_calculator.calculate_all_metrics(financial_input)
+        with time_calculator("property_metrics"):
+            metrics = self.financial_calculator.calculate_all_metrics(financial_input)
 
         # Update calculated fields
         property_obj.financials.cap_rate = metrics['cap_rate']
@@ -0,0 +1,162 @@
+# app/services/simulation_engine.py
+# Monte Carlo projections of a property's value and cash flow, vectorized over paths
+#
+# Each path draws a yearly appreciation and rent growth (normal, with the
+# given mean and volatility); expenses grow at a fixed rate and the mortgage
+# payment stays as it is. A simulation runs a batch of paths at a time
+# (simulate_batch, in the worker's process pool), so it can stop between
+# batches when cancelled or out of time. Batch i draws from the generator
+# seeded with (seed, i): the same seed gives the same paths however the
+# batches are scheduled. A scenario is one path without volatility.
+
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.array_codec import encode_array
+
+PERCENTILES = [5, 25, 50, 75, 95]
+
+
+@dataclass(frozen=True)
+class SimulationInputs:
+    """A property's numbers and the simulation's assumptions, resolved (picklable, for the process pool)"""
+    years: int
+    paths: int
+    seed: int
+    current_value: float
+    initial_investment: float  # Down payment, or the value when there's none
+    annual_rent: float
+    annual_operating_expenses: float  # Without the mortgage
+    annual_debt_service: float
+    vacancy_rate: float
+    appreciation: float
+    appreciation_volatility: float
+    rent_growth: float
+    rent_growth_volatility: float
+    expense_growth: float
+
+
+def simulation_inputs(property_obj, financials, parameters: Dict[str, Any], seed: int) -> SimulationInputs:
+    """Inputs for a property (financials may be None); parameters left out default to the property's own"""
+    def financial(name: str, default: float) -> float:
+        value = getattr(financials, name, None) if financials is not None else None
+        return default if value is None else float(value)
+
+    def parameter(name: str, default: float) -> float:
+        value = parameters.get(name)
+        return default if value is None else float(value)
+
+    current_value = float(property_obj.current_value or property_obj.purchase_price or 0)
+    operating_expenses = sum(
+        financial(name, 0) for name in
+        ("property_taxes", "insurance", "hoa_fees", "maintenance_costs", "property_management", "utilities",
+         "other_expenses")
+    )
+    return SimulationInputs(
+        years=int(parameters["years"]),
+        paths=int(parameters["paths"]),
+        seed=seed,
+        current_value=current_value,
+        initial_investment=float(property_obj.down_payment or 0) or current_value,
+        annual_rent=(financial("monthly_rent", 0) + financial("other_monthly_income", 0)) * 12,
+        annual_operating_expenses=operating_expenses * 12,
+        annual_debt_service=financial("mortgage_payment", 0) * 12,
+        vacancy_rate=parameter("vacancy_rate", financial("vacancy_rate", 0.05)),
+        appreciation=parameter("appreciation", financial("annual_appreciation", 0.04)),
+        appreciation_volatility=parameter("appreciation_volatility", 0),
+        rent_growth=parameter("rent_growth", financial("annual_rent_increase", 0.03)),
+        rent_growth_volatility=parameter("rent_growth_volatility", 0),
+        expense_growth=parameter("expense_growth", financial("annual_expense_increase", 0.03)),
+    )
+
+
+def batch_sizes(paths: int, batch_paths: int) -> List[int]:
+    """Paths per batch: full batches, then the rest"""
+    full, rest = divmod(paths, batch_paths)
+    return [batch_paths] * full + ([rest] if rest else [])
+
+
+def simulate_batch(inputs: SimulationInputs, paths: int, index: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Batch `index` of a simulation: (property value at the start of each year and
+    the end of the last, paths x years + 1; annual cash flow, paths x years)
+    """
+    rng = np.random.default_rng([inputs.seed, index])
+    shape = (paths, inputs.years)
+    appreciation = rng.normal(inputs.appreciation, inputs.appreciation_volatility, shape)
+    rent_growth = rng.normal(inputs.rent_growth, inputs.rent_growth_volatility, shape)
+
+    value = np.empty((paths, inputs.years + 1))
+    value[:, 0] = inputs.current_value
+    # A year can't lose more than everything
+    np.cumprod(1 + np.maximum(appreciation, -1), axis=1, out=value[:, 1:])
+    value[:, 1:] *= inputs.current_value
+
+    # Year 1 is the current rent; growth applies from year 2 on
+    rent_factor = np.ones(shape)
+    np.cumprod(1 + np.maximum(rent_growth[:, :-1], -1), axis=1, out=rent_factor[:, 1:])
+    expenses = inputs.annual_operating_expenses * (1 + inputs.expense_growth) ** np.arange(inputs.years)
+    cash_flow = (
+        inputs.annual_rent * (1 - inputs.vacancy_rate) * rent_factor - expenses - inputs.annual_debt_service
+    )
+    return value.astype(np.float32), cash_flow.astype(np.float32)
+
+
+def _percentiles(values: np.ndarray) -> Dict[str, float]:
+    return {f"p{p}": float(v) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+
+def interim_percentiles(batches: List[Tuple[np.ndarray, np.ndarray]]) -> Dict[str, Dict[str, float]]:
+    """Percentiles of the final property value and total cash flow over the paths simulated so far (live progress)"""
+    return {
+        "final_property_value": _percentiles(np.concatenate([batch[0][:, -1] for batch in batches])),
+        "total_cash_flow": _percentiles(np.concatenate([batch[1].sum(axis=1, dtype=np.float64) for batch in batches])),
+    }
+
+
+def summarize_paths(inputs: SimulationInputs,
+                    batches: List[Tuple[np.ndarray, np.ndarray]]) -> Tuple[Dict[str, Any], Dict[str, Optional[float]], dict]:
+    """
+    A finished simulation's batches, as stored: (result summary, Simulation's
+    summary columns (medians), encoded arrays for save_results)
+    """
+    value = np.concatenate([batch[0] for batch in batches])
+    cash_flow = np.concatenate([batch[1] for batch in batches])
+    cumulative_cash_flow = np.cumsum(cash_flow, axis=1, dtype=np.float64)
+
+    final_value = value[:, -1].astype(np.float64)
+    total_cash_flow = cumulative_cash_flow[:, -1]
+    gain = final_value - inputs.current_value + total_cash_flow
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total_return = gain / inputs.initial_investment * 100 if inputs.initial_investment else np.zeros_like(gain)
+        annual_return = (np.power(np.maximum(1 + total_return / 100, 0), 1 / inputs.years) - 1) * 100
+
+    value_percentiles = np.percentile(value, PERCENTILES, axis=0).astype(np.float32)
+    cash_flow_percentiles = np.percentile(cumulative_cash_flow, PERCENTILES, axis=0).astype(np.float32)
+    results = {
+        "inputs": asdict(inputs),
+        "percentiles": PERCENTILES,
+        "final_property_value": _percentiles(final_value),
+        "total_cash_flow": _percentiles(total_cash_flow),
+        "total_return": _percentiles(total_return),
+        "annual_return": _percentiles(annual_return),
+        "probability_of_loss": float(np.mean(gain < 0)),
+        # Median by year, for a chart without fetching an array
+        "median_property_value": value_percentiles[PERCENTILES.index(50)].tolist(),
+        "median_cumulative_cash_flow": cash_flow_percentiles[PERCENTILES.index(50)].tolist(),
+    }
+    metrics = {
+        "final_property_value": results["final_property_value"]["p50"],
+        "total_cash_flow": results["total_cash_flow"]["p50"],
+        "total_return": results["total_return"]["p50"],
+        "annual_return": results["annual_return"]["p50"],
+    }
+    arrays = {
+        "property_value": value,  # paths x years + 1
+        "cash_flow": cash_flow,  # paths x years
+        "property_value_percentiles": value_percentiles,  # PERCENTILES x years + 1
+        "cumulative_cash_flow_percentiles": cash_flow_percentiles,  # PERCENTILES x years
+    }
+    return results, metrics, {name: encode_array(array) for name, array in arrays.items()}
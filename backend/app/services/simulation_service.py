@@ -0,0 +1,325 @@
+# app/services/simulation_service.py
+# Simulations and their results: a JSON summary on the row, large arrays stored compressed apart
+#
+# Simulation.results holds what a page shows (scalars, percentile tables over
+# a few years) and is deferred: listing simulations never reads it. Per-path
+# yearly values and full percentile grids are SimulationArrays, compressed
+# NumPy arrays (app/core/array_codec.py) in their own table, only read when
+# a client asks for one; it gets a slice of rows, cut on the server.
+#
+# Simulations are CPU-heavy, so they run as background jobs ("run_simulation",
+# app/jobs/handlers.py): the worker's process pool simulates
+# SIMULATION_BATCH_PATHS paths at a time (app/services/simulation_engine.py),
+# and between batches the run stops if it was cancelled or has used up its
+# time budget. Requesting a simulation returns its id at once, to poll.
+# A user has at most SIMULATION_MAX_IN_FLIGHT_PER_USER simulations queued or
+# running, and requesting one identical to one of those (same property and
+# parameters_hash) returns that one instead of running it twice.
+# Each progress commit also publishes paths done and interim percentiles
+# (app/jobs/progress.py), for clients following the job live.
+
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import secrets
+import time
+
+import numpy as np
+import orjson
+from sqlalchemy import and_, delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
+
+from app.core.array_codec import CODEC, decode_array
+from app.core.settings import settings
+from app.jobs.queue import cancel_job, enqueue
+from app.models.job import Job, JobStatus
+from app.models.property import Property, PropertyFinancials
+from app.models.simulation import Simulation, SimulationArray, SimulationStatus
+from app.models.user import User
+from app.schemas.simulation import SimulationArrayInfo, SimulationArraySlice, SimulationCreate, SimulationResponse
+from app.services.simulation_engine import (
+    batch_sizes, interim_percentiles, simulate_batch, simulation_inputs, summarize_paths
+)
+
+IN_FLIGHT = (SimulationStatus.PENDING, SimulationStatus.RUNNING)
+PROGRESS_INTERVAL_SECONDS = 1.0  # paths_completed is committed at most this often
+
+
+class ArraySliceTooLarge(ValueError):
+    """A requested slice has more values than SIMULATION_ARRAY_MAX_VALUES"""
+
+
+class TooManySimulations(Exception):
+    """The user already has SIMULATION_MAX_IN_FLIGHT_PER_USER simulations queued or running"""
+
+
+def parameters_hash(request: SimulationCreate) -> str:
+    """sha256 of what determines a simulation's results (not its name, nor its time budget)"""
+    key = {
+        "property_id": request.property_id,
+        "simulation_type": request.simulation_type,
+        "parameters": request.parameters.model_dump(),
+    }
+    return hashlib.sha256(orjson.dumps(key, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def slice_bounds(shape: List[int], start: int, stop: Optional[int], step: int) -> Tuple[int, int]:
+    """
+    Rows start:stop:step of an array, clipped to it; without a stop, as many rows as
+    SIMULATION_ARRAY_MAX_VALUES allows (the client pages with start)
+    """
+    row_values = int(np.prod(shape[1:], dtype=np.int64))
+    start = min(start, shape[0])
+    if stop is None:
+        rows = max(1, settings.SIMULATION_ARRAY_MAX_VALUES // max(row_values, 1))
+        return start, min(shape[0], start + rows * step)
+    stop = max(start, min(stop, shape[0]))
+    if len(range(start, stop, step)) * row_values > settings.SIMULATION_ARRAY_MAX_VALUES:
+        raise ArraySliceTooLarge(
+            f"At most {settings.SIMULATION_ARRAY_MAX_VALUES} values per request: ask for fewer rows, or a larger step"
+        )
+    return start, stop
+
+
+class SimulationService:
+    """Service class for simulation results"""
+
+    def __init__(self, db: AsyncSession, run_cpu: Optional[Callable[..., Awaitable]] = None):
+        self.db = db
+        # The simulation itself: the job's process pool (JobContext.run_cpu), else threads
+        self.run_cpu = run_cpu or asyncio.to_thread
+
+    async def queue_simulation(self, request: SimulationCreate, user_id: int) -> Optional[Tuple[Simulation, bool]]:
+        """
+        Queue a job running a simulation (app/jobs/handlers.py): (simulation, False), or (the
+        identical simulation already queued or running, True). None if the user has no such
+        property; raises TooManySimulations when the user is at SIMULATION_MAX_IN_FLIGHT_PER_USER.
+        """
+        # One request per user at a time from here to the commit, so two identical
+        # requests can't both miss each other, nor two requests both pass the cap
+        await self.db.execute(select(User.id).where(User.id == user_id).with_for_update())
+        owned = await self.db.scalar(
+            select(Property.id).where(and_(Property.id == request.property_id, Property.user_id == user_id))
+        )
+        if owned is None:
+            await self.db.rollback()
+            return None
+
+        params_hash = parameters_hash(request)
+        in_flight = list(await self.db.scalars(
+            select(Simulation)
+            .join(Job, Job.id == Simulation.job_id)
+            .where(and_(
+                Simulation.user_id == user_id,
+                Simulation.status.in_(IN_FLIGHT),
+                # A simulation whose job died with its worker isn't running anymore
+                Job.status.in_((JobStatus.QUEUED, JobStatus.RUNNING))
+            ))
+        ))
+        identical = next((simulation for simulation in in_flight if simulation.params_hash == params_hash), None)
+        if identical is not None:
+            await self.db.commit()
+            return identical, True
+        if len(in_flight) >= settings.SIMULATION_MAX_IN_FLIGHT_PER_USER:
+            await self.db.rollback()
+            raise TooManySimulations(
+                f"You have {len(in_flight)} simulations queued or running: "
+                f"wait for one to finish, or cancel one"
+            )
+
+        simulation = Simulation(
+            user_id=user_id,
+            property_id=request.property_id,
+            name=request.name,
+            simulation_type=request.simulation_type,
+            description=request.description,
+            parameters=request.parameters.model_dump(),
+            params_hash=params_hash,
+            years_projected=request.parameters.years,
+            status=SimulationStatus.PENDING,
+            paths_completed=0
+        )
+        self.db.add(simulation)
+        await self.db.flush()
+        time_budget = min(request.time_budget_seconds or settings.SIMULATION_TIME_BUDGET_SECONDS,
+                          settings.SIMULATION_TIME_BUDGET_SECONDS)
+        job = await enqueue(self.db, "run_simulation", {
+            "simulation_id": simulation.id,
+            "time_budget_seconds": time_budget
+        }, user_id=user_id)
+        simulation.job_id = job.id
+        await self.db.commit()
+        await self.db.refresh(simulation)  # Server-side timestamps
+        return simulation, False
+
+    async def get_user_simulations(self, user_id: int, property_id: Optional[int] = None,
+                                   limit: int = 50) -> List[Simulation]:
+        """A user's most recent simulations, without their results"""
+        query = select(Simulation).where(Simulation.user_id == user_id)
+        if property_id is not None:
+            query = query.where(Simulation.property_id == property_id)
+        result = await self.db.execute(query.order_by(Simulation.created_at.desc()).limit(limit))
+        return list(result.scalars().all())
+
+    async def get_simulation(self, simulation_id: int, user_id: int) -> Optional[Simulation]:
+        """A simulation with its result summary"""
+        result = await self.db.execute(
+            select(Simulation)
+            .options(undefer(Simulation.results))
+            .where(and_(Simulation.id == simulation_id, Simulation.user_id == user_id))
+        )
+        return result.scalars().first()
+
+    async def get_simulation_response(self, simulation_id: int, user_id: int) -> Optional[SimulationResponse]:
+        """A simulation's summary, parameters and the arrays it stored (their shapes, not their values)"""
+        simulation = await self.get_simulation(simulation_id, user_id)
+        if simulation is None:
+            return None
+        rows = await self.db.execute(
+            select(SimulationArray.name, SimulationArray.dtype, SimulationArray.shape)
+            .where(SimulationArray.simulation_id == simulation_id)
+            .order_by(SimulationArray.name)
+        )
+        response = SimulationResponse.model_validate(simulation)
+        response.arrays = [SimulationArrayInfo.model_validate(row) for row in rows]
+        return response
+
+    async def get_job(self, simulation: Simulation) -> Optional[Job]:
+        """The job running a simulation (to cancel it)"""
+        return await self.db.get(Job, simulation.job_id) if simulation.job_id is not None else None
+
+    async def get_array_slice(self, simulation_id: int, user_id: int, name: str, start: int = 0,
+                              stop: Optional[int] = None, step: int = 1) -> Optional[SimulationArraySlice]:
+        """
+        Rows start:stop:step of a result array (see slice_bounds); None if the user
+        has no such simulation or it has no such array
+        """
+        result = await self.db.execute(
+            select(SimulationArray)
+            .options(undefer(SimulationArray.data))
+            .join(Simulation, Simulation.id == SimulationArray.simulation_id)
+            .where(and_(
+                SimulationArray.simulation_id == simulation_id,
+                SimulationArray.name == name,
+                Simulation.user_id == user_id
+            ))
+        )
+        stored = result.scalars().first()
+        if stored is None:
+            return None
+
+        start, stop = slice_bounds(stored.shape, start, stop, step)
+        array = await asyncio.to_thread(decode_array, stored.dtype, stored.shape, stored.data)
+        return SimulationArraySlice(
+            name=stored.name, dtype=stored.dtype, shape=stored.shape,
+            start=start, stop=stop, step=step, values=array[start:stop:step].tolist()
+        )
+
+    async def run_simulation(self, simulation: Simulation, time_budget_seconds: float,
+                             cancelled: Optional[Callable[[], bool]] = None,
+                             progress: Optional[Callable[..., Awaitable[None]]] = None) -> Simulation:
+        """
+        Simulate every path, a batch at a time, and store the results (COMPLETED)
+        Marks the simulation CANCELLED once `cancelled()` is true between batches,
+        and FAILED when its property is gone or it runs past its time budget.
+        `progress(db, paths_completed, paths, percentiles=...)` is awaited before
+        each progress commit (JobContext.report_progress).
+        """
+        simulation.status = SimulationStatus.RUNNING
+        simulation.started_at = datetime.now(timezone.utc)
+        simulation.completed_at = None
+        simulation.paths_completed = 0
+        simulation.error = None
+        await self.db.commit()
+
+        row = (await self.db.execute(
+            select(Property, PropertyFinancials)
+            .outerjoin(PropertyFinancials, PropertyFinancials.property_id == Property.id)
+            .where(Property.id == simulation.property_id)
+        )).first()
+        if row is None:
+            return await self.finish(simulation, SimulationStatus.FAILED, "The property no longer exists")
+
+        parameters = simulation.parameters
+        # Without a seed, each run draws new paths; the one used is kept with the results
+        seed = parameters["seed"] if parameters.get("seed") is not None else secrets.randbits(63)
+        inputs = simulation_inputs(*row, parameters, seed)
+
+        started = time.monotonic()
+        reported = started
+        batches = []
+        for index, paths in enumerate(batch_sizes(inputs.paths, settings.SIMULATION_BATCH_PATHS)):
+            if cancelled is not None and cancelled():
+                return await self.finish(
+                    simulation, SimulationStatus.CANCELLED, f"Cancelled after {simulation.paths_completed} paths"
+                )
+            if time.monotonic() - started > time_budget_seconds:
+                return await self.finish(
+                    simulation, SimulationStatus.FAILED,
+                    f"Stopped after its time budget of {time_budget_seconds:g} s "
+                    f"({simulation.paths_completed} of {inputs.paths} paths)"
+                )
+            batches.append(await self.run_cpu(simulate_batch, inputs, paths, index))
+            simulation.paths_completed += paths
+            if time.monotonic() - reported >= PROGRESS_INTERVAL_SECONDS:
+                reported = time.monotonic()
+                if progress is not None:
+                    percentiles = await asyncio.to_thread(interim_percentiles, batches)
+                    await progress(self.db, simulation.paths_completed, inputs.paths, percentiles=percentiles)
+                await self.db.commit()
+
+        results, metrics, encoded = await self.run_cpu(summarize_paths, inputs, batches)
+        for name, value in metrics.items():
+            setattr(simulation, name, value)
+        return await self.save_results(simulation, results, encoded)
+
+    async def finish(self, simulation: Simulation, status: SimulationStatus,
+                     error: Optional[str] = None) -> Simulation:
+        """End a simulation without results (FAILED or CANCELLED)"""
+        simulation.status = status
+        simulation.error = error
+        simulation.completed_at = datetime.now(timezone.utc)
+        await self.db.commit()
+        return simulation
+
+    async def save_results(self, simulation: Simulation, results: Dict[str, Any],
+                           encoded: Dict[str, Tuple[str, List[int], bytes]]) -> Simulation:
+        """
+        Store a simulation's result summary and its arrays, already encoded (by summarize_paths,
+        off the event loop), replacing the arrays it had: the simulation is COMPLETED
+        """
+        simulation.results = results
+        simulation.status = SimulationStatus.COMPLETED
+        simulation.error = None
+        simulation.completed_at = datetime.now(timezone.utc)
+        self.db.add(simulation)
+        await self.db.flush()
+
+        await self.db.execute(delete(SimulationArray).where(SimulationArray.simulation_id == simulation.id))
+        self.db.add_all([
+            SimulationArray(simulation_id=simulation.id, name=name, dtype=dtype, shape=shape, codec=CODEC, data=data)
+            for name, (dtype, shape, data) in encoded.items()
+        ])
+        await self.db.commit()
+        return simulation
+
+    async def delete_simulation(self, simulation_id: int, user_id: int) -> bool:
+        """
+        Delete a simulation (its arrays go with it, ON DELETE CASCADE), cancelling its job
+        first: a queued one never runs, a running one stops at its next batch
+        """
+        simulation = await self.db.scalar(
+            select(Simulation).where(and_(Simulation.id == simulation_id, Simulation.user_id == user_id))
+        )
+        if simulation is None:
+            return False
+        if simulation.job_id is not None:
+            job = await self.db.get(Job, simulation.job_id)
+            if job is not None:
+                await cancel_job(self.db, job)
+
+        await self.db.execute(delete(Simulation).where(Simulation.id == simulation.id))
+        await self.db.commit()
+        return True
@@ -0,0 +1,75 @@
+# app/services/sync_service.py
+# Delta sync: everything that changed for a user since a cursor
+
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
+from sqlalchemy import and_, or_, func, select
+from app.models.property import Property, PropertyFinancials
+from app.models.portfolio import Portfolio
+from app.models.sync_tombstone import SyncTombstone
+
+
+class SyncService:
+    """Service class for incremental client refresh"""
+
+    # updated_at is the transaction start time, so a write that began just
+    # before a cursor was issued can commit with an older timestamp.
+    # Re-sending a few seconds of overlap catches those rows.
+    CURSOR_OVERLAP = timedelta(seconds=5)
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_changes(self, user_id: int, since: Optional[datetime] = None) -> Dict[str, Any]:
+        """Get properties, financials and portfolios changed after `since` plus deletions"""
+        # Take the cursor from the database clock, before reading, so nothing
+        # committed while we read can fall between two syncs
+        cursor = await self.db.scalar(select(func.now()))
+
+        property_query = select(Property).outerjoin(Property.financials).options(
+            contains_eager(Property.financials)
+        ).where(Property.user_id == user_id)
+        portfolio_query = select(Portfolio).where(Portfolio.user_id == user_id)
+
+        if since is None:
+            properties = await self.db.execute(property_query)
+            portfolios = await self.db.execute(portfolio_query.order_by(Portfolio.name))
+            return {
+                "cursor": cursor,
+                "full": True,
+                "properties": properties.scalars().all(),
+                "portfolios": portfolios.scalars().all(),
+            }
+
+        window_start = since - self.CURSOR_OVERLAP
+
+        properties = (await self.db.execute(property_query.where(
+            or_(Property.updated_at > window_start, PropertyFinancials.updated_at > window_start)
+        ))).scalars().all()
+
+        portfolios = (await self.db.execute(
+            portfolio_query.where(Portfolio.updated_at > window_start)
+        )).scalars().all()
+
+        tombstones = (await self.db.execute(
+            select(SyncTombstone.entity_type, SyncTombstone.entity_id).where(
+                and_(SyncTombstone.user_id == user_id, SyncTombstone.deleted_at > window_start)
+            )
+        )).all()
+
+        deleted = {"properties": [], "portfolios": []}
+        for entity_type, entity_id in tombstones:
+            if entity_type == "property":
+                deleted["properties"].append(entity_id)
+            elif entity_type == "portfolio":
+                deleted["portfolios"].append(entity_id)
+
+        return {
+            "cursor": cursor,
+            "full": False,
+            "properties": properties,
+            "portfolios": portfolios,
+            "deleted": deleted,
+        }
@@ -0,0 +1,52 @@
+# app/tests/conftest.py
+# Shared fixtures: async tests run on asyncio (anyio's pytest plugin); database tests need DATABASE_URL
+
+import uuid
+
+import asyncpg
+import pytest
+from sqlalchemy import delete, select, text
+from sqlalchemy.exc import DBAPIError
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.models.portfolio import Portfolio
+from app.models.property import Property, PropertyFinancials
+from app.models.simulation import Simulation
+from app.models.user import User
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db():
+    """A session on the configured database; the test is skipped when it can't be reached"""
+    async with AsyncSessionLocal() as session:
+        try:
+            await session.execute(text("SELECT 1"))
+        except (OSError, DBAPIError, asyncpg.PostgresError) as e:  # Unreachable, or the role/database is refused
+            pytest.skip(f"Database unavailable: {e}")
+        yield session
+    # Each test runs on its own event loop; pooled asyncpg connections can't outlive it
+    await async_engine.dispose()
+
+
+@pytest.fixture
+async def user(db):
+    """A throwaway user (deleted with its properties, portfolios and simulations)"""
+    user = User(email=f"test-{uuid.uuid4().hex[:12]}@example.com", hashed_password="x", is_active=True)
+    db.add(user)
+    await db.commit()
+    user_id = user.id
+    yield user
+    await db.rollback()
+    await db.execute(delete(Simulation).where(Simulation.user_id == user_id))
+    await db.execute(delete(PropertyFinancials).where(PropertyFinancials.property_id.in_(
+        select(Property.id).where(Property.user_id == user_id)
+    )))
+    await db.execute(delete(Property).where(Property.user_id == user_id))
+    await db.execute(delete(Portfolio).where(Portfolio.user_id == user_id))
+    await db.execute(delete(User).where(User.id == user_id))
+    await db.commit()
@@ -0,0 +1,66 @@
+# app/tests/test_auth_revocation.py
+# Signing out everywhere: logout-all, password change and deactivation revoke every earlier token
+
+import httpx
+import pytest
+
+from app.auth.service import auth_service
+from app.core.limiter import limiter
+from app.main import app
+from app.models.user import User
+
+pytestmark = pytest.mark.anyio
+
+PASSWORD = "correct horse"
+
+
+@pytest.fixture
+async def client(db, user, monkeypatch):
+    """An API client signed in as user (password PASSWORD); rate limits off"""
+    monkeypatch.setattr(limiter, "enabled", False)
+    user.hashed_password = await auth_service.hash_password_async(PASSWORD)
+    await db.commit()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test/api/v1") as client:
+        response = await client.post("auth/login", json={"email": user.email, "password": PASSWORD})
+        assert response.status_code == 200
+        client.tokens = response.json()
+        client.headers["Authorization"] = f"Bearer {client.tokens['access_token']}"
+        yield client
+
+
+async def test_logout_all_revokes_every_token(client):
+    assert (await client.get("auth/me")).status_code == 200
+    assert (await client.post("auth/logout-all")).status_code == 204
+
+    assert (await client.get("auth/me")).status_code == 401
+    refreshed = await client.post("auth/refresh", json={"refresh_token": client.tokens["refresh_token"]})
+    assert refreshed.status_code == 401
+
+
+async def test_change_password_signs_out_other_sessions(client, db, user):
+    wrong = await client.post("auth/change-password",
+                              json={"current_password": "not it at all", "new_password": "battery staple"})
+    assert wrong.status_code == 400
+
+    response = await client.post("auth/change-password",
+                                 json={"current_password": PASSWORD, "new_password": "battery staple"})
+    assert response.status_code == 200
+    assert (await client.get("auth/me")).status_code == 401  # The old token
+    client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+    assert (await client.get("auth/me")).status_code == 200
+
+    email = user.email
+    db.expire_all()  # Changed by the request's session
+    assert await auth_service.authenticate_user(db, email, "battery staple") is not None
+
+
+async def test_deactivate_needs_the_password(client, db, user):
+    assert (await client.post("auth/deactivate", json={"password": "not it at all"})).status_code == 400
+    assert (await client.post("auth/deactivate", json={"password": PASSWORD})).status_code == 204
+
+    assert (await client.get("auth/me")).status_code == 401
+    login = await client.post("auth/login", json={"email": user.email, "password": PASSWORD})
+    assert login.status_code == 401
+    user_id = user.id
+    db.expire_all()
+    assert (await db.get(User, user_id)).is_active is False
@@ -0,0 +1,175 @@
+# app/tests/test_cache_service.py
+# Cache backends (Redis against fakeredis, memory, none): read-through, tags, single flight, cache_version
+
+import asyncio
+
+import fakeredis
+import pytest
+from pydantic import BaseModel, TypeAdapter
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.models.user import User
+from app.services import property_service
+from app.services.cache_service import (
+    TAG_PREFIX, MemoryCacheService, NullCacheService, RedisCacheService,
+    bump_user_cache_version, user_cache_version
+)
+from app.services.property_service import PropertyService
+
+pytestmark = pytest.mark.anyio
+
+
+class Metrics(BaseModel):
+    name: str
+    value: float
+
+
+metrics_adapter = TypeAdapter(Metrics)
+
+
+class CountingLoader:
+    """A loader recording how often it ran; optionally slow, to overlap concurrent misses"""
+
+    def __init__(self, delay: float = 0):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self) -> Metrics:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return Metrics(name="portfolio", value=self.calls)
+
+
+@pytest.fixture(params=["redis", "memory"])
+def cache(request):
+    if request.param == "redis":
+        return RedisCacheService(fakeredis.FakeAsyncRedis())
+    return MemoryCacheService(max_entries=100, max_bytes=1024 * 1024)
+
+
+async def test_get_or_load_reads_through(cache):
+    loader = CountingLoader()
+    first = await cache.get_or_load("metrics", "1", ["portfolios:1"], loader, metrics_adapter)
+    second = await cache.get_or_load("metrics", "1", ["portfolios:1"], loader, metrics_adapter)
+    assert first == second == Metrics(name="portfolio", value=1)
+    assert isinstance(second, Metrics)
+    assert loader.calls == 1
+    await cache.get_or_load("metrics", "2", ["portfolios:1"], loader, metrics_adapter)
+    assert loader.calls == 2  # Another key
+
+
+async def test_invalidating_a_tag_misses_only_its_entries(cache):
+    loader = CountingLoader()
+    await cache.get_or_load("metrics", "1", ["portfolios:1", "property:5"], loader, metrics_adapter)
+    await cache.get_or_load("metrics", "2", ["portfolios:2"], loader, metrics_adapter)
+    assert loader.calls == 2
+
+    await cache.invalidate("property:5")
+    reloaded = await cache.get_or_load("metrics", "1", ["portfolios:1", "property:5"], loader, metrics_adapter)
+    assert reloaded.value == 3
+    await cache.get_or_load("metrics", "2", ["portfolios:2"], loader, metrics_adapter)
+    assert loader.calls == 3
+
+
+async def test_concurrent_misses_load_once(cache):
+    loader = CountingLoader(delay=0.2)
+    results = await asyncio.gather(*(
+        cache.get_or_load("metrics", "1", ["portfolios:1"], loader, metrics_adapter) for _ in range(10)
+    ))
+    assert loader.calls == 1
+    assert all(result == results[0] for result in results)
+
+
+async def test_null_cache_always_loads():
+    cache = NullCacheService()
+    loader = CountingLoader()
+    for _ in range(3):
+        await cache.get_or_load("metrics", "1", ["portfolios:1"], loader, metrics_adapter)
+    assert loader.calls == 3
+
+
+async def test_unreachable_redis_falls_back_to_the_loader():
+    class Down(fakeredis.FakeAsyncRedis):
+        async def mget(self, *args, **kwargs):
+            raise RedisConnectionError("down")
+
+    loader = CountingLoader()
+    value = await RedisCacheService(Down()).get_or_load("metrics", "1", ["portfolios:1"], loader, metrics_adapter)
+    assert value.value == 1
+    assert loader.calls == 1
+
+
+async def test_evicted_redis_tag_restarts_from_the_clock():
+    client = fakeredis.FakeAsyncRedis()
+    cache = RedisCacheService(client)
+    [first] = await cache.get_tag_versions(["portfolios:1"])
+    await cache.invalidate("portfolios:1")
+    [bumped] = await cache.get_tag_versions(["portfolios:1"])
+    assert bumped == first + 1
+    await client.delete(f"{TAG_PREFIX}:portfolios:1")  # Evicted
+    await asyncio.sleep(0.01)
+    [restarted] = await cache.get_tag_versions(["portfolios:1"])
+    assert restarted > bumped  # Never back to a version entries may still be cached under
+
+
+async def test_memory_tag_versions_and_locks_stay_bounded():
+    cache = MemoryCacheService(max_entries=10, max_bytes=1024 * 1024)
+    loader = CountingLoader()
+    await cache.get_or_load("metrics", "1", ["property:0"], loader, metrics_adapter)
+    await cache.invalidate("property:0")
+    await cache.get_or_load("metrics", "1", ["property:0"], loader, metrics_adapter)
+    assert loader.calls == 2
+
+    for i in range(1, 50):  # Every property ever edited
+        await cache.invalidate(f"property:{i}")
+    assert len(cache.tag_versions) == 10
+    # property:0 was evicted, yet entries cached under its old versions stay unreachable
+    await cache.get_or_load("metrics", "1", ["property:0"], loader, metrics_adapter)
+    assert loader.calls == 3
+    await cache.get_or_load("metrics", "1", ["property:0"], loader, metrics_adapter)
+    assert loader.calls == 3
+
+    for i in range(50):  # Never released, e.g. a request cancelled mid-fill
+        assert await cache.acquire_lock(f"key:{i}", 0) is not None
+    assert len(cache.locks) <= 10
+
+
+async def test_bump_user_cache_version(db, user):
+    updated_at = user.updated_at
+    assert await user_cache_version(db, user.id) == 0
+
+    await bump_user_cache_version(db, user.id)
+    await db.commit()
+    assert db.info["cache_version"] == 1
+    db.info["user_id"] = user.id
+    assert await user_cache_version(db, user.id) == 1  # From the session, as get_current_user left it
+
+    await db.refresh(user)
+    assert user.cache_version == 1
+    assert user.updated_at == updated_at  # Bookkeeping, not a profile change
+
+
+async def test_write_in_one_worker_invalidates_another_workers_memory_cache(db, user, monkeypatch):
+    # Worker A serves reads from its memory cache; the write happens in worker B, whose
+    # tag invalidation never reaches A: only the bumped users.cache_version can
+    worker_a, worker_b = MemoryCacheService(), MemoryCacheService()
+    service = PropertyService(db)
+
+    monkeypatch.setattr(property_service, "cache_service", worker_b)
+    property_obj = await service.create_property(
+        {"name": "Duplex", "address": "1 Elm St", "current_value": 200000, "monthly_rent": 1500}, user.id
+    )
+
+    monkeypatch.setattr(property_service, "cache_service", worker_a)
+    before = await service.get_property_metrics(property_obj.id, user.id)
+    assert before.monthly_rent == 1500
+    assert len(worker_a.entries) == 1
+
+    monkeypatch.setattr(property_service, "cache_service", worker_b)
+    await service.update_property(property_obj.id, user.id, {"monthly_rent": 1800})
+
+    monkeypatch.setattr(property_service, "cache_service", worker_a)
+    db.info.pop("cache_version", None)  # A new request in worker A reads the user's version again
+    after = await service.get_property_metrics(property_obj.id, user.id)
+    assert after.monthly_rent == 1800
+    assert (await db.get(User, user.id)).cache_version == 2
@@ -0,0 +1,90 @@
+# app/tests/test_import_validation.py
+# validate_rows (a column at a time) must agree with validating every row with PropertyCreate
+
+import random
+from datetime import date, datetime
+
+import pytest
+
+from app.services.import_service import IMPORT_COLUMNS, ValidatedRows, address_key, validate_record, validate_rows
+
+# Cells of every kind a file gives us: plain, formatted, native xlsx values, unusual ones
+# Pydantic still accepts, and invalid ones
+CELLS = [
+    None, "", "   ", "0", "12", " 12 ", "-5", "1450.50", ".5", "5.", "1.2.3", "1e3", "3.0", "0x10",
+    "$2,500", "$1,234.56", "5%", "120%", "abc", "9" * 20, "1" * 15, "2024-01-15", "2023-02-29",
+    "2024-01-15T00:00", "15/01/2024", "residential", "commercial", "castle", "true", "No", "maybe",
+    "123 North Main Street, Apt. 4B", "123 n main st #4b", "Café Road", "x" * 250, "y" * 600,
+    0, 7, -3, 2 ** 60, 2.5, -0.5, float("nan"), float("inf"), True, False,
+    date(2024, 1, 15), datetime(2024, 1, 15, 0, 0), datetime(2024, 1, 15, 9, 30),
+]
+# Mostly valid columns, so chunks mix fast rows and PropertyCreate rows
+PLAIN_CELLS = {
+    "name": ["Duplex", "Unit 4", None], "address": ["1 Elm St", "2 Oak Ave", "1 elm street"],
+    "property_type": ["residential", "commercial"], "purchase_date": ["2024-01-15", "2020-06-30"],
+    "bedrooms": ["3", "0"], "is_primary_residence": ["true", "false", "yes"], "vacancy_rate": ["0.05", "0"],
+}
+
+
+def validate_per_row(rows, columns, first_row) -> ValidatedRows:
+    """The reference: every non-blank row through PropertyCreate"""
+    validated = ValidatedRows()
+    for offset, row in enumerate(rows):
+        provided = set()
+        for index, column in columns.items():
+            value = row[index] if index < len(row) else None
+            if isinstance(value, str):
+                value = value.strip()
+            if value is not None and value != "":
+                provided.add(column)
+        if not provided:
+            continue
+        record = validate_record(row, columns, first_row + offset, validated)
+        if record is not None:
+            validated.records.append(record)
+            validated.row_numbers.append(first_row + offset)
+            validated.provided.append(frozenset(provided))
+            validated.address_keys.append(address_key(record["address"]))
+    return validated
+
+
+def random_chunk(rng: random.Random):
+    fields = rng.sample(IMPORT_COLUMNS, rng.randint(1, len(IMPORT_COLUMNS)))
+    if rng.random() < 0.7 and "name" not in fields:
+        fields.append("name")
+    positions = rng.sample(range(len(fields) + 3), len(fields))  # Gaps: columns the import ignores
+    columns = dict(zip(positions, fields))
+    width = max(positions) + 1
+    mostly_plain = rng.random() < 0.5
+
+    rows = []
+    for _ in range(rng.randint(0, 40)):
+        row = []
+        for index in range(width):
+            column = columns.get(index)
+            if mostly_plain and rng.random() < 0.9:
+                cell = rng.choice(PLAIN_CELLS.get(column, ["1800", "250000", "99.5"]))
+            else:
+                cell = rng.choice(CELLS)
+            row.append(cell)
+        if rng.random() < 0.1:
+            row = row[:rng.randint(0, width)]  # Short rows (trailing empty cells dropped)
+        rows.append(row)
+    return rows, columns
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_validate_rows_matches_per_row_validation(seed):
+    rows, columns = random_chunk(random.Random(seed))
+    first_row = 2
+    expected = validate_per_row(rows, columns, first_row)
+    actual = validate_rows(rows, columns, first_row)
+
+    # Compared as repr: same types (1 vs 1.0), and NaN-safe; key order doesn't matter
+    assert [repr(sorted(record.items())) for record in actual.records] == \
+        [repr(sorted(record.items())) for record in expected.records]
+    assert actual.row_numbers == expected.row_numbers
+    assert actual.provided == expected.provided
+    assert actual.address_keys == expected.address_keys
+    assert actual.errors == expected.errors
+    assert actual.failed == expected.failed
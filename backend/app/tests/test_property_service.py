@@ -0,0 +1,52 @@
+# app/tests/test_property_service.py
+# Address keys on edit: one property per address, but duplicates from before keys were unique stay editable
+
+import pytest
+from sqlalchemy import update
+
+from app.models.property import Property
+from app.services.property_service import DuplicateAddressError, PropertyService
+
+pytestmark = pytest.mark.anyio
+
+DUPLEX = {"name": "Duplex", "address": "1 Elm Street", "current_value": 200000, "monthly_rent": 1500}
+
+
+@pytest.fixture
+async def legacy_duplicate(db, user):
+    """A property and an older second copy of it whose key migration 6f3b8e1d5a27 set to NULL"""
+    service = PropertyService(db)
+    kept = await service.create_property(dict(DUPLEX), user.id)
+    copy = await service.create_property({**DUPLEX, "address": "2 Oak Ave"}, user.id)
+    await db.execute(
+        update(Property).where(Property.id == copy.id).values(address=DUPLEX["address"], address_key=None)
+    )
+    await db.commit()
+    await db.refresh(copy)
+    return kept, copy
+
+
+async def test_editing_a_legacy_duplicate_keeps_its_null_key(db, user, legacy_duplicate):
+    kept, copy = legacy_duplicate
+    service = PropertyService(db)
+
+    # The form resends the address with every edit, sometimes spelled differently
+    for address in (DUPLEX["address"], "1 elm st"):
+        edited = await service.update_property(copy.id, user.id, {"address": address, "name": "Duplex (old)"})
+        assert edited.name == "Duplex (old)"
+        assert edited.address_key is None
+
+    moved = await service.update_property(copy.id, user.id, {"address": "3 Pine Rd"})
+    assert moved.address_key == "3 pine rd"
+
+
+async def test_moving_onto_another_propertys_address_conflicts(db, user, legacy_duplicate):
+    kept, copy = legacy_duplicate
+    kept_id, copy_id, user_id = kept.id, copy.id, user.id  # The failed commit rolls back and expires them
+    service = PropertyService(db)
+    await service.update_property(copy_id, user_id, {"address": "3 Pine Rd"})
+
+    with pytest.raises(DuplicateAddressError):
+        await service.update_property(copy_id, user_id, {"address": "1 ELM ST."})
+    edited = await service.update_property(kept_id, user_id, {"address": "1 Elm St"})
+    assert edited.address_key == "1 elm st"
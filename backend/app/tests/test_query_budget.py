@@ -0,0 +1,38 @@
+# app/tests/test_query_budget.py
+# With QUERY_BUDGET_STRICT an endpoint over its @query_budget fails the request instead of logging
+
+import httpx
+import pytest
+
+from app.api import properties
+from app.auth.service import auth_service
+from app.core.limiter import limiter
+from app.core.query_stats import QueryBudgetExceeded
+from app.core.settings import settings
+from app.main import app
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def client(db, user, monkeypatch):
+    """An API client signed in as user, with strict budgets; rate limits off"""
+    monkeypatch.setattr(limiter, "enabled", False)
+    monkeypatch.setattr(settings, "QUERY_BUDGET_STRICT", True)
+    token = auth_service.create_access_token(auth_service.token_claims(user))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test/api/v1",
+                                 headers={"Authorization": f"Bearer {token}"}) as client:
+        yield client
+
+
+async def test_within_budget_passes(client):
+    response = await client.post("properties/", json={"name": "Duplex", "address": "1 Elm Street"})
+    assert response.status_code == 201
+    queries = int(response.headers["server-timing"].split('desc="')[1].split(" ")[0])
+    assert 0 < queries <= properties.create_property.__query_budget__
+
+
+async def test_over_budget_fails(client, monkeypatch):
+    monkeypatch.setattr(properties.create_property, "__query_budget__", 0)  # Any write is over
+    with pytest.raises(QueryBudgetExceeded, match=r"POST /api/v1/properties/ ran \d+ queries, budget is 0"):
+        await client.post("properties/", json={"name": "Duplex", "address": "1 Elm Street"})
@@ -0,0 +1,68 @@
+# app/tests/test_replica_routing.py
+# Read-your-writes across workers: recent writers are shared through Redis
+
+import itertools
+
+import fakeredis
+import pytest
+from sqlalchemy import select
+
+from app.core import database
+from app.core.database import RoutingSession, _RecentWriters
+from app.core.settings import settings
+from app.models.user import User
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def replicas(monkeypatch):
+    """A (never connected) replica engine, so routing is on"""
+    monkeypatch.setattr(database, "async_replica_engines", [database.async_engine])
+    monkeypatch.setattr(database, "_replica_cycle", itertools.cycle([database.async_engine]))
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_STICKY_BACKEND", "redis")
+
+
+@pytest.fixture
+def shared_redis():
+    return fakeredis.FakeAsyncRedis()
+
+
+async def test_write_in_one_worker_is_sticky_in_another(replicas, shared_redis):
+    # Two workers: separate _RecentWriters, one Redis
+    writer, reader = _RecentWriters(shared_redis), _RecentWriters(shared_redis)
+    assert not await reader.is_sticky(7)
+    await writer.mark(7)
+    assert await reader.is_sticky(7)
+    assert not await reader.is_sticky(8)
+    assert 0 < await shared_redis.pttl(f"{_RecentWriters.KEY_PREFIX}7") <= settings.DATABASE_REPLICA_STICKY_SECONDS * 1000
+
+
+async def test_unreachable_redis_keeps_reads_on_the_primary(replicas):
+    class Down:
+        async def exists(self, key):
+            raise ConnectionError("down")
+
+    recent_writers = _RecentWriters(Down())
+    assert await recent_writers.is_sticky(7)
+    assert recent_writers.down_until > 0  # Not asked again for RETRY_INTERVAL
+
+
+async def test_without_a_shared_store_users_read_the_primary(replicas, monkeypatch, shared_redis):
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_STICKY_BACKEND", "none")
+    assert await _RecentWriters(shared_redis).is_sticky(7)
+
+
+def routes_to_replica(**info) -> bool:
+    session = RoutingSession()
+    session.info.update(info)
+    return session._use_replica(select(User))
+
+
+def test_routing(replicas):
+    assert routes_to_replica(read_only=True)  # Anonymous read
+    assert not routes_to_replica(read_only=False)
+    assert not routes_to_replica(read_only=True, user_id=7)  # Stickiness unknown: primary
+    assert not routes_to_replica(read_only=True, user_id=7, sticky=True)
+    assert routes_to_replica(read_only=True, user_id=7, sticky=False)
+    assert not routes_to_replica(read_only=True, user_id=7, sticky=False, wrote=True)
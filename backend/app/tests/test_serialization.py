@@ -0,0 +1,49 @@
+# app/tests/test_serialization.py
+# Content negotiation of the fast response path
+
+import msgpack
+import pytest
+from pydantic import TypeAdapter
+from starlette.requests import Request
+
+from app.core.serialization import parse_accept, serialize_response, wants_msgpack
+
+
+def request_accepting(accept: str) -> Request:
+    return Request({"type": "http", "method": "GET", "headers": [(b"accept", accept.encode())]})
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("application/msgpack", True),
+    ("application/x-msgpack", True),
+    ("application/msgpack, */*", True),
+    ("application/json, application/msgpack", True),
+    ("application/x-msgpack;q=0.9, application/*;q=0.8", True),
+    ("", False),
+    ("*/*", False),
+    ("application/json", False),
+    ("application/msgpack;q=0", False),
+    ("application/msgpack;q=0.5, application/json", False),
+    ("application/msgpack;q=oops", False),
+    ("application/msgpack-ish", False),
+])
+def test_wants_msgpack(accept, expected):
+    assert wants_msgpack(request_accepting(accept)) is expected
+
+
+def test_parse_accept():
+    assert parse_accept("Application/JSON;q=0.5, text/html ; level=1, */*;q=2") == {
+        "application/json": 0.5, "text/html": 1.0, "*/*": 1.0
+    }
+
+
+def test_serialize_response_formats():
+    adapter = TypeAdapter(dict)
+    json_response = serialize_response(request_accepting("application/json"), adapter, {"a": 1})
+    assert json_response.media_type == "application/json"
+    assert json_response.body == b'{"a":1}'
+
+    msgpack_response = serialize_response(request_accepting("application/msgpack"), adapter, {"a": 1})
+    assert msgpack_response.media_type == "application/msgpack"
+    assert msgpack.unpackb(msgpack_response.body) == {"a": 1}
+    assert msgpack_response.headers["vary"] == "Accept"
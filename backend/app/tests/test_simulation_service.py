@@ -0,0 +1,61 @@
+# app/tests/test_simulation_service.py
+# Simulations as jobs: run in the job's pool, deleting one cancels its job
+
+import pytest
+from sqlalchemy import func, select
+
+from app.jobs.queue import JobContext
+from app.models.job import Job, JobStatus
+from app.models.simulation import Simulation, SimulationArray, SimulationStatus
+from app.schemas.simulation import SimulationCreate, SimulationParameters
+from app.services.property_service import PropertyService
+from app.services.simulation_service import SimulationService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def property_id(db, user):
+    property_obj = await PropertyService(db).create_property(
+        {"name": "Duplex", "address": "1 Elm St", "current_value": 200000, "monthly_rent": 1500}, user.id
+    )
+    return property_obj.id
+
+
+async def queue(db, user, property_id) -> Simulation:
+    request = SimulationCreate(property_id=property_id, parameters=SimulationParameters(years=3, paths=50, seed=7))
+    simulation, duplicate = await SimulationService(db).queue_simulation(request, user.id)
+    assert not duplicate
+    return simulation
+
+
+async def test_run_uses_the_context_run_cpu(db, user, property_id):
+    simulation = await queue(db, user, property_id)
+    context = JobContext(job_id=simulation.job_id, kind="run_simulation", user_id=user.id, payload={},
+                         attempt=1, max_attempts=1)
+    calls = []
+
+    async def run_cpu(func, *args):
+        calls.append(func.__name__)
+        return await context.run_cpu(func, *args)
+
+    simulation = await SimulationService(db, run_cpu=run_cpu).run_simulation(simulation, 60)
+    assert simulation.status == SimulationStatus.COMPLETED
+    assert calls[0] == "simulate_batch" and calls[-1] == "summarize_paths"
+    assert await db.scalar(
+        select(func.count()).select_from(SimulationArray).where(SimulationArray.simulation_id == simulation.id)
+    ) > 0
+
+
+async def test_delete_cancels_the_queued_job(db, user, property_id):
+    simulation = await queue(db, user, property_id)
+    simulation_id, job_id = simulation.id, simulation.job_id
+    service = SimulationService(db)
+
+    assert not await service.delete_simulation(simulation_id, user.id + 1)  # Someone else's
+    assert await service.delete_simulation(simulation_id, user.id)
+
+    assert await db.get(Simulation, simulation_id) is None
+    job = await db.get(Job, job_id)
+    await db.refresh(job)
+    assert job.status == JobStatus.CANCELLED
@@ -0,0 +1,118 @@
+# app/tests/test_sync.py
+# Delta sync: a cursor from the database clock, changed rows only, tombstones for deletions
+
+from datetime import timedelta
+
+import httpx
+import pytest
+from sqlalchemy import func, select, update
+
+from app.auth.service import auth_service
+from app.core.limiter import limiter
+from app.main import app
+from app.models.portfolio import Portfolio
+from app.models.property import Property, PropertyFinancials
+from app.services.portfolio_service import PortfolioService
+from app.services.property_service import PropertyService
+from app.services.sync_service import SyncService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def client(db, user, monkeypatch):
+    """An API client signed in as user; rate limits off"""
+    monkeypatch.setattr(limiter, "enabled", False)
+    token = auth_service.create_access_token(auth_service.token_claims(user))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test/api/v1",
+                                 headers={"Authorization": f"Bearer {token}"}) as client:
+        yield client
+
+
+async def backdate(db, user_id: int, age: timedelta):
+    """Make everything the user has look last changed `age` ago, outside the cursor overlap"""
+    changed_at = await db.scalar(select(func.now())) - age
+    await db.execute(update(Property).where(Property.user_id == user_id).values(updated_at=changed_at))
+    await db.execute(update(PropertyFinancials).where(PropertyFinancials.property_id.in_(
+        select(Property.id).where(Property.user_id == user_id)
+    )).values(updated_at=changed_at))
+    await db.execute(update(Portfolio).where(Portfolio.user_id == user_id).values(updated_at=changed_at))
+    await db.commit()
+
+
+@pytest.fixture
+async def synced(db, user):
+    """Two properties and a portfolio, last changed an hour ago; returns their ids"""
+    properties = PropertyService(db)
+    duplex = await properties.create_property({"name": "Duplex", "address": "1 Elm Street", "monthly_rent": 1500},
+                                              user.id)
+    condo = await properties.create_property({"name": "Condo", "address": "2 Oak Ave", "monthly_rent": 1200},
+                                             user.id)
+    portfolio = await PortfolioService(db).create_portfolio({"name": "Rentals"}, user.id)
+    ids = duplex.id, condo.id, portfolio.id
+    await backdate(db, user.id, timedelta(hours=1))
+    return ids
+
+
+async def test_full_sync_then_delta_of_nothing(client, synced):
+    duplex_id, condo_id, portfolio_id = synced
+    full = (await client.get("sync/")).json()
+    assert full["full"] is True
+    assert sorted(p["id"] for p in full["properties"]) == sorted([duplex_id, condo_id])
+    assert [p["id"] for p in full["portfolios"]] == [portfolio_id]
+    assert full["deleted"] == {"properties": [], "portfolios": []}
+
+    delta = (await client.get("sync/", params={"since": full["cursor"]})).json()
+    assert delta["full"] is False
+    assert delta["properties"] == delta["portfolios"] == []
+    assert delta["deleted"] == {"properties": [], "portfolios": []}
+
+
+async def test_delta_after_an_update_returns_only_the_changed_rows(client, synced):
+    duplex_id, condo_id, portfolio_id = synced
+    cursor = (await client.get("sync/")).json()["cursor"]
+
+    assert (await client.put(f"properties/{duplex_id}", json={"name": "Duplex (renovated)"})).status_code == 200
+    delta = (await client.get("sync/", params={"since": cursor})).json()
+    assert [(p["id"], p["name"]) for p in delta["properties"]] == [(duplex_id, "Duplex (renovated)")]
+    assert delta["portfolios"] == []
+
+    assert (await client.put(f"portfolios/{portfolio_id}", json={"name": "Long lets"})).status_code == 200
+    delta = (await client.get("sync/", params={"since": delta["cursor"]})).json()
+    assert [p["name"] for p in delta["portfolios"]] == ["Long lets"]
+
+
+async def test_deletes_return_tombstones_not_rows(client, synced):
+    duplex_id, condo_id, portfolio_id = synced
+    cursor = (await client.get("sync/")).json()["cursor"]
+
+    assert (await client.delete(f"properties/{condo_id}")).status_code == 204
+    assert (await client.delete(f"portfolios/{portfolio_id}")).status_code == 204
+    delta = (await client.get("sync/", params={"since": cursor})).json()
+    assert delta["deleted"] == {"properties": [condo_id], "portfolios": [portfolio_id]}
+    assert delta["properties"] == delta["portfolios"] == []
+
+    full = (await client.get("sync/")).json()
+    assert [p["id"] for p in full["properties"]] == [duplex_id]
+    assert full["portfolios"] == []
+
+
+async def test_cursor_is_database_time_and_deltas_overlap_it(db, user, synced):
+    duplex_id, condo_id, portfolio_id = synced
+    service = SyncService(db)
+    changes = await service.get_changes(user.id)
+    cursor = changes["cursor"]
+    # func.now() is the transaction's start time, so the same transaction reads it back exactly
+    assert cursor == await db.scalar(select(func.now()))
+    await db.commit()
+
+    # A write that began just before the cursor commits with an older timestamp;
+    # 5 s of overlap resends it, while a change older than that was synced already
+    late, old = cursor - timedelta(seconds=4), cursor - timedelta(seconds=6)
+    await db.execute(update(Property).where(Property.id == duplex_id).values(updated_at=late))
+    await db.execute(update(Property).where(Property.id == condo_id).values(updated_at=old))
+    await db.commit()
+
+    changes = await service.get_changes(user.id, cursor)
+    assert [p.id for p in changes["properties"]] == [duplex_id]
+    assert changes["cursor"] > cursor
@@ -0,0 +1,89 @@
+# benchmarks/bench_export.py
+# How fast do exports stream, how soon does the first row go out, and does memory stay flat?
+#
+# Seeds a pro user with --rows properties (reused by later runs) and drains
+# app/services/export_service.stream_export for each format, the same
+# generator GET /exports/properties sends. Reports the time to the first
+# batch of rows, the total time, the output size and peak RSS after each
+# format; peak RSS should barely move between --rows 10000 and 100000, since
+# only one EXPORT_BATCH_ROWS batch is held at a time. Parquet needs pyarrow.
+#
+# Needs a migrated local Postgres it may write seed data to. Never point this at production.
+# Run from /backend:
+#     DATABASE_URL=postgresql://postgres@localhost:5432/realestate python -m benchmarks.bench_export
+#     python -m benchmarks.bench_export --rows 100000 --formats csv,parquet --output export.json
+
+import argparse
+import asyncio
+import json
+import resource
+import sys
+import time
+
+from app.core.database import AsyncSessionLocal
+from app.core.settings import settings
+from app.services.export_service import ExportFormat, get_export_writer, property_export_query, stream_export
+from benchmarks.seed import get_or_seed_user
+
+EMAIL = "export-bench@example.com"
+
+
+async def bench_format(user_id: int, export_format: ExportFormat) -> dict:
+    query = property_export_query(user_id)
+    writer = get_export_writer(export_format, query)
+    size = 0
+    first_rows = None
+    start = time.perf_counter()
+    async for chunk in stream_export(query, writer, user_id):
+        size += len(chunk)
+        if first_rows is None and size > len(writer.header()):
+            first_rows = time.perf_counter() - start
+    elapsed = time.perf_counter() - start
+    return {
+        "first_rows_ms": round((first_rows or elapsed) * 1000, 1),
+        "seconds": round(elapsed, 2),
+        "mb": round(size / 2 ** 20, 1),
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024,
+    }
+
+
+async def main_async(args) -> dict:
+    async with AsyncSessionLocal() as db:
+        user_id = await get_or_seed_user(db, EMAIL, args.rows)
+
+    report = {}
+    for name in args.formats:
+        report[name] = await bench_format(user_id, ExportFormat(name))
+        report[name]["rows_per_second"] = round(args.rows / report[name]["seconds"])
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming export throughput and memory")
+    parser.add_argument("--rows", type=int, default=100000, help="Properties of the seeded user (first run only)")
+    parser.add_argument("--formats", default="csv,ndjson,parquet", help="Comma-separated: csv,ndjson,parquet")
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+    args.formats = [name for name in args.formats.split(",") if name]
+    unknown = set(args.formats) - {export_format.value for export_format in ExportFormat}
+    if unknown:
+        parser.error(f"Unknown formats: {', '.join(sorted(unknown))}")
+
+    if settings.ENVIRONMENT == "production":
+        sys.exit("Refusing to seed a production database")
+
+    report = asyncio.run(main_async(args))
+
+    print(f"\n{'format':<10} {'first rows ms':>14} {'seconds':>8} {'rows/s':>9} {'MB':>7} {'max RSS MB':>11}")
+    for name, row in report.items():
+        print(f"{name:<10} {row['first_rows_ms']:>14.1f} {row['seconds']:>8.2f} {row['rows_per_second']:>9} "
+              f"{row['mb']:>7.1f} {row['max_rss_mb']:>11}")
+    print(f"(batches of {settings.EXPORT_BATCH_ROWS} rows)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"args": vars(args), "results": report}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
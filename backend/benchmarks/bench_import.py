@@ -0,0 +1,181 @@
+# benchmarks/bench_import.py
+# How fast does a large CSV import go, and where does the time go?
+#
+# Generates a CSV or Excel file in memory and runs it through ImportService
+# directly (no HTTP upload), timing each stage: validation, metrics and row
+# building (in a thread), looking up matching properties (upserts), reserving
+# ids, COPY into the staging table and the INSERT ... ON CONFLICT writing it;
+# "read" is the rest, mostly parsing the file (slow for Excel: openpyxl parses
+# the sheet XML in Python). Peak RSS should barely move with --rows, since the
+# file is processed one IMPORT_CHUNK_ROWS batch at a time (the generated file
+# itself is held in memory by this script). Excel needs openpyxl.
+#
+# --reimport runs the file a second time over the first run's properties: every
+# row then matches one, and nothing is written (upserts compare each row first).
+#
+# Needs a migrated local Postgres it may write seed data to. Never point this at production.
+# Run from /backend:
+#     DATABASE_URL=postgresql://postgres@localhost:5432/realestate python -m benchmarks.bench_import
+#     python -m benchmarks.bench_import --rows 100000 --format xlsx --output import.json
+#     python -m benchmarks.bench_import --mode upsert --reimport
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import resource
+import sys
+import time
+from collections import Counter
+from functools import wraps
+
+from sqlalchemy import delete, select
+
+from app.core.database import AsyncSessionLocal
+from app.core.settings import settings
+from app.models.import_session import ImportMode
+from app.models.property import Property, PropertyFinancials
+from app.services import import_service
+from app.services.import_service import FILE_READERS, ImportService
+from benchmarks.seed import get_or_seed_user
+
+EMAIL = "import-bench@example.com"
+HEADER = "Name,Address,Property Type,Purchase Price,Current Value,Down Payment,Monthly Rent,Property Taxes,Insurance,Mortgage Payment,Vacancy Rate,Purchase Date"
+
+
+def generate_rows(rows: int):
+    yield HEADER.split(",")
+    for i in range(rows):
+        yield [
+            f"Property {i}", f"{i} Main Street, Denver", "residential", 250000 + i % 100 * 1000,
+            300000 + i % 100 * 1500, 60000, 1800 + i % 50 * 20, 250, 100, 1400, None, "2024-01-15"
+        ]
+
+
+def generate_file(rows: int, file_format: str) -> bytes:
+    buffer = io.BytesIO()
+    if file_format == "csv":
+        text = io.TextIOWrapper(buffer, encoding="utf-8", newline="")
+        csv.writer(text).writerows(generate_rows(rows))
+        text.flush()
+        return buffer.getvalue()
+
+    try:
+        import openpyxl
+    except ImportError:
+        raise Exception("openpyxl not installed. Install with: pip install openpyxl")
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("Properties")
+    for row in generate_rows(rows):
+        sheet.append(row)
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+VALIDATE_ROWS, BUILD_ROWS, COPY_ROWS = import_service.validate_rows, import_service.build_rows, import_service.copy_rows
+EXISTING_PROPERTIES, RESERVE_PROPERTY_IDS, WRITE_CHUNK = (
+    ImportService._existing_properties, ImportService._reserve_property_ids, ImportService._write_chunk
+)
+
+
+def timed(stages: Counter, name: str, func):
+    """Wrap a service stage so its wall time is added to stages[name]"""
+    if asyncio.iscoroutinefunction(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                stages[name] += time.perf_counter() - start
+    else:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stages[name] += time.perf_counter() - start
+    return wrapper
+
+
+async def run_import(db, user_id: int, data: bytes, args) -> dict:
+    stages, writes = Counter(), Counter()
+    import_service.validate_rows = timed(stages, "validate", VALIDATE_ROWS)
+    import_service.build_rows = timed(stages, "metrics_and_rows", BUILD_ROWS)
+    import_service.copy_rows = timed(stages, "copy", COPY_ROWS)
+    ImportService._existing_properties = timed(stages, "match", EXISTING_PROPERTIES)
+    ImportService._reserve_property_ids = timed(stages, "reserve_ids", RESERVE_PROPERTY_IDS)
+    ImportService._write_chunk = timed(writes, "write", WRITE_CHUNK)  # Includes reserve_ids and copy
+
+    service = ImportService(db)
+    session = service._new_session(user_id, f"bench.{args.format}", args.format, len(data), ImportMode(args.mode))
+    db.add(session)
+    await db.commit()
+    start = time.perf_counter()
+    session = await service.import_properties(session, FILE_READERS[args.format](io.BytesIO(data)))
+    elapsed = time.perf_counter() - start
+    stages["write"] = writes["write"] - stages["reserve_ids"] - stages["copy"]
+
+    return {
+        "status": session.status.value,
+        "inserted": session.inserted_count,
+        "updated": session.updated_count,
+        "unchanged": session.unchanged_count,
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(args.rows / elapsed),
+        "stages_seconds": {
+            "read": round(elapsed - sum(stages.values()), 2),
+            **{name: round(seconds, 2) for name, seconds in stages.items()}
+        },
+    }
+
+
+async def main_async(args) -> dict:
+    data = generate_file(args.rows, args.format)
+    async with AsyncSessionLocal() as db:
+        user_id = await get_or_seed_user(db, EMAIL, 1)
+        # Drop earlier runs' imports so repeated runs don't grow the user
+        property_ids = select(Property.id).where(Property.user_id == user_id)
+        await db.execute(delete(PropertyFinancials).where(PropertyFinancials.property_id.in_(property_ids)))
+        await db.execute(delete(Property).where(Property.user_id == user_id))
+        await db.commit()
+
+        runs = {"import": await run_import(db, user_id, data, args)}
+        if args.reimport:
+            runs["reimport"] = await run_import(db, user_id, data, args)
+
+    return {
+        "rows": args.rows,
+        "format": args.format,
+        "mode": args.mode,
+        "file_mb": round(len(data) / 2 ** 20, 1),
+        "chunk_rows": settings.IMPORT_CHUNK_ROWS,
+        **runs,
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of the streaming property import")
+    parser.add_argument("--rows", type=int, default=50000, help="Rows in the generated file")
+    parser.add_argument("--format", choices=["csv", "xlsx"], default="csv")
+    parser.add_argument("--mode", choices=[mode.value for mode in ImportMode], default="insert")
+    parser.add_argument("--reimport", action="store_true", help="Import the file again over the first run")
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    if settings.ENVIRONMENT == "production":
+        sys.exit("Refusing to seed a production database")
+
+    report = asyncio.run(main_async(args))
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"args": vars(args), "results": report}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
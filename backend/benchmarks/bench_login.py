@@ -0,0 +1,139 @@
+# benchmarks/bench_login.py
+# Does login traffic slow down everything else on the same worker?
+#
+# Runs the app in-process (one event loop, like one gunicorn worker) and
+# measures a cheap authenticated probe (GET /auth/me) on its own, then while
+# --logins concurrent clients log in back to back. In "inline" mode bcrypt is
+# run on the event loop the way it used to be, as the baseline; "pool" is the
+# password thread pool in app/auth/service.py.
+#
+# Needs a migrated local Postgres it may write seed data to. Never point this at production.
+# Run from /backend:
+#     DATABASE_URL=postgresql://postgres@localhost:5432/realestate python -m benchmarks.bench_login
+#     python -m benchmarks.bench_login --logins 8 --duration 10 --modes pool --output login.json
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+from sqlalchemy import select
+
+from app.auth.service import auth_service
+from app.core.database import AsyncSessionLocal
+from app.core.limiter import limiter
+from app.core.settings import settings
+from app.main import app
+from app.models.user import User
+from benchmarks.load_test import summarize
+from benchmarks.seed import access_token_for, seed_users
+
+EMAIL = "login-bench@example.com"  # must pass EmailStr validation on login
+PASSWORD = "login-bench-password"
+MODES = ("inline", "pool")
+
+
+async def ensure_user() -> int:
+    """Seed the benchmark user with a hash at the current BCRYPT_ROUNDS"""
+    async with AsyncSessionLocal() as db:
+        user = await db.scalar(select(User).where(User.email == EMAIL))
+        hashed_password = auth_service.hash_password(PASSWORD)
+        if user is None:
+            return (await seed_users(db, [EMAIL], 10, hashed_password=hashed_password))[0]
+        if not auth_service.pwd_context.verify(PASSWORD, user.hashed_password) \
+                or auth_service.pwd_context.needs_update(user.hashed_password):
+            user.hashed_password = hashed_password
+            await db.commit()
+        return user.id
+
+
+async def run_inline(fn, *args):
+    """The old behaviour: bcrypt straight on the event loop"""
+    return fn(*args)
+
+
+async def probe_loop(client: httpx.AsyncClient, headers: Dict, stop: asyncio.Event, latencies: List[float]):
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get("/api/v1/auth/me", headers=headers)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+        await asyncio.sleep(0.01)
+
+
+async def login_loop(client: httpx.AsyncClient, stop: asyncio.Event, latencies: List[float], errors: List[int]):
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.post("/api/v1/auth/login", json={"email": EMAIL, "password": PASSWORD})
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+
+
+async def measure(client: httpx.AsyncClient, headers: Dict, logins: int, duration: float) -> Dict:
+    stop = asyncio.Event()
+    probe, login, errors = [], [], []
+    tasks = [asyncio.create_task(probe_loop(client, headers, stop, probe))]
+    tasks += [asyncio.create_task(login_loop(client, stop, login, errors)) for _ in range(logins)]
+    await asyncio.sleep(duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+    result = {"probe": summarize(probe, 0, duration)}
+    if logins:
+        result["login"] = summarize(login, len(errors), duration)
+    return result
+
+
+async def main_async(args) -> Dict:
+    limiter.enabled = False  # Every request comes from one client
+    user_id = await ensure_user()
+    headers = {"Authorization": f"Bearer {access_token_for(user_id, EMAIL)}"}
+    pooled = auth_service._run_password_job
+
+    report = {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            await client.get("/api/v1/auth/me", headers=headers)  # Warm up the pool and routes
+            report["idle"] = await measure(client, headers, 0, args.duration)
+            for mode in args.modes:
+                auth_service._run_password_job = run_inline if mode == "inline" else pooled
+                report[mode] = await measure(client, headers, args.logins, args.duration)
+            auth_service._run_password_job = pooled
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Probe latency with and without concurrent logins")
+    parser.add_argument("--logins", type=int, default=4, help="Concurrent clients logging in back to back")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per measurement")
+    parser.add_argument("--modes", default=",".join(MODES), help="Comma-separated: inline,pool")
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+    args.modes = [mode for mode in args.modes.split(",") if mode]
+
+    if settings.ENVIRONMENT == "production":
+        sys.exit("Refusing to seed a production database")
+
+    print(f"BCRYPT_ROUNDS={settings.BCRYPT_ROUNDS} PASSWORD_HASH_WORKERS={settings.PASSWORD_HASH_WORKERS} "
+          f"logins={args.logins} duration={args.duration}s")
+    report = asyncio.run(main_async(args))
+
+    print(f"\n{'scenario':<10} {'route':<12} {'reqs':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for scenario, routes in report.items():
+        for route, row in routes.items():
+            if not row["requests"]:
+                continue
+            print(f"{scenario:<10} {route:<12} {row['requests']:>6} {row['rps']:>8.1f} "
+                  f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"args": vars(args), "bcrypt_rounds": settings.BCRYPT_ROUNDS, "results": report}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
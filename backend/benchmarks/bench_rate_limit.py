@@ -0,0 +1,154 @@
+# benchmarks/bench_rate_limit.py
+# What does rate limiting cost per request?
+#
+# Times the pieces of app/core/limiter.py on their own (resolving who the
+# request belongs to, which decodes the bearer token; one hit against each
+# store) and then GET /auth/me in-process with the limiter on and off. The
+# principal is cached after the first call, so the endpoint itself is cheap
+# and the difference is mostly the limiter.
+#
+# "redis" uses REDIS_URL and needs a running server; "fakeredis" runs the same
+# Lua script in-process (pip install fakeredis lupa) and shows the script's
+# cost without the network round trip.
+#
+# Needs a migrated local Postgres it may write seed data to. Never point this at production.
+# Run from /backend:
+#     DATABASE_URL=postgresql://postgres@localhost:5432/realestate python -m benchmarks.bench_rate_limit
+#     python -m benchmarks.bench_rate_limit --stores memory,redis --requests 5000 --output rate_limit.json
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+from starlette.requests import Request
+
+from app.core.database import AsyncSessionLocal
+from app.core.limiter import MemoryRateLimitStore, RateLimit, RedisRateLimitStore, limiter
+from app.core.settings import settings
+from app.main import app
+from benchmarks.seed import access_token_for, get_or_seed_user
+
+EMAIL = "rate-limit-bench@example.com"
+STORES = ("memory", "fakeredis", "redis")
+# High enough that no request is rejected while timing
+LIMIT = RateLimit(10 ** 9, 60)
+
+
+def summarize(timings: List[float]) -> Dict:
+    """Per-call microseconds"""
+    ordered = sorted(timings)
+    return {
+        "calls": len(ordered),
+        "median_us": round(statistics.median(ordered) * 1e6, 1),
+        "p99_us": round(ordered[int(0.99 * (len(ordered) - 1))] * 1e6, 1),
+        "mean_us": round(statistics.fmean(ordered) * 1e6, 1),
+    }
+
+
+def make_store(name: str):
+    if name == "memory":
+        return MemoryRateLimitStore()
+    if name == "fakeredis":
+        try:
+            import fakeredis.aioredis
+        except ImportError:
+            raise Exception("fakeredis not installed. Install with: pip install fakeredis lupa")
+        return RedisRateLimitStore(client=fakeredis.aioredis.FakeRedis())
+    return RedisRateLimitStore()
+
+
+def bench_identify(token: str, calls: int) -> Dict:
+    """First decode of the request's token; get_current_user reuses the claims"""
+    headers = [(b"authorization", f"Bearer {token}".encode())]
+    timings = []
+    for _ in range(calls):
+        request = Request({"type": "http", "headers": headers, "client": ("127.0.0.1", 1234)})
+        start = time.perf_counter()
+        limiter.identify(request)
+        timings.append(time.perf_counter() - start)
+    return summarize(timings)
+
+
+async def bench_store(store, calls: int) -> Dict:
+    timings = []
+    for i in range(calls):
+        start = time.perf_counter()
+        allowed, _ = await store.hit(f"bench:user:{i % 100}", LIMIT)
+        timings.append(time.perf_counter() - start)
+        if not allowed:
+            raise RuntimeError("Benchmark limit was hit")
+    if isinstance(store, RedisRateLimitStore) and time.monotonic() < store.down_until:
+        raise RuntimeError("Redis was unreachable; these are per-worker fallback timings")
+    return summarize(timings)
+
+
+async def bench_endpoint(client: httpx.AsyncClient, headers: Dict, calls: int) -> Dict:
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        response = await client.get("/api/v1/auth/me", headers=headers)
+        timings.append(time.perf_counter() - start)
+        response.raise_for_status()
+    return summarize(timings)
+
+
+async def main_async(args) -> Dict:
+    async with AsyncSessionLocal() as db:
+        user_id = await get_or_seed_user(db, EMAIL, 1)
+    token = access_token_for(user_id, EMAIL)
+
+    report = {"identify": bench_identify(token, args.requests)}
+    for name in args.stores:
+        report[f"hit:{name}"] = await bench_store(make_store(name), args.requests)
+
+    # End to end with the limits raised out of the way; "off" first and last to show drift
+    limiter.limits = {key: LIMIT for key in limiter.limits}
+    limiter.store = MemoryRateLimitStore()
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for _ in range(200):  # Warm up the principal cache, pools and code paths
+                await client.get("/api/v1/auth/me", headers=headers)
+            for name in ["off", *args.stores, "off"]:
+                limiter.enabled = name != "off"
+                if limiter.enabled:
+                    limiter.store = make_store(name)
+                label = f"/auth/me limiter:{name}"
+                report[label + (" (again)" if label in report else "")] = \
+                    await bench_endpoint(client, headers, args.requests)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request cost of the rate limiter")
+    parser.add_argument("--requests", type=int, default=2000, help="Calls per measurement")
+    parser.add_argument("--stores", default="memory,fakeredis", help="Comma-separated: memory,fakeredis,redis")
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+    args.stores = [store for store in args.stores.split(",") if store]
+    unknown = set(args.stores) - set(STORES)
+    if unknown:
+        parser.error(f"Unknown stores: {', '.join(sorted(unknown))}")
+
+    if settings.ENVIRONMENT == "production":
+        sys.exit("Refusing to seed a production database")
+
+    report = asyncio.run(main_async(args))
+
+    print(f"\n{'measurement':<28} {'calls':>7} {'median us':>10} {'p99 us':>10} {'mean us':>10}")
+    for name, row in report.items():
+        print(f"{name:<28} {row['calls']:>7} {row['median_us']:>10.1f} {row['p99_us']:>10.1f} {row['mean_us']:>10.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"args": vars(args), "results": report}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# benchmarks/bench_serialization.py
+# Compare FastAPI's default response path with the fast TypeAdapter path
+#
+# Run from /backend:
+#     python -m benchmarks.bench_serialization
+#     python -m benchmarks.bench_serialization --sizes 1000,10000 --repeat 5
+
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+
+from app.models.property import PropertyType
+from app.schemas.property import property_list_adapter
+from app.schemas.portfolio import PortfolioMetrics, PortfolioWithMetrics, portfolio_with_metrics_list_adapter
+
+
+def make_properties(count: int) -> list:
+    """Build ORM-like property objects (attribute access, enum property_type)"""
+    properties = []
+    for i in range(count):
+        financials = SimpleNamespace(
+            property_id=i, monthly_rent=2000 + i % 500, property_taxes=250, insurance=100,
+            hoa_fees=50, maintenance_costs=150, monthly_expenses=75, mortgage_payment=1400,
+            vacancy_rate=0.05, cap_rate=5.4, cash_flow=225.0, cash_on_cash_return=4.5
+        )
+        properties.append(SimpleNamespace(
+            id=i, user_id=1, portfolio_id=1, name=f"Property {i}",
+            address=f"{i} Main Street, Denver, CO 80202", property_type=PropertyType.RESIDENTIAL.value,
+            purchase_date=None, purchase_price=300000.0, current_value=320000.0,
+            square_footage=1200.0, bedrooms=3, bathrooms=2.0, is_primary_residence=False,
+            financials=financials
+        ))
+    return properties
+
+
+def make_portfolios(count: int) -> list:
+    """Build already-validated PortfolioWithMetrics models, as PortfolioService returns them"""
+    now = datetime.now(timezone.utc)
+    metrics = PortfolioMetrics(
+        property_count=25, total_value=8_000_000, total_monthly_cash_flow=5625,
+        total_annual_cash_flow=67500, average_cap_rate=5.4, average_monthly_rent=2200,
+        average_monthly_expenses=1975, total_equity=2_400_000,
+        top_cities=[{"city": "Denver", "property_count": 25, "total_value": 8_000_000, "percentage": 100}]
+    )
+    return [
+        PortfolioWithMetrics(
+            id=i, user_id=1, name=f"Portfolio {i}", description=None, color="#10B981", icon="folder",
+            parent_id=None, is_default=False, created_at=now, updated_at=now,
+            metrics=metrics, folder_path=f"Portfolio {i}"
+        )
+        for i in range(count)
+    ]
+
+
+def default_path_orm(adapter, objects) -> bytes:
+    """What FastAPI does with response_model: validate, dump to python, json.dumps"""
+    validated = adapter.validate_python(objects, from_attributes=True)
+    content = jsonable_encoder(adapter.dump_python(validated, mode="json"))
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def default_path_models(adapter, models) -> bytes:
+    """FastAPI dumps returned models to dicts and validates them again before encoding"""
+    dumped = [model.model_dump() for model in models]
+    validated = adapter.validate_python(dumped)
+    content = jsonable_encoder(adapter.dump_python(validated, mode="json"))
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path_orm(adapter, objects) -> bytes:
+    return adapter.dump_json(adapter.validate_python(objects, from_attributes=True))
+
+
+def fast_path_models(adapter, models) -> bytes:
+    return adapter.dump_json(models)
+
+
+def msgpack_path_models(adapter, models) -> bytes:
+    import msgpack
+    return msgpack.packb(adapter.dump_python(models, mode="json"), use_bin_type=True)
+
+
+def time_it(fn, *args, repeat: int = 5) -> dict:
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn(*args)
+        timings.append(time.perf_counter() - start)
+        size = len(body)
+    timings.sort()
+    return {"best_ms": round(timings[0] * 1000, 2), "median_ms": round(timings[len(timings) // 2] * 1000, 2),
+            "bytes": size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response serialization benchmark")
+    parser.add_argument("--sizes", default="1000,10000", help="Comma-separated list sizes")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {}
+    for size in [int(s) for s in args.sizes.split(",")]:
+        properties = make_properties(size)
+        portfolios = make_portfolios(size)
+        results[size] = {
+            "properties_default": time_it(default_path_orm, property_list_adapter, properties, repeat=args.repeat),
+            "properties_fast": time_it(fast_path_orm, property_list_adapter, properties, repeat=args.repeat),
+            "portfolios_default": time_it(default_path_models, portfolio_with_metrics_list_adapter, portfolios,
+                                          repeat=args.repeat),
+            "portfolios_fast": time_it(fast_path_models, portfolio_with_metrics_list_adapter, portfolios,
+                                       repeat=args.repeat),
+            "portfolios_msgpack": time_it(msgpack_path_models, portfolio_with_metrics_list_adapter, portfolios,
+                                          repeat=args.repeat),
+        }
+
+    for size, rows in results.items():
+        print(f"\n{size} items")
+        for name, row in rows.items():
+            print(f"  {name:<22} best {row['best_ms']:>9.2f} ms   median {row['median_ms']:>9.2f} ms   "
+                  f"{row['bytes']:>10} bytes")
+
+
+if __name__ == "__main__":
+    main()
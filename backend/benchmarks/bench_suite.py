@@ -0,0 +1,248 @@
+# benchmarks/bench_suite.py
+# Calculator, service and endpoint benchmarks against seeded synthetic users
+#
+# Needs a migrated local Postgres it may write seed data to. Never point this at production.
+# Run from /backend:
+#     DATABASE_URL=postgresql://postgres@localhost:5432/realestate python -m benchmarks.bench_suite
+#     python -m benchmarks.bench_suite --sizes 10,1000 --repeat 10 --only endpoints
+#
+# Endpoints and services run uncached by default (--cache none), so a run
+# measures the queries rather than cache hits; --cache memory|redis measures
+# the configured backend instead. The backend is recorded in the results.
+#
+# Each size gets its own user (bench-<size>@example.invalid), seeded on the
+# first run and reused afterwards. Results are written to
+# benchmarks/results/<timestamp>_<commit>.json; compare two runs with
+#     python -m benchmarks.compare benchmarks/results/a.json benchmarks/results/b.json
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.core.limiter import limiter
+from app.core.settings import settings
+from app.main import app
+from app.models.portfolio import Portfolio
+from app.models.property import Property
+from app.services import cache_service as cache_module
+from app.services.financial_calculator import FinancialCalculator
+from app.services.portfolio_service import PortfolioService
+from benchmarks.seed import access_token_for, get_or_seed_user
+
+RESULTS_DIR = Path(__file__).parent / "results"
+SEED_EMAIL = "bench-{}@example.invalid"
+GROUPS = ("calculator", "services", "endpoints")
+
+
+def summarize(timings: List[float], **extra) -> Dict:
+    """min/median/p95/mean in milliseconds"""
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {
+        "rounds": len(ordered),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "median_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        **extra,
+    }
+
+
+async def time_async(fn: Callable[[], Awaitable], repeat: int, warmup: int = 1) -> List[float]:
+    for _ in range(warmup):
+        await fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_calculator(size: int, repeat: int) -> Dict:
+    """calculate_all_metrics over `size` properties, the way create/update call it"""
+    inputs = [{
+        "monthly_rent": 1800 + (i % 50) * 20, "property_taxes": 250, "insurance": 100, "hoa_fees": 0,
+        "maintenance_costs": 150, "other_expenses": 50, "mortgage_payment": 1400,
+        "current_value": 300000 + (i % 100) * 1500, "down_payment": 60000, "vacancy_rate": 0.05
+    } for i in range(size)]
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for financial_input in inputs:
+            FinancialCalculator.calculate_all_metrics(financial_input)
+        timings.append(time.perf_counter() - start)
+    result = summarize(timings)
+    result["per_call_us"] = round(result["median_ms"] * 1000 / size, 3)
+    return {"calculate_all_metrics": result}
+
+
+async def bench_services(user_id: int, folder_id: int, repeat: int) -> Dict:
+    """Portfolio metrics straight through the service layer, fresh session per round"""
+    async def portfolio_metrics():
+        async with AsyncSessionLocal() as db:
+            await PortfolioService(db).calculate_portfolio_metrics(folder_id, user_id)
+
+    async def portfolios_with_metrics():
+        async with AsyncSessionLocal() as db:
+            await PortfolioService(db).get_user_portfolios_with_metrics(user_id)
+
+    return {
+        "calculate_portfolio_metrics": summarize(await time_async(portfolio_metrics, repeat)),
+        "get_user_portfolios_with_metrics": summarize(await time_async(portfolios_with_metrics, repeat)),
+    }
+
+
+async def bench_endpoints(user_id: int, email: str, folder_id: int, property_id: int, repeat: int) -> Dict:
+    """Main read endpoints through the full ASGI stack (middleware, auth, serialization)"""
+    routes = {
+        "GET /properties": "/api/v1/properties/",
+        "GET /properties/{id}": f"/api/v1/properties/{property_id}",
+        "GET /portfolios": "/api/v1/portfolios/?include_default=true",
+        "GET /portfolios/{id}": f"/api/v1/portfolios/{folder_id}",
+        "GET /portfolios/{id}/metrics": f"/api/v1/portfolios/{folder_id}/metrics",
+        "GET /portfolios/{id}/properties": f"/api/v1/portfolios/{folder_id}/properties",
+        "GET /sync": "/api/v1/sync/",
+    }
+    headers = {"Authorization": f"Bearer {access_token_for(user_id, email)}"}
+    results = {}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        for name, url in routes.items():
+            last = {}
+
+            async def call():
+                response = await client.get(url)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{name} returned {response.status_code}: {response.text[:200]}")
+                last["response"] = response
+
+            timings = await time_async(call, repeat)
+            response = last["response"]
+            results[name] = summarize(
+                timings,
+                bytes=len(response.content),
+                server_timing=response.headers.get("server-timing"),
+            )
+    return results
+
+
+def use_cache_backend(backend: str):
+    """Swap the cache service every module imported for one of the given backend"""
+    current = cache_module.cache_service
+    settings.CACHE_BACKEND = backend
+    replacement = cache_module.get_cache_service()
+    for module in list(sys.modules.values()):
+        if getattr(module, "cache_service", None) is current:
+            module.cache_service = replacement
+
+
+async def run(args) -> Dict:
+    # The suite measures the app, not the per-IP rate limits
+    limiter.enabled = False
+    use_cache_backend(args.cache)
+
+    results = {}
+    for size in args.sizes:
+        print(f"\n== {size} properties ==")
+        entry = {}
+        repeat = args.repeat if size < 100_000 else max(2, args.repeat // 3)
+
+        if "calculator" in args.only:
+            entry["calculator"] = bench_calculator(size, repeat)
+
+        if "services" in args.only or "endpoints" in args.only:
+            email = SEED_EMAIL.format(size)
+            async with AsyncSessionLocal() as db:
+                seed_start = time.perf_counter()
+                user_id = await get_or_seed_user(db, email, size)
+                seed_time = time.perf_counter() - seed_start
+                folder_id = await db.scalar(
+                    select(Portfolio.id).where(Portfolio.user_id == user_id, Portfolio.is_default == False)
+                    .order_by(Portfolio.id).limit(1)
+                )
+                property_id = await db.scalar(
+                    select(Property.id).where(Property.user_id == user_id).order_by(Property.id).limit(1)
+                )
+            if seed_time > 1:
+                print(f"   seeded in {seed_time:.1f}s")
+
+            if "services" in args.only:
+                entry["services"] = await bench_services(user_id, folder_id, repeat)
+            if "endpoints" in args.only:
+                entry["endpoints"] = await bench_endpoints(user_id, email, folder_id, property_id, repeat)
+
+        for group, benches in entry.items():
+            for name, row in benches.items():
+                print(f"   {group:<11} {name:<34} median {row['median_ms']:>10.2f} ms   "
+                      f"p95 {row['p95_ms']:>10.2f} ms")
+        results[str(size)] = entry
+
+    await async_engine.dispose()
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calculator, service and endpoint benchmarks")
+    parser.add_argument("--sizes", default="10,1000,10000,100000", help="Comma-separated property counts")
+    parser.add_argument("--repeat", type=int, default=7, help="Timed rounds per benchmark (fewer at 100k)")
+    parser.add_argument("--only", default=",".join(GROUPS), help=f"Comma-separated subset of {GROUPS}")
+    parser.add_argument("--cache", default="none", choices=("none", "memory", "redis"),
+                        help="Cache backend to measure (default: none, every request hits the database)")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<timestamp>_<commit>.json)")
+    args = parser.parse_args()
+    args.sizes = [int(s) for s in args.sizes.split(",")]
+    args.only = set(args.only.split(","))
+
+    if settings.ENVIRONMENT == "production":
+        sys.exit("Refusing to seed a production database")
+
+    started = datetime.now(timezone.utc)
+    results = asyncio.run(run(args))
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "started_at": started.isoformat(),
+            "commit": commit,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": args.sizes,
+            "repeat": args.repeat,
+            "db_pool_size": settings.DB_POOL_SIZE,
+            "replicas": len(settings.async_replica_urls),
+            "cache_backend": args.cache,
+        },
+        "results": results,
+    }
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{started:%Y%m%d_%H%M%S}_{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# benchmarks/check_query_plans.py
+# Query-plan regression check: EXPLAIN every SQL statement the hot service
+# paths issue and fail if any of them falls back to a sequential scan.
+#
+# Needs a migrated local Postgres it may write seed data to. Never point this at production.
+# Run from /backend:
+#     DATABASE_URL=postgresql://postgres@localhost:5432/realestate python -m benchmarks.check_query_plans
+#     python -m benchmarks.check_query_plans --users 200 --properties 50 --verbose
+#
+# Exits 1 when a hot query plans a Seq Scan, so it can gate CI.
+
+import argparse
+import asyncio
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import List, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import async_engine
+from app.core.settings import settings
+from app.models.user import User
+from app.services.portfolio_service import PortfolioService
+from app.services.property_service import PropertyService
+from app.services.sync_service import SyncService
+from benchmarks.seed import seed_users
+
+SEED_EMAIL = "plan-check-{}@example.invalid"
+
+
+class StatementRecorder:
+    """Collects (label, statement, parameters) for everything sent to the database while recording"""
+
+    def __init__(self):
+        self.statements: List[Tuple[str, str, tuple]] = []
+        self.label = None
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self.label is not None and not executemany:
+            self.statements.append((self.label, statement, parameters))
+
+    @contextmanager
+    def recording(self, label: str):
+        self.label = label
+        try:
+            yield
+        finally:
+            self.label = None
+
+
+async def seed(session: AsyncSession, users: int, properties_per_user: int, portfolios_per_user: int) -> int:
+    """Seed users once; returns the id of the user the scenarios run as"""
+    existing = await session.scalar(select(User.id).where(User.email == SEED_EMAIL.format(0)))
+    if existing:
+        return existing
+
+    print(f"Seeding {users} users x {properties_per_user} properties ...")
+    emails = [SEED_EMAIL.format(i) for i in range(users)]
+    return (await seed_users(session, emails, properties_per_user, portfolios_per_user))[0]
+
+
+async def run_scenarios(session: AsyncSession, recorder: StatementRecorder, user_id: int):
+    """Drive the service methods behind the hot API routes"""
+    properties = PropertyService(session)
+    portfolios = PortfolioService(session)
+    sync = SyncService(session)
+
+    folders = await portfolios.get_user_portfolios(user_id)
+    folder = next(p for p in folders if not p.is_default)
+    other_folder = next(p for p in folders if not p.is_default and p.id != folder.id)
+    prop = (await properties.get_user_properties(user_id))[0]
+
+    scenarios = [
+        ("GET /auth/me", lambda: session.get(User, user_id)),
+        ("login lookup", lambda: session.scalar(select(User).where(User.email == SEED_EMAIL.format(0)))),
+        ("GET /properties", lambda: properties.get_user_properties(user_id)),
+        ("GET /properties/{id}", lambda: properties.get_property_by_id(prop.id, user_id)),
+        ("GET /portfolios", lambda: portfolios.get_user_portfolios_with_metrics(user_id, include_default=False)),
+        ("GET /portfolios/{id}", lambda: portfolios.get_portfolio_with_metrics(folder.id, user_id)),
+        ("GET /portfolios/{id}/properties", lambda: portfolios.get_portfolio_properties(folder.id, user_id)),
+        ("default portfolio", lambda: portfolios.get_default_portfolio(user_id)),
+        ("GET /sync (full)", lambda: sync.get_changes(user_id)),
+        ("GET /sync (delta)", lambda: sync.get_changes(user_id, datetime.now(timezone.utc) - timedelta(hours=1))),
+        ("PUT /properties/{id}", lambda: properties.update_property(prop.id, user_id, {"monthly_rent": 2300})),
+        ("move property", lambda: portfolios.move_property_to_portfolio(prop.id, other_folder.id, user_id)),
+        ("DELETE /portfolios/{id}", lambda: portfolios.delete_portfolio(folder.id, user_id)),
+    ]
+    for label, call in scenarios:
+        # Identity map hits would hide queries
+        session.expunge_all()
+        with recorder.recording(label):
+            await call()
+
+
+def find_seq_scans(plan: dict) -> List[str]:
+    """Relations read with a Seq Scan anywhere in an EXPLAIN (FORMAT JSON) plan tree"""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name", "?"))
+    for child in plan.get("Plans", []):
+        found.extend(find_seq_scans(child))
+    return found
+
+
+async def main_async(args) -> int:
+    recorder = StatementRecorder()
+
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        user_id = await seed(session, args.users, args.properties, args.portfolios)
+
+    async with async_engine.connect() as conn:
+        outer = await conn.begin()
+        # Service commits become savepoints; everything is rolled back at the end
+        session = AsyncSession(bind=conn, join_transaction_mode="create_savepoint", expire_on_commit=False)
+        event.listen(async_engine.sync_engine, "before_cursor_execute", recorder.before_cursor_execute)
+        try:
+            await run_scenarios(session, recorder, user_id)
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", recorder.before_cursor_execute)
+
+        # Small tables make sequential scans cheapest no matter what; with
+        # them priced out the planner only picks one when there's no usable index
+        await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+
+        failures = 0
+        for label, statement, parameters in recorder.statements:
+            # INSERTs don't scan, and SELECT now() has no table to scan
+            keyword = statement.lstrip().split(None, 1)[0].upper()
+            if keyword not in ("SELECT", "UPDATE", "DELETE") or "FROM" not in statement.upper():
+                continue
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = result.scalar()[0]["Plan"]
+            seq_scans = find_seq_scans(plan)
+            status = "SEQ SCAN on " + ", ".join(seq_scans) if seq_scans else "ok"
+            if seq_scans:
+                failures += 1
+            if seq_scans or args.verbose:
+                print(f"[{label}] {status}\n    {' '.join(statement.split())[:300]}")
+
+        await outer.rollback()
+
+    print(f"\n{len(recorder.statements)} statements checked, {failures} with sequential scans")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when a hot query plans a sequential scan")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--properties", type=int, default=50, help="Properties per seed user")
+    parser.add_argument("--portfolios", type=int, default=5, help="Folders per seed user, including the default")
+    parser.add_argument("--verbose", action="store_true", help="Print every statement, not just failures")
+    args = parser.parse_args()
+
+    if settings.ENVIRONMENT == "production":
+        sys.exit("Refusing to seed a production database")
+
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# benchmarks/compare.py
+# Compare two bench_suite result files
+#
+# Run from /backend:
+#     python -m benchmarks.compare benchmarks/results/before.json benchmarks/results/after.json
+#     python -m benchmarks.compare before.json after.json --threshold 15 --fail-on-regression
+
+import argparse
+import json
+import sys
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark runs (median times)")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Percent slowdown reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 if anything regressed")
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    print(f"baseline  {baseline['meta']['commit']}  {baseline['meta']['started_at']}")
+    print(f"candidate {candidate['meta']['commit']}  {candidate['meta']['started_at']}\n")
+    # Runs from before the cache backend was recorded used whatever CACHE_BACKEND was set
+    backends = [run["meta"].get("cache_backend", "unknown") for run in (baseline, candidate)]
+    if backends[0] != backends[1]:
+        print(f"warning: cache backends differ ({backends[0]} vs {backends[1]}), timings aren't comparable\n")
+
+    regressions = 0
+    for size, groups in candidate["results"].items():
+        for group, benches in groups.items():
+            for name, row in benches.items():
+                before = baseline["results"].get(size, {}).get(group, {}).get(name)
+                if before is None:
+                    print(f"{size:>7} {group:<11} {name:<34} {'new':>12} -> {row['median_ms']:>10.2f} ms")
+                    continue
+                change = (row["median_ms"] - before["median_ms"]) / before["median_ms"] * 100 \
+                    if before["median_ms"] else 0.0
+                flag = ""
+                if change > args.threshold:
+                    flag = "  REGRESSION"
+                    regressions += 1
+                elif change < -args.threshold:
+                    flag = "  faster"
+                print(f"{size:>7} {group:<11} {name:<34} {before['median_ms']:>10.2f} -> {row['median_ms']:>10.2f} ms"
+                      f"  {change:+7.1f}%{flag}")
+
+    print(f"\n{regressions} regression(s) over {args.threshold:.0f}%")
+    if args.fail_on_regression and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
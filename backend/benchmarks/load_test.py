@@ -0,0 +1,271 @@
+# benchmarks/load_test.py
+# Load test that replays the frontend's flows against a running server
+#
+# Each virtual user logs in, then repeats the flow the property pages make:
+#   GET /portfolios/?include_default=true -> GET /properties/ -> GET /properties/{id}
+#   -> GET /properties/{id}/metrics -> PUT /properties/{id}
+# with randomized think time between steps. It logs in again every
+# --iterations-per-login flows, and reports p50/p95/p99 latency and
+# throughput per route.
+#
+# Needs a migrated local Postgres it may write seed data to. Never point this at production.
+# Run from /backend, against a server you started yourself:
+#     python -m benchmarks.load_test --base-url http://127.0.0.1:8000 --users 50 --duration 60
+# or let it start gunicorn (4 UvicornWorkers, like the Procfile) on the same DATABASE_URL:
+#     DATABASE_URL=postgresql://postgres@localhost:5432/realestate \
+#         python -m benchmarks.load_test --spawn --users 25,50,100,200 --duration 60 --output load.json
+#
+# With several --users values each stage runs in turn; the summary shows the
+# largest stage that met --slo-p95-ms with under 1% errors.
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import httpx
+from sqlalchemy import func, select
+
+from app.auth.service import auth_service
+from app.core.database import AsyncSessionLocal, async_engine
+from app.core.settings import settings
+from app.models.user import User
+from benchmarks.seed import seed_users
+
+SEED_EMAIL = "load-{}@example.com"  # must pass EmailStr validation on login
+PASSWORD = "load-test-password"
+# Properties per user, cycled across users: most accounts are small, a few are large
+PORTFOLIO_SIZES = [10, 25, 10, 50, 25, 10, 100, 250]
+
+
+class RouteStats:
+    """Latencies and status codes per route for one stage"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.recording = False
+
+    def record(self, route: str, elapsed: float, status_code: int):
+        if not self.recording:
+            return
+        self.latencies[route].append(elapsed)
+        if status_code >= 400:
+            self.errors[route] += 1
+
+    def summary(self, duration: float) -> Dict:
+        rows = {}
+        all_latencies = []
+        for route, latencies in sorted(self.latencies.items()):
+            rows[route] = summarize(latencies, self.errors[route], duration)
+            all_latencies.extend(latencies)
+        rows["ALL"] = summarize(all_latencies, sum(self.errors.values()), duration)
+        return rows
+
+
+def percentile(ordered: List[float], p: float) -> float:
+    return ordered[max(0, math.ceil(p * len(ordered)) - 1)]
+
+
+def summarize(latencies: List[float], errors: int, duration: float) -> Dict:
+    if not latencies:
+        return {"requests": 0, "errors": errors}
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / duration, 2),
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1),
+    }
+
+
+async def ensure_users(count: int):
+    """Seed load-test users with real password hashes, topping up if an earlier run made fewer"""
+    async with AsyncSessionLocal() as db:
+        existing = await db.scalar(
+            select(func.count()).select_from(User).where(User.email.like(SEED_EMAIL.format("%")))
+        )
+        if existing >= count:
+            return
+        print(f"Seeding {count - existing} load-test users ...")
+        hashed_password = auth_service.hash_password(PASSWORD)
+        by_size = defaultdict(list)
+        for i in range(existing, count):
+            by_size[PORTFOLIO_SIZES[i % len(PORTFOLIO_SIZES)]].append(SEED_EMAIL.format(i))
+        for size, emails in by_size.items():
+            await seed_users(db, emails, size, hashed_password=hashed_password)
+    await async_engine.dispose()
+
+
+async def think(args):
+    await asyncio.sleep(random.uniform(0.5, 1.5) * args.think)
+
+
+async def request(client: httpx.AsyncClient, stats: RouteStats, route: str, method: str, url: str, **kwargs):
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.HTTPError:
+        stats.record(route, time.perf_counter() - start, 599)
+        return None
+    stats.record(route, time.perf_counter() - start, response.status_code)
+    return response if response.status_code < 400 else None
+
+
+async def virtual_user(index: int, client: httpx.AsyncClient, stats: RouteStats, stop: asyncio.Event, args):
+    email = SEED_EMAIL.format(index)
+    while not stop.is_set():
+        response = await request(client, stats, "POST /auth/login", "POST", "/api/v1/auth/login",
+                                 json={"email": email, "password": PASSWORD})
+        if response is None:
+            await think(args)
+            continue
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        for _ in range(args.iterations_per_login):
+            if stop.is_set():
+                return
+            await think(args)
+            await request(client, stats, "GET /portfolios", "GET", "/api/v1/portfolios/",
+                          params={"include_default": "true"}, headers=headers)
+            await think(args)
+            response = await request(client, stats, "GET /properties", "GET", "/api/v1/properties/",
+                                     headers=headers)
+            if response is None or not response.json():
+                continue
+            property_id = random.choice(response.json())["id"]
+
+            await think(args)
+            await request(client, stats, "GET /properties/{id}", "GET", f"/api/v1/properties/{property_id}",
+                          headers=headers)
+            await request(client, stats, "GET /properties/{id}/metrics", "GET",
+                          f"/api/v1/properties/{property_id}/metrics", headers=headers)
+            await think(args)
+            await request(client, stats, "PUT /properties/{id}", "PUT", f"/api/v1/properties/{property_id}",
+                          json={"monthly_rent": random.randint(1500, 3500)}, headers=headers)
+
+
+async def run_stage(users: int, args) -> Dict:
+    stats = RouteStats()
+    stop = asyncio.Event()
+    limits = httpx.Limits(max_connections=users * 2, max_keepalive_connections=users * 2)
+
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        tasks = []
+        for i in range(users):
+            tasks.append(asyncio.create_task(virtual_user(i, client, stats, stop, args)))
+            # Spread logins over the ramp-up instead of a thundering herd
+            await asyncio.sleep(args.ramp / users)
+
+        stats.recording = True
+        start = time.perf_counter()
+        await asyncio.sleep(args.duration)
+        stats.recording = False
+        duration = time.perf_counter() - start
+
+        stop.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    return stats.summary(duration)
+
+
+def print_stage(users: int, rows: Dict):
+    print(f"\n== {users} concurrent users ==")
+    print(f"{'route':<32} {'reqs':>7} {'err':>5} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for route, row in rows.items():
+        if not row["requests"]:
+            print(f"{route:<32} {0:>7} {row['errors']:>5}")
+            continue
+        print(f"{route:<32} {row['requests']:>7} {row['errors']:>5} {row['rps']:>8.1f} "
+              f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f}")
+
+
+def spawn_server(args) -> subprocess.Popen:
+    """Start gunicorn the way the Procfile does and wait for /health"""
+    env = dict(os.environ)
+    if not args.keep_rate_limits:
+        # Every virtual user comes from 127.0.0.1, so per-IP limits would
+        # throttle the whole test as if it were one client
+        env["RATE_LIMIT_ENABLED"] = "false"
+    port = httpx.URL(args.base_url).port or 8000
+    server = subprocess.Popen(
+        ["gunicorn", "app.main:app", "--config", "gunicorn.conf.py", "--workers", str(args.workers),
+         "--worker-class", "uvicorn.workers.UvicornWorker", "--bind", f"127.0.0.1:{port}"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{args.base_url}/health", timeout=1).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    server.terminate()
+    sys.exit("Server did not become healthy within 30s")
+
+
+async def main_async(args) -> Dict:
+    await ensure_users(max(args.users))
+    report = {}
+    for users in args.users:
+        rows = await run_stage(users, args)
+        print_stage(users, rows)
+        report[str(users)] = rows
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay frontend flows with concurrent virtual users")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", default="25", help="Concurrent virtual users; comma-separated for stages")
+    parser.add_argument("--duration", type=float, default=60, help="Measured seconds per stage")
+    parser.add_argument("--ramp", type=float, default=10, help="Seconds to start all users (not measured)")
+    parser.add_argument("--think", type=float, default=2.0, help="Mean think time between steps, seconds")
+    parser.add_argument("--iterations-per-login", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout, seconds")
+    parser.add_argument("--slo-p95-ms", type=float, default=500.0, help="p95 target used for the summary")
+    parser.add_argument("--spawn", action="store_true", help="Start gunicorn locally for the run")
+    parser.add_argument("--workers", type=int, default=4, help="Gunicorn workers with --spawn")
+    parser.add_argument("--keep-rate-limits", action="store_true", help="Don't disable per-IP limits with --spawn")
+    parser.add_argument("--output", help="Write the per-stage results as JSON")
+    args = parser.parse_args()
+    args.users = [int(u) for u in args.users.split(",")]
+
+    if settings.ENVIRONMENT == "production":
+        sys.exit("Refusing to seed a production database")
+
+    server = spawn_server(args) if args.spawn else None
+    try:
+        report = asyncio.run(main_async(args))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    sustained = [int(users) for users, rows in report.items()
+                 if rows["ALL"]["requests"]
+                 and rows["ALL"]["p95_ms"] <= args.slo_p95_ms
+                 and rows["ALL"]["errors"] / rows["ALL"]["requests"] < 0.01]
+    print(f"\nLargest stage within p95 <= {args.slo_p95_ms:.0f} ms and <1% errors: "
+          f"{max(sustained) if sustained else 'none'} users")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"args": {k: v for k, v in vars(args).items()}, "stages": report}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
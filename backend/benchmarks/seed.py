@@ -0,0 +1,84 @@
+# benchmarks/seed.py
+# Synthetic users, folders and properties for benchmarks and plan checks
+# Bulk inserts straight through the ORM tables; no services, no bcrypt
+
+from typing import List, Optional
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.service import auth_service
+from app.core.address import address_key
+from app.models.portfolio import Portfolio
+from app.models.property import Property, PropertyFinancials, PropertyType
+from app.models.user import User
+
+SEEDED_TABLES = ("users", "portfolios", "properties", "property_financials", "sync_tombstones")
+CITIES = ["Denver, CO 80202", "Austin, TX 78701", "Atlanta, GA 30303", "Phoenix, AZ 85004", "Tampa, FL 33602"]
+
+
+async def seed_users(session: AsyncSession, emails: List[str], properties_per_user: int,
+                     portfolios_per_user: int = 5, hashed_password: str = "!") -> List[int]:
+    """
+    Insert users, each with a default folder, (portfolios_per_user - 1) more
+    folders and properties_per_user properties spread across them.
+    Commits and ANALYZEs so the planner sees realistic statistics.
+    The default password hash matches nothing, so seeded users can't log in.
+    """
+    user_ids = list(await session.scalars(
+        insert(User).returning(User.id),
+        [{"email": email, "hashed_password": hashed_password, "first_name": "Bench", "last_name": "User",
+          "subscription_tier": "pro"} for email in emails]
+    ))
+
+    portfolio_rows = []
+    for user_id in user_ids:
+        portfolio_rows.append({"user_id": user_id, "name": "All Properties", "is_default": True,
+                               "color": "#6B7280", "icon": "folder"})
+        portfolio_rows.extend({"user_id": user_id, "name": f"Folder {i}", "is_default": False}
+                              for i in range(1, portfolios_per_user))
+    portfolios = (await session.execute(
+        insert(Portfolio).returning(Portfolio.id, Portfolio.user_id), portfolio_rows
+    )).all()
+    folders_by_user = {}
+    for portfolio_id, user_id in portfolios:
+        folders_by_user.setdefault(user_id, []).append(portfolio_id)
+
+    for user_id in user_ids:
+        folders = folders_by_user[user_id]
+        # Bulk inserts skip the model's validators: address_key is set here
+        addresses = [f"{i} Main Street, {CITIES[i % len(CITIES)]}" for i in range(properties_per_user)]
+        property_ids = list(await session.scalars(insert(Property).returning(Property.id), [{
+            "user_id": user_id, "portfolio_id": folders[i % len(folders)], "name": f"Property {i}",
+            "address": addresses[i], "address_key": address_key(addresses[i]),
+            "property_type": PropertyType.RESIDENTIAL,
+            "purchase_price": 250000 + (i % 100) * 1000, "current_value": 300000 + (i % 100) * 1500,
+            "down_payment": 60000, "bedrooms": 3, "bathrooms": 2.0, "square_footage": 1500
+        } for i in range(properties_per_user)])) if properties_per_user else []
+
+        if property_ids:
+            await session.execute(insert(PropertyFinancials), [{
+                "property_id": property_id, "monthly_rent": 1800 + (i % 50) * 20, "property_taxes": 250,
+                "insurance": 100, "hoa_fees": 0, "maintenance_costs": 150, "other_expenses": 50,
+                "mortgage_payment": 1400, "vacancy_rate": 0.05, "cap_rate": 5.4, "cash_flow": 225,
+                "cash_on_cash_return": 4.5
+            } for i, property_id in enumerate(property_ids)])
+
+    await session.commit()
+    for table in SEEDED_TABLES:
+        await session.execute(text(f"ANALYZE {table}"))
+    return user_ids
+
+
+async def get_or_seed_user(session: AsyncSession, email: str, properties: int, portfolios: int = 5) -> int:
+    """Reuse a seeded user from an earlier run, or create one"""
+    user_id: Optional[int] = await session.scalar(select(User.id).where(User.email == email))
+    if user_id is None:
+        user_id = (await seed_users(session, [email], properties, portfolios))[0]
+    return user_id
+
+
+def access_token_for(user_id: int, email: str) -> str:
+    """Mint the same access token /auth/login would return for a seeded user"""
+    user = User(id=user_id, email=email, subscription_tier="pro", token_version=0)
+    return auth_service.create_access_token(data=auth_service.token_claims(user))
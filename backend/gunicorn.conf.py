@@ -0,0 +1,41 @@
+# gunicorn.conf.py
+# Gunicorn settings and hooks; worker count, class and bind stay on the command line (start.sh, Procfile)
+#
+# Prometheus multiprocess mode: every worker writes its samples to files in
+# PROMETHEUS_MULTIPROC_DIR and /metrics merges them. The variable must be set
+# before prometheus_client is first imported, which is why it happens here in
+# the master, before any worker forks.
+
+import os
+import shutil
+import tempfile
+
+metrics_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "cribb-prometheus")
+)
+
+# Imported here, after the variable is set: importing inside child_exit runs
+# in a signal handler and can interrupt an import already in progress
+from prometheus_client import multiprocess  # noqa: E402
+
+# Proxies trusted to report the client address (X-Forwarded-For) and scheme;
+# uvicorn workers take the client IP from the last untrusted hop, which the
+# per-IP rate limits count against. Railway's edge reaches the service from
+# private addresses, so only non-routable ranges are trusted by default; a
+# client on the internet can't pose as the proxy. Never "*": anyone could
+# then pick their own IP with a forged header.
+forwarded_allow_ips = os.environ.get(
+    "FORWARDED_ALLOW_IPS",
+    "127.0.0.1,::1,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16,100.64.0.0/10,fc00::/7",
+)
+
+
+def on_starting(server):
+    """Start each server run with empty metric files"""
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Drop a dead worker's live gauges (in-flight requests, checked-out connections)"""
+    multiprocess.mark_process_dead(worker.pid)
@@ -17,8 +17,9 @@ from app.models.base import Base
 from app.models.user import User
 from app.models.property import Property, PropertyFinancials
 from app.models.portfolio import Portfolio, PortfolioProperty
-from app.models.simulation import Simulation
+from app.models.simulation import Simulation, SimulationArray
 from app.models.import_session import ImportSession
+from app.models.sync_tombstone import SyncTombstone
 
 # This is the Alembic Config object
 config = context.config
@@ -0,0 +1,42 @@
+"""add sync tombstones and updated_at indexes
+
+Revision ID: 3f1c9a2b7d45
+Revises: c28869a2dcd0
+Create Date: 2025-11-02 14:10:12.481203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c9a2b7d45'
+down_revision = 'c28869a2dcd0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('sync_tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('entity_type', sa.String(length=50), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_sync_tombstones_user_id_deleted_at', 'sync_tombstones', ['user_id', 'deleted_at'], unique=False)
+
+    # Supporting indexes for "changed since cursor" queries
+    op.create_index('ix_properties_user_id_updated_at', 'properties', ['user_id', 'updated_at'], unique=False)
+    op.create_index('ix_portfolios_user_id_updated_at', 'portfolios', ['user_id', 'updated_at'], unique=False)
+    op.create_index('ix_property_financials_updated_at', 'property_financials', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_property_financials_updated_at', table_name='property_financials')
+    op.drop_index('ix_portfolios_user_id_updated_at', table_name='portfolios')
+    op.drop_index('ix_properties_user_id_updated_at', table_name='properties')
+    op.drop_index('ix_sync_tombstones_user_id_deleted_at', table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
@@ -0,0 +1,40 @@
+"""add hot path indexes
+
+Revision ID: 9b2e6d4c1a87
+Revises: 3f1c9a2b7d45
+Create Date: 2025-11-04 09:15:37.204518
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '9b2e6d4c1a87'
+down_revision = '3f1c9a2b7d45'
+branch_labels = None
+depends_on = None
+
+
+# (user_id, updated_at) on properties/portfolios already exists from 3f1c9a2b7d45
+INDEXES = [
+    ('ix_properties_portfolio_id', 'properties', ['portfolio_id']),
+    ('ix_properties_user_id_portfolio_id', 'properties', ['user_id', 'portfolio_id']),
+    ('ix_portfolios_user_id_is_default', 'portfolios', ['user_id', 'is_default']),
+    # Deleting a folder loads its child folders to detach them
+    ('ix_portfolios_parent_id', 'portfolios', ['parent_id']),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction, and doesn't
+    # block writes on tables that are already serving traffic. If a build
+    # fails it leaves an INVALID index behind: drop it and re-run.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,27 @@
+"""add cache version to users
+
+Revision ID: 5d8a3f0b2c61
+Revises: 9b2e6d4c1a87
+Create Date: 2025-11-06 11:40:12.873014
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d8a3f0b2c61'
+down_revision = '9b2e6d4c1a87'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Bumped in the same transaction as every write to a user's folders or
+    # properties; cached reads are keyed by it (app/services/cache_service.py).
+    # Adding a column with a constant default doesn't rewrite the table.
+    op.add_column('users', sa.Column('cache_version', sa.BigInteger(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'cache_version')
@@ -0,0 +1,25 @@
+"""add token version to users
+
+Revision ID: 7e1b4c9d2f30
+Revises: 5d8a3f0b2c61
+Create Date: 2025-11-07 15:05:48.119362
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e1b4c9d2f30'
+down_revision = '5d8a3f0b2c61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Access tokens carry it as "tv"; tokens issued before have no tv and match 0
+    op.add_column('users', sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
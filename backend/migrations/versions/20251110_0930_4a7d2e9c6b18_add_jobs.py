@@ -0,0 +1,60 @@
+"""add jobs
+
+Revision ID: 4a7d2e9c6b18
+Revises: 8c2f5a7e3b14
+Create Date: 2025-11-10 09:30:12.418307
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4a7d2e9c6b18'
+down_revision = '8c2f5a7e3b14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('kind', sa.String(length=50), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=True),
+    sa.Column('status', sa.Enum('QUEUED', 'RUNNING', 'SUCCEEDED', 'FAILED', 'CANCELLED', name='jobstatus'), nullable=False),
+    sa.Column('priority', sa.Integer(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('run_after', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('cancel_requested', sa.Boolean(), nullable=False),
+    sa.Column('locked_by', sa.String(length=100), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_jobs_user_id'), 'jobs', ['user_id'], unique=False)
+    op.create_index('ix_jobs_status_run_after', 'jobs', ['status', 'run_after'], unique=False)
+
+    # Imports run as jobs, resume where a failed attempt stopped, and can be cancelled
+    op.execute("ALTER TYPE importstatus ADD VALUE IF NOT EXISTS 'CANCELLED'")
+    op.add_column('import_sessions', sa.Column('job_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('import_sessions_job_id_fkey', 'import_sessions', 'jobs', ['job_id'], ['id'], ondelete='SET NULL')
+    op.add_column('import_sessions', sa.Column('rows_read', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('import_sessions', 'rows_read')
+    op.drop_constraint('import_sessions_job_id_fkey', 'import_sessions', type_='foreignkey')
+    op.drop_column('import_sessions', 'job_id')
+    # Postgres can't drop an enum value; 'CANCELLED' stays in importstatus
+    op.drop_index('ix_jobs_status_run_after', table_name='jobs')
+    op.drop_index(op.f('ix_jobs_user_id'), table_name='jobs')
+    op.drop_table('jobs')
+    op.execute('DROP TYPE jobstatus')
@@ -0,0 +1,117 @@
+"""add property address keys
+
+Revision ID: 6f3b8e1d5a27
+Revises: 4a7d2e9c6b18
+Create Date: 2025-11-12 10:45:21.630942
+
+"""
+from typing import Optional
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6f3b8e1d5a27'
+down_revision = '4a7d2e9c6b18'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH = 10000
+
+# A frozen copy of app.core.address.address_key as of this revision: the
+# migration must keep computing the same keys however the app's copy changes
+# later (a new normalization needs its own migration to re-key properties)
+STREET_SUFFIXES = {
+    "alley": "aly", "avenue": "ave", "av": "ave", "aven": "ave", "boulevard": "blvd", "boul": "blvd",
+    "circle": "cir", "circ": "cir", "court": "ct", "crt": "ct", "cove": "cv", "crescent": "cres",
+    "crossing": "xing", "drive": "dr", "drv": "dr", "expressway": "expy", "freeway": "fwy",
+    "highway": "hwy", "hiway": "hwy", "lane": "ln", "loop": "loop", "parkway": "pkwy", "pky": "pkwy",
+    "place": "pl", "plaza": "plz", "point": "pt", "road": "rd", "route": "rte", "square": "sq",
+    "street": "st", "str": "st", "strt": "st", "terrace": "ter", "terr": "ter", "trail": "trl",
+    "turnpike": "tpke", "way": "way",
+}
+DIRECTIONS = {
+    "north": "n", "south": "s", "east": "e", "west": "w",
+    "northeast": "ne", "northwest": "nw", "southeast": "se", "southwest": "sw",
+}
+UNIT_DESIGNATORS = {
+    "apartment", "apt", "suite", "ste", "unit", "no", "number", "room", "rm", "#",
+}
+ABBREVIATIONS = {**STREET_SUFFIXES, **DIRECTIONS}
+
+TOKEN = re.compile(r"#|[a-z0-9]+")
+MAX_KEY_LENGTH = 500
+
+
+def address_key(address: Optional[str]) -> Optional[str]:
+    """Normalized key for an address; None without one"""
+    if not address:
+        return None
+    text = unicodedata.normalize("NFKD", address).encode("ascii", "ignore").decode("ascii").lower()
+    words = []
+    for token in TOKEN.findall(text):
+        if token in UNIT_DESIGNATORS:
+            if words and words[-1] == "unit":
+                continue  # "Apt #4B"
+            token = "unit"
+        words.append(ABBREVIATIONS.get(token, token))
+    if words and words[-1] == "unit":
+        words.pop()
+    return " ".join(words)[:MAX_KEY_LENGTH] or None
+
+
+def backfill_address_keys(connection) -> None:
+    """Compute every property's address_key, a batch of ids at a time (the normalization is Python)"""
+    last_id = 0
+    while True:
+        rows = connection.execute(sa.text(
+            "SELECT id, address FROM properties WHERE id > :last_id AND address IS NOT NULL ORDER BY id LIMIT :limit"
+        ), {"last_id": last_id, "limit": BACKFILL_BATCH}).all()
+        if not rows:
+            return
+        connection.execute(sa.text(
+            "UPDATE properties SET address_key = v.key "
+            "FROM unnest(CAST(:ids AS integer[]), CAST(:keys AS varchar[])) AS v(id, key) "
+            "WHERE properties.id = v.id"
+        ), {"ids": [row.id for row in rows], "keys": [address_key(row.address) for row in rows]})
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.add_column('properties', sa.Column('address_key', sa.String(length=500), nullable=True))
+    importmode = sa.Enum('INSERT', 'UPSERT', name='importmode')
+    importmode.create(op.get_bind())
+    op.add_column('import_sessions', sa.Column('mode', importmode, server_default='INSERT', nullable=False))
+    op.add_column('import_sessions', sa.Column('inserted_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('import_sessions', sa.Column('updated_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('import_sessions', sa.Column('unchanged_count', sa.Integer(), server_default='0', nullable=False))
+
+    backfill_address_keys(op.get_bind())
+    # Properties already entered twice keep their oldest copy as the one imports match;
+    # the others lose their key: imports never match them, and editing them keeps it
+    # NULL unless their address changes (Property._set_address_key)
+    op.execute(
+        "UPDATE properties SET address_key = NULL WHERE id IN ("
+        " SELECT id FROM (SELECT id, row_number() OVER (PARTITION BY user_id, address_key ORDER BY id) AS copy"
+        " FROM properties WHERE address_key IS NOT NULL) AS keyed WHERE copy > 1)"
+    )
+
+    # Commits the backfill first. If the build fails (a duplicate written
+    # meanwhile), it leaves an INVALID index behind: drop it and re-run.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_properties_user_id_address_key', 'properties', ['user_id', 'address_key'],
+                        unique=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_properties_user_id_address_key', table_name='properties', postgresql_concurrently=True)
+    op.drop_column('import_sessions', 'unchanged_count')
+    op.drop_column('import_sessions', 'updated_count')
+    op.drop_column('import_sessions', 'inserted_count')
+    op.drop_column('import_sessions', 'mode')
+    sa.Enum(name='importmode').drop(op.get_bind())
+    op.drop_column('properties', 'address_key')
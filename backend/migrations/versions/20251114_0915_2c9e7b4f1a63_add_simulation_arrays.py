@@ -0,0 +1,36 @@
+"""add simulation arrays
+
+Revision ID: 2c9e7b4f1a63
+Revises: 6f3b8e1d5a27
+Create Date: 2025-11-14 09:15:42.207581
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2c9e7b4f1a63'
+down_revision = '6f3b8e1d5a27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('simulation_arrays',
+    sa.Column('simulation_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('dtype', sa.String(length=20), nullable=False),
+    sa.Column('shape', sa.ARRAY(sa.Integer()), nullable=False),
+    sa.Column('codec', sa.String(length=20), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['simulation_id'], ['simulations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('simulation_id', 'name')
+    )
+    # The data is compressed already: TOAST stores it out of line without trying again
+    op.execute("ALTER TABLE simulation_arrays ALTER COLUMN data SET STORAGE EXTERNAL")
+
+
+def downgrade() -> None:
+    op.drop_table('simulation_arrays')
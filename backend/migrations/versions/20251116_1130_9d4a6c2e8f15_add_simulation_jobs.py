@@ -0,0 +1,44 @@
+"""add simulation jobs
+
+Revision ID: 9d4a6c2e8f15
+Revises: 2c9e7b4f1a63
+Create Date: 2025-11-16 11:30:08.915264
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4a6c2e8f15'
+down_revision = '2c9e7b4f1a63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    simulationstatus = sa.Enum('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', 'CANCELLED', name='simulationstatus')
+    simulationstatus.create(op.get_bind())
+    op.add_column('simulations', sa.Column('params_hash', sa.String(length=64), nullable=True))
+    # Simulations stored before jobs ran them are finished
+    op.add_column('simulations', sa.Column('status', simulationstatus, server_default='COMPLETED', nullable=False))
+    op.add_column('simulations', sa.Column('job_id', sa.Integer(), nullable=True))
+    op.add_column('simulations', sa.Column('paths_completed', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('simulations', sa.Column('error', sa.Text(), nullable=True))
+    op.add_column('simulations', sa.Column('started_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('simulations', sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_foreign_key('simulations_job_id_fkey', 'simulations', 'jobs', ['job_id'], ['id'], ondelete='SET NULL')
+    op.create_index('ix_simulations_user_id_params_hash', 'simulations', ['user_id', 'params_hash'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_simulations_user_id_params_hash', table_name='simulations')
+    op.drop_constraint('simulations_job_id_fkey', 'simulations', type_='foreignkey')
+    op.drop_column('simulations', 'completed_at')
+    op.drop_column('simulations', 'started_at')
+    op.drop_column('simulations', 'error')
+    op.drop_column('simulations', 'paths_completed')
+    op.drop_column('simulations', 'job_id')
+    op.drop_column('simulations', 'status')
+    op.drop_column('simulations', 'params_hash')
+    sa.Enum(name='simulationstatus').drop(op.get_bind())
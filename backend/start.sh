@@ -7,13 +7,25 @@ set -e  # Exit on error
 echo "🔄 Running database migrations..."
 alembic upgrade head
 
-echo "🚀 Starting Gunicorn server..."
 echo "📍 PORT is set to: ${PORT:-8000}"
 
 # Use PORT from environment, fallback to 8000
-PORT=${PORT:-8000}
+export PORT=${PORT:-8000}
+
+# Background jobs (imports, simulations) read uploads from local disk, so by
+# default a worker runs in this container, supervised with the web server
+# (supervisord.conf restarts either one and passes on SIGTERM). Set
+# RUN_JOB_WORKER=false only when workers run as their own service (Procfile
+# "worker") with upload storage both services can reach.
+if [ "${RUN_JOB_WORKER:-true}" = "true" ]; then
+    echo "🚀 Starting Gunicorn server and job worker..."
+    exec supervisord -c supervisord.conf
+fi
+
+echo "🚀 Starting Gunicorn server..."
 
 exec gunicorn app.main:app \
+    --config gunicorn.conf.py \
     --workers 4 \
     --worker-class uvicorn.workers.UvicornWorker \
     --bind 0.0.0.0:${PORT} \
@@ -16,6 +16,8 @@ interface User {
 interface AuthState {
   user: User | null;
   token: string | null;
+  refreshToken: string | null;
+  tokenExpiresAt: number | null; // ms since epoch
   isAuthenticated: boolean;
   isLoading: boolean;
   error: string | null;
@@ -25,7 +27,8 @@ interface AuthState {
   register: (userData: RegisterData) => Promise<void>;
   logout: () => void;
   clearError: () => void;
-  getCurrentUser: () => Promise<void>;
+  getCurrentUser: (retried?: boolean) => Promise<void>;
+  refreshSession: () => Promise<boolean>;
 }
 
 interface RegisterData {
@@ -37,6 +40,8 @@ interface RegisterData {
 
 interface LoginResponse {
   access_token: string;
+  refresh_token: string;
+  expires_in: number; // seconds
   token_type: string;
   user_id: number;
   email: string;
@@ -47,11 +52,33 @@ interface LoginResponse {
 
 const API_BASE_URL = (window as any).ENV?.API_URL || 'http://localhost:8080/api/v1';
 
+// Access tokens are short-lived; renew them this long before they expire
+const REFRESH_MARGIN_MS = 60 * 1000;
+let refreshTimer: ReturnType<typeof setTimeout> | undefined;
+let refreshInFlight: Promise<boolean> | null = null;
+
+const scheduleRefresh = (expiresAt: number | null, refresh: () => Promise<boolean>) => {
+  clearTimeout(refreshTimer);
+  if (!expiresAt) {
+    return;
+  }
+  const delay = Math.max(expiresAt - Date.now() - REFRESH_MARGIN_MS, 0);
+  refreshTimer = setTimeout(() => void refresh(), delay);
+};
+
+const sessionFromResponse = (data: LoginResponse) => ({
+  token: data.access_token,
+  refreshToken: data.refresh_token,
+  tokenExpiresAt: Date.now() + data.expires_in * 1000,
+});
+
 export const useAuthStore = create<AuthState>()(
   persist(
     (set, get) => ({
       user: null,
       token: null,
+      refreshToken: null,
+      tokenExpiresAt: null,
       isAuthenticated: false,
       isLoading: false,
       error: null,
@@ -77,15 +104,17 @@ export const useAuthStore = create<AuthState>()(
             const data: LoginResponse = await response.json();
             console.log('Login response:', data);
 
-            const token = data.access_token;
+            const session = sessionFromResponse(data);
 
             set({
-              token,
+              ...session,
               isAuthenticated: true,
               isLoading: false,
               error: null,
             });
 
+            scheduleRefresh(session.tokenExpiresAt, get().refreshSession);
+
             // Fire-and-forget - don't await this
             void get().getCurrentUser();
 
@@ -96,6 +125,8 @@ export const useAuthStore = create<AuthState>()(
               isLoading: false,
               isAuthenticated: false,
               token: null,
+              refreshToken: null,
+              tokenExpiresAt: null,
               user: null,
             });
             throw error;
@@ -139,7 +170,57 @@ export const useAuthStore = create<AuthState>()(
         }
       },
 
-      getCurrentUser: async () => {
+      refreshSession: async () => {
+          // One refresh at a time: the old refresh token is invalid once used
+          if (refreshInFlight) {
+            return refreshInFlight;
+          }
+
+          refreshInFlight = (async () => {
+            const { refreshToken } = get();
+            if (!refreshToken) {
+              return false;
+            }
+
+            try {
+              const response = await fetch(`${API_BASE_URL}/auth/refresh`, {
+                method: 'POST',
+                headers: {
+                  'Content-Type': 'application/json',
+                  'Accept': 'application/json',
+                },
+                body: JSON.stringify({ refresh_token: refreshToken }),
+              });
+
+              if (!response.ok) {
+                if (response.status === 401) {
+                  // Expired, revoked or already used: sign in again
+                  get().logout();
+                }
+                return false;
+              }
+
+              const session = sessionFromResponse(await response.json());
+              set(session);
+              scheduleRefresh(session.tokenExpiresAt, get().refreshSession);
+              return true;
+
+            } catch (error) {
+              // Network error: keep the session and try again shortly
+              console.error('Token refresh failed:', error);
+              scheduleRefresh(Date.now() + REFRESH_MARGIN_MS + 10000, get().refreshSession);
+              return false;
+            }
+          })();
+
+          try {
+            return await refreshInFlight;
+          } finally {
+            refreshInFlight = null;
+          }
+        },
+
+      getCurrentUser: async (retried = false) => {
           const { token } = get();
           console.log('getCurrentUser called, token:', token ? 'exists' : 'missing');
 
@@ -170,6 +251,10 @@ export const useAuthStore = create<AuthState>()(
 
             if (!response.ok) {
               if (response.status === 401) {
+                // The access token may just have expired; refresh once and retry
+                if (!retried && await get().refreshSession()) {
+                  return get().getCurrentUser(true);
+                }
                 get().logout();
                 return;
               }
@@ -194,9 +279,21 @@ export const useAuthStore = create<AuthState>()(
         },
 
       logout: () => {
+        const { refreshToken } = get();
+        clearTimeout(refreshTimer);
+        if (refreshToken) {
+          // Revokes this session's tokens server-side; nothing to do if it fails
+          void fetch(`${API_BASE_URL}/auth/logout`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ refresh_token: refreshToken }),
+          }).catch(() => undefined);
+        }
         set({
           user: null,
           token: null,
+          refreshToken: null,
+          tokenExpiresAt: null,
           isAuthenticated: false,
           error: null
         });
@@ -210,9 +307,41 @@ export const useAuthStore = create<AuthState>()(
       name: 'auth-storage',
       partialize: (state) => ({
         token: state.token,
+        refreshToken: state.refreshToken,
+        tokenExpiresAt: state.tokenExpiresAt,
         user: state.user,
         isAuthenticated: state.isAuthenticated
       }),
+      onRehydrateStorage: () => (state) => {
+        // Resume the refresh schedule (refreshes at once if the token already expired)
+        if (state?.refreshToken) {
+          scheduleRefresh(state.tokenExpiresAt ?? Date.now(), state.refreshSession);
+        }
+      },
     }
   )
-);
\ No newline at end of file
+);
+
+// Authenticated request. The scheduled refresh can be late (a laptop waking from
+// sleep, a throttled background tab), so a token past its expiry is refreshed
+// first, and a 401 refreshes the session and retries once, like getCurrentUser.
+export const authFetch = async (url: string, init: RequestInit = {}): Promise<Response> => {
+  const send = (token: string) => fetch(url, {
+    ...init,
+    headers: { ...(init.headers as Record<string, string> | undefined), 'Authorization': `Bearer ${token}` },
+  });
+
+  const { token, tokenExpiresAt, refreshSession } = useAuthStore.getState();
+  if (!token) {
+    throw new Error('No authentication token');
+  }
+  if (tokenExpiresAt && tokenExpiresAt <= Date.now() && await refreshSession()) {
+    return send(useAuthStore.getState().token!);
+  }
+
+  const response = await send(token);
+  if (response.status !== 401 || !(await refreshSession())) {
+    return response;
+  }
+  return send(useAuthStore.getState().token!);
+};
@@ -1,7 +1,7 @@
 // frontend/src/store/portfolioStore.ts
 import { create } from 'zustand';
 import { devtools } from 'zustand/middleware';
-import { useAuthStore } from './authStore';
+import { authFetch } from './authStore';
 
 const API_BASE_URL = (window as any).ENV?.API_URL || 'http://localhost:8080/api/v1';
 
@@ -100,16 +100,7 @@ export const usePortfolioStore = create<PortfolioStore>()(
         set({ isLoading: true, error: null });
 
         try {
-          const { token } = useAuthStore.getState();
-          if (!token) {
-            throw new Error('No authentication token');
-          }
-
-          const response = await fetch(`${API_BASE_URL}/portfolios/?include_default=true`, {
-            headers: {
-              'Authorization': `Bearer ${token}`,
-            },
-          });
+          const response = await authFetch(`${API_BASE_URL}/portfolios/?include_default=true`);
 
           if (!response.ok) {
             const errorData = await response.json();
@@ -135,16 +126,10 @@ export const usePortfolioStore = create<PortfolioStore>()(
         set({ isLoading: true, error: null });
 
         try {
-          const { token } = useAuthStore.getState();
-          if (!token) {
-            throw new Error('No authentication token');
-          }
-
-          const response = await fetch(`${API_BASE_URL}/portfolios/`, {
+          const response = await authFetch(`${API_BASE_URL}/portfolios/`, {
             method: 'POST',
             headers: {
               'Content-Type': 'application/json',
-              'Authorization': `Bearer ${token}`,
             },
             body: JSON.stringify(data),
           });
@@ -176,16 +161,10 @@ export const usePortfolioStore = create<PortfolioStore>()(
         set({ isLoading: true, error: null });
 
         try {
-          const { token } = useAuthStore.getState();
-          if (!token) {
-            throw new Error('No authentication token');
-          }
-
-          const response = await fetch(`${API_BASE_URL}/portfolios/${id}/`, {
+          const response = await authFetch(`${API_BASE_URL}/portfolios/${id}/`, {
             method: 'PUT',
             headers: {
               'Content-Type': 'application/json',
-              'Authorization': `Bearer ${token}`,
             },
             body: JSON.stringify(data),
           });
@@ -230,17 +209,9 @@ export const usePortfolioStore = create<PortfolioStore>()(
         set({ isLoading: true, error: null });
 
         try {
-          const { token } = useAuthStore.getState();
-          if (!token) {
-            throw new Error('No authentication token');
-          }
-
           const params = movePropertiesTo ? `?move_properties_to=${movePropertiesTo}` : '';
-          const response = await fetch(`${API_BASE_URL}/portfolios/${id}${params}`, {
+          const response = await authFetch(`${API_BASE_URL}/portfolios/${id}${params}`, {
             method: 'DELETE',
-            headers: {
-              'Authorization': `Bearer ${token}`,
-            },
           });
 
           if (!response.ok) {
@@ -274,16 +245,8 @@ export const usePortfolioStore = create<PortfolioStore>()(
         set({ error: null });
 
         try {
-          const { token } = useAuthStore.getState();
-          if (!token) {
-            throw new Error('No authentication token');
-          }
-
-          const response = await fetch(`${API_BASE_URL}/portfolios/${portfolioId}/properties/${propertyId}/`, {
+          const response = await authFetch(`${API_BASE_URL}/portfolios/${portfolioId}/properties/${propertyId}/`, {
             method: 'POST',
-            headers: {
-              'Authorization': `Bearer ${token}`,
-            },
           });
 
           if (!response.ok) {
@@ -305,16 +268,7 @@ export const usePortfolioStore = create<PortfolioStore>()(
         set({ isLoading: true, error: null });
 
         try {
-          const { token } = useAuthStore.getState();
-          if (!token) {
-            throw new Error('No authentication token');
-          }
-
-          const response = await fetch(`${API_BASE_URL}/portfolios/${id}/`, {
-            headers: {
-              'Authorization': `Bearer ${token}`,
-            },
-          });
+          const response = await authFetch(`${API_BASE_URL}/portfolios/${id}/`);
 
           if (!response.ok) {
             const errorData = await response.json();
@@ -344,16 +298,8 @@ export const usePortfolioStore = create<PortfolioStore>()(
         set({ isLoading: true, error: null });
 
         try {
-          const { token } = useAuthStore.getState();
-          if (!token) {
-            throw new Error('No authentication token');
-          }
-
-          const response = await fetch(`${API_BASE_URL}/portfolios/initialize/`, {
+          const response = await authFetch(`${API_BASE_URL}/portfolios/initialize/`, {
             method: 'POST',
-            headers: {
-              'Authorization': `Bearer ${token}`,
-            },
           });
 
           if (!response.ok) {
@@ -1,6 +1,6 @@
 // src/store/propertyStore.ts
 import { create } from 'zustand';
-import { useAuthStore } from './authStore';
+import { authFetch } from './authStore';
 
 export interface Property {
   id: number;
@@ -94,16 +94,7 @@ export const usePropertyStore = create<PropertyState>((set, get) => ({
     set({ isLoading: true, error: null });
 
     try {
-      const { token } = useAuthStore.getState();
-      if (!token) {
-        throw new Error('No authentication token');
-      }
-
-      const response = await fetch(`${API_BASE_URL}/properties/`, {
-        headers: {
-          'Authorization': `Bearer ${token}`,
-        },
-      });
+      const response = await authFetch(`${API_BASE_URL}/properties/`);
 
       if (!response.ok) {
         const errorData = await response.json();
@@ -135,16 +126,10 @@ export const usePropertyStore = create<PropertyState>((set, get) => ({
     set({ isLoading: true, error: null });
 
     try {
-      const { token } = useAuthStore.getState();
-      if (!token) {
-        throw new Error('No authentication token');
-      }
-
-      const response = await fetch(`${API_BASE_URL}/properties/`, {
+      const response = await authFetch(`${API_BASE_URL}/properties/`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
-          'Authorization': `Bearer ${token}`,
         },
         body: JSON.stringify(data),
       });
@@ -183,16 +168,10 @@ export const usePropertyStore = create<PropertyState>((set, get) => ({
     set({ isLoading: true, error: null });
 
     try {
-      const { token } = useAuthStore.getState();
-      if (!token) {
-        throw new Error('No authentication token');
-      }
-
-      const response = await fetch(`${API_BASE_URL}/properties/${id}`, {
+      const response = await authFetch(`${API_BASE_URL}/properties/${id}`, {
         method: 'PUT',
         headers: {
           'Content-Type': 'application/json',
-          'Authorization': `Bearer ${token}`,
         },
         body: JSON.stringify(data),
       });
@@ -231,16 +210,8 @@ export const usePropertyStore = create<PropertyState>((set, get) => ({
     set({ isLoading: true, error: null });
 
     try {
-      const { token } = useAuthStore.getState();
-      if (!token) {
-        throw new Error('No authentication token');
-      }
-
-      const response = await fetch(`${API_BASE_URL}/properties/${id}`, {
+      const response = await authFetch(`${API_BASE_URL}/properties/${id}`, {
         method: 'DELETE',
-        headers: {
-          'Authorization': `Bearer ${token}`,
-        },
       });
 
       if (!response.ok) {
@@ -267,16 +238,7 @@ export const usePropertyStore = create<PropertyState>((set, get) => ({
     set({ isLoading: true, error: null });
 
     try {
-      const { token } = useAuthStore.getState();
-      if (!token) {
-        throw new Error('No authentication token');
-      }
-
-      const response = await fetch(`${API_BASE_URL}/properties/${id}`, {
-        headers: {
-          'Authorization': `Bearer ${token}`,
-        },
-      });
+      const response = await authFetch(`${API_BASE_URL}/properties/${id}`);
 
       if (!response.ok) {
         const errorData = await response.json();
@@ -306,16 +268,7 @@ export const usePropertyStore = create<PropertyState>((set, get) => ({
 
   getPropertyMetrics: async (id: number) => {
     try {
-      const { token } = useAuthStore.getState();
-      if (!token) {
-        throw new Error('No authentication token');
-      }
-
-      const response = await fetch(`${API_BASE_URL}/properties/${id}/metrics`, {
-        headers: {
-          'Authorization': `Bearer ${token}`,
-        },
-      });
+      const response = await authFetch(`${API_BASE_URL}/properties/${id}/metrics`);
 
       if (!response.ok) {
         const errorData = await response.json();